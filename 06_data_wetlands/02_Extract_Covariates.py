@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------------------------
+# Extract covariates to segments
+# Author: Timm Nawrocki
+# Last Updated: 2026-10-17
+# Usage: Must be executed in a Python 3.8+ distribution with numpy, pandas, and rasterio.
+# Description: "Extract covariates to segments" summarizes covariate rasters to the segments of each grid and exports a table of covariates per grid keyed by segment id without intermediate zonal rasters.
+# ---------------------------------------------------------------------------
+
+# Import packages
+import os
+from package_GeospatialProcessing import extract_segment_covariates
+
+# Set root directory
+drive = 'N:/'
+root_folder = 'ACCS_Work'
+
+# Define folder structure
+project_folder = os.path.join(drive, root_folder, 'Projects/VegetationEcology/EPA_Chenega/Data')
+grid_folder = os.path.join(project_folder, 'Data_Input/imagery/segments/gridded')
+topography_folder = os.path.join(project_folder, 'Data_Input/topography/integer')
+coastal_folder = os.path.join(project_folder, 'Data_Input/coastline/processed')
+composite_folder = os.path.join(project_folder, 'Data_Input/imagery/maxar/composite')
+maxar_folder = os.path.join(project_folder, 'Data_Input/imagery/maxar/processed')
+sent1_folder = os.path.join(project_folder, 'Data_Input/imagery/sentinel-1/unprocessed')
+sent2_folder = os.path.join(project_folder, 'Data_Input/imagery/sentinel-2/processed')
+output_folder = os.path.join(project_folder, 'Data_Input/training_data/table_covariate')
+
+# Define grids
+grid_list = ['A1', 'A2',
+             'B1', 'B2', 'B3',
+             'C1', 'C2', 'C3',
+             'D1', 'D2', 'D3']
+
+# Define topography and coastal covariates
+covariate_dictionary = {os.path.join(topography_folder, 'Aspect.tif'): {'MEAN': 'top_aspect'},
+                        os.path.join(topography_folder, 'Elevation.tif'): {'MEAN': 'top_elevation'},
+                        os.path.join(topography_folder, 'Exposure.tif'): {'MEAN': 'top_exposure'},
+                        os.path.join(topography_folder, 'HeatLoad.tif'): {'MEAN': 'top_heat_load'},
+                        os.path.join(topography_folder, 'Position.tif'): {'MEAN': 'top_position'},
+                        os.path.join(topography_folder, 'Radiation.tif'): {'MEAN': 'top_radiation'},
+                        os.path.join(topography_folder, 'Roughness.tif'): {'MEAN': 'top_roughness'},
+                        os.path.join(topography_folder, 'Slope.tif'): {'MEAN': 'top_slope'},
+                        os.path.join(topography_folder, 'SurfaceArea.tif'): {'MEAN': 'top_surface_area'},
+                        os.path.join(topography_folder, 'SurfaceRelief.tif'): {'MEAN': 'top_surface_relief'},
+                        os.path.join(topography_folder, 'Wetness.tif'): {'MEAN': 'top_wetness'},
+                        os.path.join(coastal_folder, 'Chenega_Coastal_Distance.tif'): {'MEAN': 'hyd_coastal'}}
+
+# Add Maxar covariates
+maxar_dictionary = {os.path.join(composite_folder, 'Chenega_MaxarComposite_WGS84.tif/Band_1'): 'ahri_01_blue',
+                    os.path.join(composite_folder, 'Chenega_MaxarComposite_WGS84.tif/Band_2'): 'ahri_02_green',
+                    os.path.join(composite_folder, 'Chenega_MaxarComposite_WGS84.tif/Band_3'): 'ahri_03_red',
+                    os.path.join(composite_folder, 'Chenega_MaxarComposite_WGS84.tif/Band_4'): 'ahri_04_nir',
+                    os.path.join(maxar_folder, 'Chenega_Maxar_EVI2.tif'): 'ahri_evi2',
+                    os.path.join(maxar_folder, 'Chenega_Maxar_NDVI.tif'): 'ahri_ndvi',
+                    os.path.join(maxar_folder, 'Chenega_Maxar_NDWI.tif'): 'ahri_ndwi'}
+for raster, column in maxar_dictionary.items():
+    covariate_dictionary[raster] = {'MEAN': column,
+                                    'STD': column + '_std',
+                                    'RANGE': column + '_rng'}
+
+# Add Sentinel-1 covariates
+season_dictionary = {'summer': 'summ',
+                     'fall': 'fall',
+                     'winter': 'wint'}
+for season, season_code in season_dictionary.items():
+    for polarization in ['vh', 'vv']:
+        raster = os.path.join(sent1_folder, f'Sent1_{polarization}_{season}.tif')
+        covariate_dictionary[raster] = {'MEAN': f's1_{polarization}_{season_code}'}
+
+# Add Sentinel-2 covariates
+band_dictionary = {'2_blue': '02_blue',
+                   '3_green': '03_green',
+                   '4_red': '04_red',
+                   '5_redEdge1': '05_rededge1',
+                   '6_redEdge2': '06_rededge2',
+                   '7_redEdge3': '07_rededge3',
+                   '8_nearInfrared': '08_nir',
+                   '8a_redEdge4': '08a_rededge4',
+                   '11_shortInfrared1': '11_shortir1',
+                   '12_shortInfrared2': '12_shortir2',
+                   'evi2': 'evi2',
+                   'nbr': 'nbr',
+                   'ndmi': 'ndmi',
+                   'ndsi': 'ndsi',
+                   'ndvi': 'ndvi',
+                   'ndwi': 'ndwi'}
+for month in ['06', '07', '08', '09']:
+    for band, band_code in band_dictionary.items():
+        raster = os.path.join(sent2_folder, f'Sent2_{month}_{band}.tif')
+        covariate_dictionary[raster] = {'MEAN': f's2_{month}_{band_code}'}
+
+# Create output folder if it does not already exist
+if os.path.exists(output_folder) == 0:
+    os.mkdir(output_folder)
+
+# Loop through each grid in grid list and extract covariates
+count = 1
+grid_length = len(grid_list)
+for grid in grid_list:
+    # Define input and output datasets
+    grid_raster = os.path.join(grid_folder, grid + '.tif')
+    output_table = os.path.join(output_folder, grid + '.csv')
+
+    # Extract covariates if output table does not already exist
+    if os.path.exists(output_table) == 0:
+        print(f'Extracting covariates for grid {count} of {grid_length}...')
+
+        # Create key word arguments
+        kwargs_extract = {'column_array': list(covariate_dictionary.values()),
+                          'input_array': [grid_raster] + list(covariate_dictionary.keys()),
+                          'output_array': [output_table]
+                          }
+
+        # Process the covariate extraction
+        print(extract_segment_covariates(**kwargs_extract))
+        print('----------')
+
+    # If table already exists, print message
+    else:
+        print(f'Covariates for grid {count} of {grid_length} already exist.')
+        print('----------')
+
+    # Increase counter
+    count += 1
@@ -2,7 +2,7 @@
 # ---------------------------------------------------------------------------
 # Initialization for Geomorphometry Module
 # Author: Timm Nawrocki
-# Last Updated: 2022-01-02
+# Last Updated: 2026-10-17
 # Usage: Individual functions have varying requirements. All functions that use arcpy must be executed in an ArcGIS Pro Python 3.6 distribution.
 # Description: This initialization file imports modules in the package so that the contents are accessible. The functions in this package are adapted from Geomorphometry and Gradient Metrics Toolbox 2.0 by Jeff Evans and Jim Oakleaf (2014) available at https://github.com/jeffreyevans/GradientMetrics
 # ---------------------------------------------------------------------------
@@ -11,12 +11,18 @@
 from package_Geomorphometry.calculateAspect import calculate_aspect
 from package_Geomorphometry.calculateExposure import calculate_exposure
 from package_Geomorphometry.calculateFlow import calculate_flow
+from package_Geomorphometry.calculateFlowNumpy import calculate_flow_numpy
 from package_Geomorphometry.calculateHeatLoad import calculate_heat_load
 from package_Geomorphometry.calculateIntegerElevation import calculate_integer_elevation
 from package_Geomorphometry.calculatePosition import calculate_position
+from package_Geomorphometry.calculatePositionNumpy import calculate_position_numpy
 from package_Geomorphometry.calculateRadiation import calculate_radiation
 from package_Geomorphometry.calculateRoughness import calculate_roughness
+from package_Geomorphometry.calculateRoughnessNumpy import calculate_roughness_numpy
 from package_Geomorphometry.calculateSlope import calculate_slope
 from package_Geomorphometry.calculateSurfaceArea import calculate_surface_area
+from package_Geomorphometry.calculateSurfaceDerivatives import calculate_surface_derivatives
 from package_Geomorphometry.calculateSurfaceRelief import calculate_surface_relief
+from package_Geomorphometry.calculateSurfaceReliefNumpy import calculate_surface_relief_numpy
 from package_Geomorphometry.calculateWetness import calculate_wetness
+from package_Geomorphometry.calculateWetnessNumpy import calculate_wetness_numpy
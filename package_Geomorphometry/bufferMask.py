@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------------------------
+# Buffer mask
+# Author: Timm Nawrocki
+# Last Updated: 2026-10-17
+# Usage: Must be executed in a Python 3.8+ distribution with numpy and scipy.
+# Description: "Buffer mask" is a set of functions that buffer rasterized features on a grid without creating buffered feature classes. Points are rasterized directly to the grid, and the buffer is the set of cells within the buffer distance of a feature cell as measured by an exact Euclidean distance transform.
+# ---------------------------------------------------------------------------
+
+# Define conversion factors from linear units to meters
+UNIT_FACTORS = {'meter': 1,
+                'meters': 1,
+                'kilometer': 1000,
+                'kilometers': 1000,
+                'foot': 0.3048,
+                'feet': 0.3048,
+                'mile': 1609.344,
+                'miles': 1609.344}
+
+# Define a function to convert a linear unit string to map units
+def convert_distance(distance, meters_per_unit=1):
+    """
+    Description: converts a string of numerical distance and unit to a distance in the linear unit of a coordinate system
+    Inputs: 'distance' -- a string of numerical distance and unit such as '10 Kilometers'
+            'meters_per_unit' -- the number of meters per linear unit of the coordinate system
+    Returned Value: Returns a float distance in the linear unit of the coordinate system
+    Preconditions: requires a unit of meters, kilometers, feet, or miles
+    """
+
+    # Parse distance and unit
+    distance_value, distance_unit = distance.split(' ')
+
+    return float(distance_value) * UNIT_FACTORS[distance_unit.lower()] / meters_per_unit
+
+# Define a function to rasterize points to a grid
+def rasterize_points(x_values, y_values, point_values, left, top, cell_size, rows, cols):
+    """
+    Description: assigns point values to the cells of a grid that contain the points, with later points replacing earlier points in the same cell
+    Inputs: 'x_values' -- an array of point x coordinates
+            'y_values' -- an array of point y coordinates
+            'point_values' -- an array of point values
+            'left' -- the x coordinate of the left edge of the grid
+            'top' -- the y coordinate of the top edge of the grid
+            'cell_size' -- the cell size of the grid
+            'rows' -- the number of rows in the grid
+            'cols' -- the number of columns in the grid
+    Returned Value: Returns a two dimensional 64-bit float array with NaN for cells without points
+    Preconditions: requires point coordinates in the coordinate system of the grid
+    """
+
+    # Import packages
+    import numpy as np
+
+    # Locate the cell of each point
+    point_rows = np.floor((top - np.asarray(y_values, dtype='float64')) / cell_size).astype('int64')
+    point_cols = np.floor((np.asarray(x_values, dtype='float64') - left) / cell_size).astype('int64')
+    inside = (point_rows >= 0) & (point_rows < rows) & (point_cols >= 0) & (point_cols < cols)
+
+    # Assign point values to cells
+    raster_array = np.full((rows, cols), np.nan)
+    raster_array[point_rows[inside], point_cols[inside]] = np.asarray(point_values, dtype='float64')[inside]
+
+    return raster_array
+
+# Define a function to buffer a feature mask
+def calculate_buffer_mask(feature_mask, buffer_distance, cell_size):
+    """
+    Description: buffers rasterized features by selecting the cells with centers within the buffer distance of the center of a feature cell
+    Inputs: 'feature_mask' -- a two dimensional boolean array that is true for feature cells
+            'buffer_distance' -- a buffer distance in map units
+            'cell_size' -- the cell size of the grid in map units
+    Returned Value: Returns a two dimensional boolean array that is true inside the buffer
+    Preconditions: requires a feature mask rasterized to the grid
+    """
+
+    # Import packages
+    import numpy as np
+    from scipy import ndimage
+
+    # Return an empty buffer if there are no features
+    if not feature_mask.any():
+        return np.zeros(feature_mask.shape, dtype=bool)
+
+    # Calculate distance to the nearest feature cell
+    feature_distance = ndimage.distance_transform_edt(~feature_mask, sampling=cell_size)
+
+    return feature_distance <= buffer_distance
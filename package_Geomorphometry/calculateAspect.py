@@ -2,23 +2,41 @@
 # ---------------------------------------------------------------------------
 # Calculate aspect
 # Author: Timm Nawrocki
-# Last Updated: 2022-01-02
-# Usage: Must be executed in an ArcGIS Pro Python 3.7 installation.
-# Description: "Calculate aspect" is a function that calculates float and integer aspect.
+# Last Updated: 2026-10-17
+# Usage: Must be executed in an ArcGIS Pro Python 3.7 installation, or in a Python 3.8+ distribution with numpy and rasterio for the numpy engine.
+# Description: "Calculate aspect" is a function that calculates float and integer aspect. The numpy engine calculates aspect in tiles without arcpy with the same kernels as the surface derivatives.
 # ---------------------------------------------------------------------------
 
 # Define function to calculate aspect
-def calculate_aspect(area_raster, elevation_float, z_unit, aspect_float, aspect_integer):
+def calculate_aspect(area_raster, elevation_float, z_unit, aspect_float, aspect_integer, engine='arcpy',
+                     block_rows=512, workers=None, tile_size=None):
     """
     Description: calculates 32-bit float raw aspect and 16-bit signed linear aspect
     Inputs: 'area_raster' -- a raster of the study area to set snap raster and extract area
             'elevation_float' -- an input float elevation raster
             'aspect_float' -- a file path for an output float aspect raster in degrees
             'aspect_integer' -- a file path for an output integer aspect raster in degrees
+            'engine' -- an optional string of either 'arcpy' (default) or 'numpy' to calculate aspect with the quadratic surface kernel of calculate_surface_derivatives
+            'block_rows' -- the number of rows to process per block with the numpy engine
+            'workers' -- the number of processes to use with the numpy engine (defaults to all cores)
+            'tile_size' -- an optional number of rows and columns per tile with the numpy engine (None to use row blocks)
     Returned Value: Returns a raster dataset on disk
     Preconditions: requires float input elevation raster
     """
 
+    # Calculate aspect in tiles if using the numpy engine
+    if engine == 'numpy':
+        from package_Geomorphometry.calculateSurfaceDerivatives import calculate_slope_aspect_tile
+        from package_Geomorphometry.processTiles import process_tiles
+        from package_Geomorphometry.rasterBlocks import define_grid
+        from package_Geomorphometry.surfaceKernels import calculate_z_factor
+        z_factor = calculate_z_factor(z_unit, define_grid(area_raster)['unit_factor'])
+        process_tiles(area_raster, [elevation_float], calculate_slope_aspect_tile,
+                      (z_factor, 'QUADRATIC', 'ASPECT'), 1, [aspect_float, aspect_integer],
+                      ['32_BIT_FLOAT', '16_BIT_SIGNED'], 'aspect', tile_size, block_rows, workers)
+        print('\t\tExported aspect as 32-bit float and 16-bit signed rasters.')
+        return
+
     # Import packages
     import arcpy
     from arcpy.sa import ExtractByMask
@@ -2,18 +2,20 @@
 # ---------------------------------------------------------------------------
 # Calculate flow accumulation
 # Author: Timm Nawrocki
-# Last Updated: 2022-01-02
+# Last Updated: 2026-10-17
 # Usage: Must be executed in an ArcGIS Pro Python 3.7 installation.
-# Description: "Calculate flow accumulation" is a function that calculates flow accumulation from a float elevation raster.
+# Description: "Calculate flow accumulation" is a function that calculates flow accumulation from a float elevation raster. Depressions can optionally be filled with numpy, in tiles for elevation rasters larger than memory.
 # ---------------------------------------------------------------------------
 
 # Define function to calculate flow accumulation
-def calculate_flow(area_raster, elevation_float, flow_accumulation):
+def calculate_flow(area_raster, elevation_float, flow_accumulation, engine='arcpy', tile_size=None):
     """
-    Description: calculates 32-bit float flow direction and accumulation rasters
+    Description: calculates a 32-bit float D-infinity flow accumulation raster
     Inputs: 'area_raster' -- a raster of the study area to set snap raster and extract area
             'elevation_float' -- an input float elevation raster
-            'flow_accumulation' -- a file path for an output float flow direction raster
+            'flow_accumulation' -- a file path for an output float flow accumulation raster
+            'engine' -- an optional string of either 'arcpy' (default) to fill depressions with Fill or 'numpy' to fill depressions with the Priority-Flood algorithm; flow direction and accumulation are calculated with arcpy for both engines
+            'tile_size' -- an optional number of rows and columns per tile to fill depressions in tiles with the numpy engine for elevation rasters larger than memory (None to fill the whole raster in memory); ignored by the arcpy engine
     Returned Value: Returns a raster dataset on disk
     Preconditions: requires float input elevation raster
     """
@@ -24,6 +26,11 @@ def calculate_flow(area_raster, elevation_float, flow_accumulation):
     from arcpy.sa import FlowAccumulation
     from arcpy.sa import FlowDirection
     from arcpy.sa import Raster
+    import numpy as np
+    import os
+
+    # Define intermediate dataset
+    fill_float = os.path.join(os.path.split(flow_accumulation)[0], 'Elevation_Fill.tif')
 
     # Set overwrite option
     arcpy.env.overwriteOutput = True
@@ -41,7 +48,22 @@ def calculate_flow(area_raster, elevation_float, flow_accumulation):
 
     # Fill elevation raster
     print('\t\tFilling elevation raster...')
-    fill_raster = Fill(Raster(elevation_float), 3)
+    if engine == 'numpy' and tile_size is not None:
+        from package_Geomorphometry.fillDepressionsTiled import fill_depressions_tiled
+        fill_depressions_tiled(elevation_float, fill_float, z_limit=3, tile_size=tile_size)
+        fill_raster = Raster(fill_float)
+    elif engine == 'numpy':
+        from package_Geomorphometry.fillDepressions import fill_depressions
+        elevation_raster = Raster(elevation_float)
+        arcpy.env.outputCoordinateSystem = elevation_raster.spatialReference
+        lower_left = arcpy.Point(elevation_raster.extent.XMin, elevation_raster.extent.YMin)
+        elevation_array = arcpy.RasterToNumPyArray(elevation_raster, nodata_to_value=np.nan).astype('float64')
+        fill_array = fill_depressions(elevation_array, z_limit=3)
+        fill_raster = arcpy.NumPyArrayToRaster(fill_array.astype('float32'), lower_left,
+                                               elevation_raster.meanCellWidth, elevation_raster.meanCellHeight,
+                                               np.nan)
+    else:
+        fill_raster = Fill(Raster(elevation_float), 3)
 
     # Calculate flow direction
     print('\t\tCalculating flow direction...')
@@ -67,3 +89,7 @@ def calculate_flow(area_raster, elevation_float, flow_accumulation):
                                 'NONE',
                                 'CURRENT_SLICE',
                                 'NO_TRANSPOSE')
+
+    # Delete intermediate dataset
+    if arcpy.Exists(fill_float) == 1:
+        arcpy.management.Delete(fill_float)
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------------------------
+# Calculate flow accumulation with numpy
+# Author: Timm Nawrocki
+# Last Updated: 2026-10-17
+# Usage: Must be executed in a Python 3.8+ distribution with numpy, scipy, and rasterio.
+# Description: "Calculate flow accumulation with numpy" is a function that calculates D-infinity flow accumulation from a float elevation raster without arcpy. Depressions can be filled out of core in tiles, but flow is routed on the whole filled raster in memory. The filled elevation, flood parents, and flow direction are stored next to an exported flow accumulation raster so that it can later be updated for only the region affected by changed elevation.
+# ---------------------------------------------------------------------------
+
+# Define function to calculate flow accumulation with numpy
+def calculate_flow_numpy(area_raster, elevation_float, flow_accumulation=None, z_limit=3, tile_size=None):
+    """
+    Description: calculates 32-bit float D-infinity flow accumulation on the grid of the study area
+    Inputs: 'area_raster' -- a raster of the study area to set snap raster and extract area
+            'elevation_float' -- an input float elevation raster
+            'flow_accumulation' -- an optional file path for an output float flow accumulation raster (None to return the flow accumulation without writing it); unless depressions are filled in tiles, the filled elevation, flood parents, and flow direction are written next to it so that it can be updated with update_flow_numpy
+            'z_limit' -- the maximum depth of a depression to fill in the vertical units of the elevation
+            'tile_size' -- an optional number of rows and columns per tile to fill depressions in tiles, which bounds the memory of the fill only; flow direction and accumulation are always calculated on the whole filled raster in memory
+    Returned Value: Returns a 32-bit float flow accumulation array on the grid of the area raster with NaN as no data and optionally a raster dataset on disk
+    Preconditions: requires float input elevation raster with the same cell size as the area raster and enough memory to hold the filled raster and its flow receivers
+    """
+
+    # Import packages
+    import os
+    from package_Geomorphometry.fillDepressions import fill_depressions
+    from package_Geomorphometry.fillDepressionsTiled import fill_depressions_tiled
+    from package_Geomorphometry.rasterBlocks import create_raster
+    from package_Geomorphometry.rasterBlocks import define_grid
+    from package_Geomorphometry.rasterBlocks import read_block
+    from package_Geomorphometry.rasterBlocks import write_block
+    from package_Geomorphometry.routeFlowDinf import calculate_flow_dinf
+    from package_Geomorphometry.updateFlowNumpy import write_flow_network
+    import numpy as np
+    import shutil
+    import tempfile
+
+    # Define grid from area raster
+    grid = define_grid(area_raster)
+
+    # Fill elevation raster
+    print('\t\tFilling elevation raster...')
+    parent_array = None
+    if tile_size is not None:
+        temporary_folder = tempfile.mkdtemp()
+        fill_float = os.path.join(temporary_folder, 'Elevation_Fill.tif')
+        try:
+            fill_depressions_tiled(elevation_float, fill_float, z_limit=z_limit, tile_size=tile_size,
+                                   grid_raster=area_raster)
+            fill_array = read_block(fill_float, grid, 0, grid['height'])
+        finally:
+            shutil.rmtree(temporary_folder, ignore_errors=True)
+    else:
+        elevation_array = read_block(elevation_float, grid, 0, grid['height'])
+        parent_array = np.zeros(elevation_array.shape, dtype='int8')
+        fill_array = fill_depressions(elevation_array, z_limit=z_limit, parents=parent_array)
+        del elevation_array
+
+    # Calculate flow direction and accumulation
+    print('\t\tCalculating flow direction and accumulation...')
+    if flow_accumulation is None:
+        accumulation_array = calculate_flow_dinf(fill_array, grid['cell_size'])[1]
+        del fill_array
+        return accumulation_array
+    flow_angle, accumulation_array = calculate_flow_dinf(fill_array, grid['cell_size'])
+
+    # Export flow accumulation raster
+    print('\t\tExporting flow accumulation raster as 32-bit float...')
+    accumulation_dataset = create_raster(flow_accumulation, grid, '32_BIT_FLOAT')
+    try:
+        write_block(accumulation_dataset, accumulation_array, 0)
+    finally:
+        accumulation_dataset.close()
+
+    # Export filled elevation, flood parents, and flow direction
+    if parent_array is not None:
+        print('\t\tExporting filled elevation, flood parents, and flow direction...')
+        write_flow_network(flow_accumulation, grid, fill_array, parent_array, flow_angle)
+    del fill_array, parent_array, flow_angle
+
+    return accumulation_array
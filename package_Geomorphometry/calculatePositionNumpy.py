@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------------------------
+# Calculate topographic position with numpy
+# Author: Timm Nawrocki
+# Last Updated: 2026-10-17
+# Usage: Must be executed in a Python 3.8+ distribution with numpy and rasterio.
+# Description: "Calculate topographic position with numpy" is a function that calculates a continuous index of topographic position using one or more user-defined windows without arcpy. The focal means are calculated from summed-area tables in haloed tiles so that the cost per cell does not depend on the window size and additional windows reuse the same summed-area tables.
+# ---------------------------------------------------------------------------
+
+# Define function to calculate topographic position for a tile
+def calculate_position_tile(input_tiles, area_mask, grid, halo, axis_list):
+    """
+    Description: calculates integer topographic position for a tile at each window size
+    Inputs: 'input_tiles' -- a list containing the elevation tile read with a halo
+            'area_mask' -- a boolean array that is true inside the study area
+            'grid' -- a grid dictionary from define_grid
+            'halo' -- the number of halo cells on each side of the elevation tile
+            'axis_list' -- a list of the number of cells along each axis of the neighborhood squares
+    Returned Value: Returns a list of integer topographic position arrays of the tile in the order of the axis lengths
+    Preconditions: requires a halo of at least half the largest axis length
+    """
+
+    # Import packages
+    from package_Geomorphometry.focalStatistics import calculate_focal_means
+    from package_Geomorphometry.rasterBlocks import convert_integer
+
+    # Remove halo from elevation
+    elevation_tile = input_tiles[0]
+    elevation_core = elevation_tile[halo:elevation_tile.shape[0] - halo, halo:elevation_tile.shape[1] - halo]
+
+    # Calculate topographic position as elevation minus focal mean for each window
+    position_list = []
+    for focal_mean in calculate_focal_means(elevation_tile, axis_list, halo):
+        position_list.append(convert_integer(elevation_core - focal_mean, 1, area_mask))
+
+    return position_list
+
+# Define function to calculate topographic position
+def calculate_position_numpy(area_raster, elevation_float, position_width, position_output, tile_size=1024,
+                             workers=None, update_extents=None):
+    """
+    Description: calculates 16-bit signed topographic position for one or more window sizes
+    Inputs: 'area_raster' -- a raster of the study area to set snap raster and extract area
+            'elevation_float' -- an input float elevation raster
+            'position_width' -- a length in meters to define the axis length for a neighborhood square, or a list of lengths
+            'position_output' -- a file path for an output topographic position raster, or a list of file paths in the order of the lengths
+            'tile_size' -- the number of rows and columns to process per tile
+            'workers' -- the number of processes to use (defaults to all cores)
+            'update_extents' -- an optional list of map extents of changed elevation for which the existing output rasters are patched in place
+    Returned Value: Returns a raster dataset on disk for each window size
+    Preconditions: requires float input elevation raster with the same cell size as the area raster
+    """
+
+    # Import packages
+    from package_Geomorphometry.processTiles import process_tiles
+    from package_Geomorphometry.rasterBlocks import define_grid
+
+    # Convert single window inputs to lists
+    if isinstance(position_width, (list, tuple)):
+        width_list = list(position_width)
+        output_list = list(position_output)
+    else:
+        width_list = [position_width]
+        output_list = [position_output]
+    if len(width_list) != len(output_list):
+        print('\t\tERROR: The number of position widths and position outputs do not match.')
+        quit()
+
+    # Define grid from area raster
+    grid = define_grid(area_raster)
+
+    # Determine neighborhood sizes
+    axis_list = [int(width / grid['cell_size']) for width in width_list]
+
+    # Calculate tiles with a halo of half the largest window
+    process_tiles(area_raster, [elevation_float], calculate_position_tile, (axis_list,), max(axis_list) // 2,
+                  output_list, ['16_BIT_SIGNED'] * len(output_list), 'topographic position', tile_size,
+                  workers=workers, update_extents=update_extents)
+    print(f'\t\tExported {len(output_list)} position rasters as 16-bit signed.')
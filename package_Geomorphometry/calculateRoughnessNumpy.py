@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------------------------
+# Calculate roughness with numpy
+# Author: Timm Nawrocki
+# Last Updated: 2026-10-17
+# Usage: Must be executed in a Python 3.8+ distribution with numpy and rasterio.
+# Description: "Calculate roughness with numpy" is a function that calculates roughness as focal variance (the square of focal standard deviation) using a square window without arcpy. Focal variance is calculated directly from integral images of elevation and squared elevation. This function is adapted from Geomorphometry and Gradient Metrics Toolbox 2.0 by Jeff Evans and Jim Oakleaf (2014) available at https://github.com/jeffreyevans/GradientMetrics.
+# ---------------------------------------------------------------------------
+
+# Define function to calculate roughness for a tile
+def calculate_roughness_tile(input_tiles, area_mask, grid, halo, window_size, conversion_factor):
+    """
+    Description: calculates integer roughness for a tile
+    Inputs: 'input_tiles' -- a list containing the elevation tile read with a halo
+            'area_mask' -- a boolean array that is true inside the study area
+            'grid' -- a grid dictionary from define_grid
+            'halo' -- the number of halo cells on each side of the elevation tile
+            'window_size' -- the number of cells along each axis of the neighborhood square
+            'conversion_factor' -- an integer to be multiplied with the output for conversion to integer raster
+    Returned Value: Returns a list containing the integer roughness array of the tile
+    Preconditions: requires a halo of at least half the window size
+    """
+
+    # Import packages
+    from package_Geomorphometry.focalStatistics import calculate_focal_variance
+    from package_Geomorphometry.rasterBlocks import convert_integer
+    import numpy as np
+
+    # Calculate focal variance and convert null values to zero
+    roughness_tile = calculate_focal_variance(input_tiles[0], window_size, halo)
+    roughness_tile = np.where(np.isnan(roughness_tile), 0, roughness_tile)
+
+    return [convert_integer(roughness_tile, conversion_factor, area_mask)]
+
+# Define function to calculate roughness
+def calculate_roughness_numpy(area_raster, elevation_float, conversion_factor, roughness_output, window_size=5,
+                              block_rows=512, workers=None, tile_size=None, update_extents=None):
+    """
+    Description: calculates 16-bit signed roughness
+    Inputs: 'area_raster' -- a raster of the study area to set snap raster and extract area
+            'elevation_float' -- an input float elevation raster
+            'conversion_factor' -- an integer to be multiplied with the output for conversion to integer raster
+            'roughness_output' -- a file path for an output roughness raster
+            'window_size' -- the number of cells along each axis of the neighborhood square
+            'block_rows' -- the number of rows to process per block
+            'workers' -- the number of processes to use (defaults to all cores)
+            'tile_size' -- an optional number of rows and columns per tile to bound memory for wide rasters (None to use row blocks)
+            'update_extents' -- an optional list of map extents of changed elevation for which the existing output rasters are patched in place
+    Returned Value: Returns a raster dataset on disk
+    Preconditions: requires float input elevation raster with the same cell size as the area raster
+    """
+
+    # Import packages
+    from package_Geomorphometry.processTiles import process_tiles
+
+    # Calculate tiles with a halo of half the window
+    process_tiles(area_raster, [elevation_float], calculate_roughness_tile, (window_size, conversion_factor),
+                  window_size // 2, [roughness_output], ['16_BIT_SIGNED'], 'roughness',
+                  tile_size, block_rows, workers, update_extents)
+    print('\t\tExported roughness raster as 16-bit signed.')
@@ -2,13 +2,14 @@
 # ---------------------------------------------------------------------------
 # Calculate slope
 # Author: Timm Nawrocki
-# Last Updated: 2022-01-02
-# Usage: Must be executed in an ArcGIS Pro Python 3.7 installation.
-# Description: "Calculate slope" is a function that calculates float and integer slope in degrees.
+# Last Updated: 2026-10-17
+# Usage: Must be executed in an ArcGIS Pro Python 3.7 installation, or in a Python 3.8+ distribution with numpy and rasterio for the numpy engine.
+# Description: "Calculate slope" is a function that calculates float and integer slope in degrees. The numpy engine calculates slope in tiles without arcpy with the same kernels as the surface derivatives.
 # ---------------------------------------------------------------------------
 
 # Define function to calculate slope
-def calculate_slope(area_raster, elevation_float, z_unit, slope_float, slope_integer):
+def calculate_slope(area_raster, elevation_float, z_unit, slope_float, slope_integer, engine='arcpy',
+                    block_rows=512, workers=None, tile_size=None):
     """
     Description: calculates 32-bit float slope and 16-bit signed slope
     Inputs: 'area_raster' -- a raster of the study area to set snap raster and extract area
@@ -16,10 +17,27 @@ def calculate_slope(area_raster, elevation_float, z_unit, slope_float, slope_int
             'z-unit' -- a string of the elevation unit
             'slope_raw' -- a file path for an output float slope raster in degrees
             'slope_output' -- a file path for an output integer slope raster in degrees
+            'engine' -- an optional string of either 'arcpy' (default) or 'numpy' to calculate slope with the quadratic surface kernel of calculate_surface_derivatives
+            'block_rows' -- the number of rows to process per block with the numpy engine
+            'workers' -- the number of processes to use with the numpy engine (defaults to all cores)
+            'tile_size' -- an optional number of rows and columns per tile with the numpy engine (None to use row blocks)
     Returned Value: Returns a raster dataset on disk
     Preconditions: requires float input elevation raster
     """
 
+    # Calculate slope in tiles if using the numpy engine
+    if engine == 'numpy':
+        from package_Geomorphometry.calculateSurfaceDerivatives import calculate_slope_aspect_tile
+        from package_Geomorphometry.processTiles import process_tiles
+        from package_Geomorphometry.rasterBlocks import define_grid
+        from package_Geomorphometry.surfaceKernels import calculate_z_factor
+        z_factor = calculate_z_factor(z_unit, define_grid(area_raster)['unit_factor'])
+        process_tiles(area_raster, [elevation_float], calculate_slope_aspect_tile,
+                      (z_factor, 'QUADRATIC', 'SLOPE'), 1, [slope_float, slope_integer],
+                      ['32_BIT_FLOAT', '16_BIT_SIGNED'], 'slope', tile_size, block_rows, workers)
+        print('\t\tExported slope as 32-bit float and 16-bit signed rasters.')
+        return
+
     # Import packages
     import arcpy
     from arcpy.sa import ExtractByMask
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------------------------
+# Calculate surface derivatives
+# Author: Timm Nawrocki
+# Last Updated: 2026-10-17
+# Usage: Must be executed in a Python 3.8+ distribution with numpy and rasterio.
+# Description: "Calculate surface derivatives" is a function that calculates integer elevation, slope, aspect, exposure, heat load, radiation, surface area ratio, and optionally plan, profile, and mean curvature tile by tile in a single pass over a float elevation raster without arcpy. Exposure, heat load, and radiation can optionally be interpolated from lookup tables of slope and aspect.
+# ---------------------------------------------------------------------------
+
+# Define function to calculate surface derivatives for a tile
+def calculate_surface_derivatives_tile(input_tiles, area_mask, grid, halo, z_factor, surface_type, middle_latitude,
+                                       conversion_dictionary, lookup_table, curvature):
+    """
+    Description: calculates all point-wise surface derivatives for a tile
+    Inputs: 'input_tiles' -- a list containing the elevation tile read with a one cell halo
+            'area_mask' -- a boolean array that is true inside the study area
+            'grid' -- a grid dictionary from define_grid
+            'halo' -- the number of halo cells on each side of the elevation tile
+            'z_factor' -- the number of horizontal units per vertical unit
+            'surface_type' -- either 'QUADRATIC' or 'PLANAR'
+            'middle_latitude' -- the middle latitude of the elevation extent
+            'conversion_dictionary' -- a dictionary of the conversion factors of exposure, heat load, radiation, and surface area
+            'lookup_table' -- a boolean that interpolates exposure, heat load, and radiation from lookup tables
+            'curvature' -- a boolean that also calculates plan, profile, and mean curvature
+    Returned Value: Returns a list of output arrays in the order of the output rasters
+    Preconditions: requires a one cell halo
+    """
+
+    # Import packages
+    from package_Geomorphometry.rasterBlocks import convert_integer
+    from package_Geomorphometry.surfaceKernels import calculate_coefficients
+    from package_Geomorphometry.surfaceKernels import calculate_curvature_kernel
+    from package_Geomorphometry.surfaceKernels import calculate_exposure_kernel
+    from package_Geomorphometry.surfaceKernels import calculate_heat_load_kernel
+    from package_Geomorphometry.surfaceKernels import calculate_radiation_kernel
+    from package_Geomorphometry.surfaceKernels import calculate_slope_aspect_kernel
+    from package_Geomorphometry.surfaceKernels import calculate_surface_area_kernel
+    from package_Geomorphometry.surfaceKernels import calculate_table_kernel
+
+    # Calculate surface derivatives
+    elevation_tile = input_tiles[0]
+    derivatives = calculate_coefficients(elevation_tile, grid['cell_size'], z_factor, surface_type, curvature)
+
+    # Calculate slope and aspect
+    slope_tile, aspect_tile = calculate_slope_aspect_kernel(derivatives[0], derivatives[1])
+
+    # Calculate derived properties
+    if lookup_table:
+        exposure_tile, heatload_tile, radiation_tile = calculate_table_kernel(slope_tile, aspect_tile,
+                                                                              middle_latitude)
+    else:
+        exposure_tile = calculate_exposure_kernel(slope_tile, aspect_tile)
+        heatload_tile = calculate_heat_load_kernel(slope_tile, aspect_tile, middle_latitude)
+        radiation_tile = calculate_radiation_kernel(aspect_tile)
+    surfacearea_tile = calculate_surface_area_kernel(slope_tile, grid['cell_size'])
+
+    # Convert to integer
+    output_tiles = [slope_tile,
+                    aspect_tile,
+                    convert_integer(elevation_tile[1:-1, 1:-1], 1, area_mask),
+                    convert_integer(slope_tile, 1, area_mask),
+                    convert_integer(aspect_tile, 1, area_mask),
+                    convert_integer(exposure_tile, conversion_dictionary['exposure'], area_mask),
+                    convert_integer(heatload_tile, conversion_dictionary['heat_load'], area_mask),
+                    convert_integer(radiation_tile, conversion_dictionary['radiation'], area_mask),
+                    convert_integer(surfacearea_tile, conversion_dictionary['surface_area'], area_mask)]
+
+    # Calculate curvature from the same surface derivatives
+    if curvature:
+        for curvature_tile in calculate_curvature_kernel(*derivatives):
+            output_tiles.append(convert_integer(curvature_tile, conversion_dictionary['curvature'], area_mask))
+
+    return output_tiles
+
+# Define function to calculate slope or aspect for a tile
+def calculate_slope_aspect_tile(input_tiles, area_mask, grid, halo, z_factor, surface_type, parameter_type):
+    """
+    Description: calculates float and integer slope or aspect for a tile with the same kernels as the surface derivatives
+    Inputs: 'input_tiles' -- a list containing the elevation tile read with a one cell halo
+            'area_mask' -- a boolean array that is true inside the study area
+            'grid' -- a grid dictionary from define_grid
+            'halo' -- the number of halo cells on each side of the elevation tile
+            'z_factor' -- the number of horizontal units per vertical unit
+            'surface_type' -- either 'QUADRATIC' or 'PLANAR'
+            'parameter_type' -- either 'SLOPE' or 'ASPECT'
+    Returned Value: Returns a list of the float and integer arrays of the parameter for the tile
+    Preconditions: requires a one cell halo
+    """
+
+    # Import packages
+    from package_Geomorphometry.rasterBlocks import convert_integer
+    from package_Geomorphometry.surfaceKernels import calculate_coefficients
+    from package_Geomorphometry.surfaceKernels import calculate_slope_aspect_kernel
+
+    # Calculate slope and aspect
+    derivatives = calculate_coefficients(input_tiles[0], grid['cell_size'], z_factor, surface_type, False)
+    slope_tile, aspect_tile = calculate_slope_aspect_kernel(derivatives[0], derivatives[1])
+
+    # Select parameter and convert to integer
+    parameter_tile = slope_tile if parameter_type == 'SLOPE' else aspect_tile
+
+    return [parameter_tile, convert_integer(parameter_tile, 1, area_mask)]
+
+# Define function to calculate surface derivatives
+def calculate_surface_derivatives(area_raster, elevation_float, z_unit, slope_float, aspect_float, output_array,
+                                  block_rows=512, workers=None, surface_type='QUADRATIC', lookup_table=False,
+                                  tile_size=None, curvature_array=None, update_extents=None):
+    """
+    Description: calculates 32-bit float slope and aspect and 16-bit signed elevation, slope, aspect, exposure, heat load, radiation, and surface area ratio from one pass over the elevation raster
+    Inputs: 'area_raster' -- a raster of the study area to set snap raster and extract area
+            'elevation_float' -- an input float elevation raster
+            'z_unit' -- a string of the elevation unit
+            'slope_float' -- a file path for an output float slope raster in degrees
+            'aspect_float' -- a file path for an output float aspect raster in degrees
+            'output_array' -- an array containing the output integer rasters for elevation, slope, aspect, exposure, heat load, radiation, and surface area (in that order)
+            'block_rows' -- the number of rows to process per block
+            'workers' -- the number of processes to use (defaults to all cores)
+            'surface_type' -- either 'QUADRATIC' to match SurfaceParameters or 'PLANAR' for the Horn method
+            'lookup_table' -- a boolean that interpolates exposure, heat load, and radiation from lookup tables at 0.1 degree steps of slope and aspect instead of evaluating them per cell, which changes integer outputs by at most one
+            'tile_size' -- an optional number of rows and columns per tile to bound memory for wide rasters (None to use row blocks)
+            'curvature_array' -- an optional array containing output integer rasters for plan, profile, and mean curvature (in that order) calculated from the same quadratic surface
+            'update_extents' -- an optional list of map extents of changed elevation for which the existing output rasters are patched in place
+    Returned Value: Returns nine raster datasets on disk, or twelve if curvature is requested
+    Preconditions: requires float input elevation raster with the same cell size as the area raster
+    """
+
+    # Import packages
+    from package_Geomorphometry.processTiles import process_tiles
+    from package_Geomorphometry.rasterBlocks import define_grid
+    from package_Geomorphometry.surfaceKernels import calculate_z_factor
+    import rasterio
+
+    # Define conversion factors used in calculate_topographic_properties
+    conversion_dictionary = {'exposure': 100,
+                             'heat_load': 10000,
+                             'radiation': 1000,
+                             'surface_area': 10,
+                             'curvature': 10000}
+
+    # Define grid from area raster
+    grid = define_grid(area_raster)
+    z_factor = calculate_z_factor(z_unit, grid['unit_factor'])
+
+    # Calculate middle latitude of elevation extent as in calculate_heat_load
+    with rasterio.open(elevation_float) as elevation_dataset:
+        middle_latitude = (elevation_dataset.bounds.bottom + elevation_dataset.bounds.top) / 2
+
+    # Calculate tiles with a one cell halo and stream all outputs
+    output_rasters = [slope_float, aspect_float] + list(output_array)
+    if curvature_array is not None:
+        output_rasters = output_rasters + list(curvature_array)
+    data_types = ['32_BIT_FLOAT', '32_BIT_FLOAT'] + ['16_BIT_SIGNED'] * (len(output_rasters) - 2)
+    process_tiles(area_raster, [elevation_float], calculate_surface_derivatives_tile,
+                  (z_factor, surface_type, middle_latitude, conversion_dictionary, lookup_table,
+                   curvature_array is not None), 1,
+                  output_rasters, data_types, 'surface derivatives', tile_size, block_rows, workers,
+                  update_extents)
+    print(f'\t\tExported {len(output_rasters)} surface derivative rasters.')
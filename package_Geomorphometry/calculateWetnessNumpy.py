@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------------------------
+# Calculate topographic wetness with numpy
+# Author: Timm Nawrocki
+# Last Updated: 2026-10-17
+# Usage: Must be executed in a Python 3.8+ distribution with numpy, scipy, and rasterio.
+# Description: "Calculate topographic wetness with numpy" is a set of functions that calculate an index of topographic wetness without arcpy from a flow accumulation raster or a flow accumulation array held in memory. Windows of an existing wetness raster can be recalculated and patched in place after flow accumulation is updated for changed elevation. This function is adapted from Geomorphometry and Gradient Metrics Toolbox 2.0 by Jeff Evans and Jim Oakleaf (2014) available at https://github.com/jeffreyevans/GradientMetrics.
+# ---------------------------------------------------------------------------
+
+# Define function to calculate compound topographic index for a block
+def calculate_wetness_block(accumulation_array, slope_array, cell_size):
+    """
+    Description: calculates the compound topographic index from flow accumulation and slope and fills missing values with the value of the nearest cell
+    Inputs: 'accumulation_array' -- a float flow accumulation array with NaN as no data
+            'slope_array' -- a float slope array in degrees with NaN as no data
+            'cell_size' -- the cell size of the arrays
+    Returned Value: Returns a 64-bit float topographic wetness array
+    Preconditions: requires arrays of the same shape
+    """
+
+    # Import packages
+    import numpy as np
+    from package_Geomorphometry.nibbleNearest import nibble_nearest
+
+    # Calculate slope tangent
+    print('\t\tCalculating slope tangent...')
+    slope_radian = slope_array * 0.0174533
+    with np.errstate(invalid='ignore'):
+        slope_tangent = np.where(slope_radian > 0, np.tan(slope_radian), 0.001)
+    slope_tangent[np.isnan(slope_radian)] = np.nan
+
+    # Calculate compound topographic index as natural log of corrected flow accumulation divided by slope tangent
+    print('\t\tCalculating compound topographic index...')
+    with np.errstate(invalid='ignore', divide='ignore'):
+        wetness_array = np.log(((accumulation_array + 1) * cell_size) / slope_tangent)
+    del slope_radian, slope_tangent
+
+    # Fill missing values with the value of the nearest cell
+    print('\t\tFilling missing values...')
+    wetness_array = nibble_nearest(wetness_array, None, 'DATA_ONLY', 'PROCESS_NODATA')
+
+    return wetness_array
+
+# Define function to calculate compound topographic index with numpy
+def calculate_wetness_numpy(area_raster, flow_accumulation, slope_float, conversion_factor, wetness_output,
+                            update_windows=None, nibble_halo=32):
+    """
+    Description: calculates 16-bit signed topographic wetness
+    Inputs: 'area_raster' -- a raster of the study area to set snap raster and extract area
+            'flow_accumulation' -- an input flow accumulation raster or a flow accumulation array on the grid of the area raster from calculate_flow_numpy
+            'slope_float' -- an input float slope raster in degrees
+            'conversion_factor' -- an integer to be multiplied with the output for conversion to integer raster
+            'wetness_output' -- a file path for an output topographic wetness raster
+            'update_windows' -- an optional list of tuples of start row, end row, start column, and end column of windows of an existing wetness raster to recalculate from a flow accumulation raster and patch in place instead of creating the raster
+            'nibble_halo' -- the number of cells read beyond each side of an update window to find the nearest values for missing cells
+    Returned Value: Returns a raster dataset on disk
+    Preconditions: requires input flow accumulation and raw slope raster with the same cell size as the area raster
+    """
+
+    # Import packages
+    import numpy as np
+    from package_Geomorphometry.rasterBlocks import convert_integer
+    from package_Geomorphometry.rasterBlocks import create_raster
+    from package_Geomorphometry.rasterBlocks import define_grid
+    from package_Geomorphometry.rasterBlocks import read_block
+    from package_Geomorphometry.rasterBlocks import read_mask
+    from package_Geomorphometry.rasterBlocks import write_block
+    import rasterio
+
+    # Define grid from area raster
+    grid = define_grid(area_raster)
+
+    # Recalculate and patch each update window of an existing raster
+    if update_windows is not None:
+        wetness_dataset = rasterio.open(wetness_output, 'r+')
+        try:
+            for row_start, row_end, col_start, col_end in update_windows:
+                accumulation_block = read_block(flow_accumulation, grid, row_start, row_end, nibble_halo,
+                                                col_start, col_end)
+                slope_block = read_block(slope_float, grid, row_start, row_end, nibble_halo, col_start, col_end)
+                wetness_block = calculate_wetness_block(accumulation_block, slope_block, grid['cell_size'])
+                wetness_block = wetness_block[nibble_halo:nibble_halo + row_end - row_start,
+                                              nibble_halo:nibble_halo + col_end - col_start]
+                area_mask = read_mask(area_raster, grid, row_start, row_end, col_start, col_end)
+                write_block(wetness_dataset, convert_integer(wetness_block, conversion_factor, area_mask),
+                            row_start, col_start)
+        finally:
+            wetness_dataset.close()
+        print(f'\t\tUpdated {len(update_windows)} windows of wetness raster.')
+        return
+
+    # Read flow accumulation if it is not already in memory
+    if isinstance(flow_accumulation, np.ndarray):
+        accumulation_array = flow_accumulation.astype('float64')
+    else:
+        accumulation_array = read_block(flow_accumulation, grid, 0, grid['height'])
+
+    # Calculate topographic wetness
+    slope_array = read_block(slope_float, grid, 0, grid['height'])
+    wetness_array = calculate_wetness_block(accumulation_array, slope_array, grid['cell_size'])
+    del accumulation_array, slope_array
+
+    # Convert to integer and extract to area raster
+    print('\t\tConverting to integer...')
+    area_mask = read_mask(area_raster, grid, 0, grid['height'])
+    integer_array = convert_integer(wetness_array, conversion_factor, area_mask)
+
+    # Export raster
+    print('\t\tExporting wetness raster as 16-bit signed...')
+    wetness_dataset = create_raster(wetness_output, grid, '16_BIT_SIGNED')
+    try:
+        write_block(wetness_dataset, integer_array, 0)
+    finally:
+        wetness_dataset.close()
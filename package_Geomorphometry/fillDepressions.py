@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------------------------
+# Fill depressions
+# Author: Timm Nawrocki
+# Last Updated: 2026-10-17
+# Usage: Must be executed in a Python 3.8+ distribution with numpy, numba, and scipy.
+# Description: "Fill depressions" is a set of functions that fill depressions in an elevation array using the Priority-Flood algorithm of Barnes et al. (2014) with an optional fill limit and an optional epsilon gradient so that filled flats drain. The flood kernel is compiled with numba, which is required.
+# ---------------------------------------------------------------------------
+
+# Import packages at module level so that the flood kernel can be compiled with numba
+import heapq
+import numpy as np
+from numba import njit
+
+# Define a function to flood an elevation array from seed cells
+@njit(cache=True)
+def flood_depressions(elevation, valid, seeds, labels, parents, rows, cols, epsilon):
+    """
+    Description: floods a flattened elevation array inward from seed cells in order of elevation using a binary heap, raising each cell that is not higher than the cell it was reached from; cells that are raised are processed from a plain queue to avoid heap operations
+    Inputs: 'elevation' -- a flattened 64-bit float elevation array that is modified in place
+            'valid' -- a flattened boolean array that is true for cells with data
+            'seeds' -- a flattened boolean array that is true for cells that drain out of the array
+            'labels' -- a flattened integer array of seed labels that is modified in place so that every cell receives the label of the seed from which it was flooded
+            'parents' -- a flattened integer array that is modified in place so that every flooded cell receives the number from 1 to 8 of the neighbor from which it was flooded in the order of the neighbor offsets, and seeds receive 0
+            'rows' -- the number of rows in the elevation array
+            'cols' -- the number of columns in the elevation array
+            'epsilon' -- an elevation increment added to each raised cell so that filled flats drain (0 for a flat fill)
+    Returned Value: Returns the filled elevation array
+    Preconditions: requires at least one seed cell; this function is compiled with numba
+    """
+
+    # Define neighbor offsets
+    row_offsets = np.array([-1, -1, -1, 0, 0, 1, 1, 1])
+    col_offsets = np.array([-1, 0, 1, -1, 1, -1, 0, 1])
+
+    # Add seed cells to the heap
+    closed = np.zeros(rows * cols, dtype=np.bool_)
+    seed_indices = np.nonzero(seeds)[0]
+    open_heap = [(elevation[seed_indices[0]], seed_indices[0])]
+    closed[seed_indices[0]] = True
+    parents[seed_indices[0]] = 0
+    for index in seed_indices[1:]:
+        open_heap.append((elevation[index], index))
+        closed[index] = True
+        parents[index] = 0
+    heapq.heapify(open_heap)
+
+    # Create plain queue of raised cells
+    pit_queue = np.empty(rows * cols, dtype=np.int64)
+    pit_start = 0
+    pit_end = 0
+
+    # Flood cells in order of elevation
+    while pit_start < pit_end or len(open_heap) > 0:
+        if pit_start < pit_end:
+            cell = pit_queue[pit_start]
+            pit_start += 1
+        else:
+            cell = heapq.heappop(open_heap)[1]
+            pit_start = 0
+            pit_end = 0
+        cell_row = cell // cols
+        cell_col = cell % cols
+        for neighbor_number in range(8):
+            neighbor_row = cell_row + row_offsets[neighbor_number]
+            neighbor_col = cell_col + col_offsets[neighbor_number]
+            if neighbor_row < 0 or neighbor_row >= rows or neighbor_col < 0 or neighbor_col >= cols:
+                continue
+            neighbor = neighbor_row * cols + neighbor_col
+            if closed[neighbor] or not valid[neighbor]:
+                continue
+            closed[neighbor] = True
+            labels[neighbor] = labels[cell]
+            parents[neighbor] = 8 - neighbor_number
+            if elevation[neighbor] <= elevation[cell]:
+                elevation[neighbor] = elevation[cell] + epsilon
+                pit_queue[pit_end] = neighbor
+                pit_end += 1
+            else:
+                heapq.heappush(open_heap, (elevation[neighbor], neighbor))
+
+    return elevation
+
+# Define a function to fill depressions in an elevation array
+def fill_depressions(elevation, z_limit=None, epsilon=0.0, seeds=None, parents=None):
+    """
+    Description: fills depressions in an elevation array in the same way as the Fill tool, leaving depressions deeper than the fill limit unfilled so that they act as sinks; only the cells of deep depressions are reflooded once their lowest cells are converted to sinks, because the filled elevation of other cells cannot change
+    Inputs: 'elevation' -- a two dimensional float elevation array with NaN as no data
+            'z_limit' -- the maximum depth of a depression to fill in the vertical units of the elevation (None to fill all depressions)
+            'epsilon' -- an elevation increment added to each raised cell so that filled flats drain (0 for a flat fill)
+            'seeds' -- an optional boolean array of additional cells that drain out of the array
+            'parents' -- an optional 8-bit integer array of the shape of the elevation that is modified in place so that each flooded cell receives the number of the neighbor from which it was flooded and cells that drain out of the array receive 0
+    Returned Value: Returns a filled 64-bit float elevation array
+    Preconditions: requires a float elevation array
+    """
+
+    # Import packages
+    import numpy as np
+    from scipy import ndimage
+
+    # Define data cells and edge cells that drain out of the array
+    rows, cols = elevation.shape
+    if parents is None:
+        parents = np.zeros((rows, cols), dtype='int8')
+    valid = np.isfinite(elevation)
+    connectivity = np.ones((3, 3), dtype=bool)
+    drain_cells = valid & ~ndimage.binary_erosion(valid, structure=connectivity, border_value=0)
+    if seeds is not None:
+        drain_cells = drain_cells | (seeds & valid)
+    if drain_cells.any() == 0:
+        return elevation.astype('float64')
+
+    # Fill depressions
+    filled = elevation.astype('float64').ravel()
+    flood_parents = parents.ravel()
+    flood_depressions(filled, valid.ravel(), drain_cells.ravel(), np.zeros(rows * cols, dtype='uint8'),
+                      flood_parents, rows, cols, float(epsilon))
+    filled = filled.reshape(rows, cols)
+    if z_limit is None:
+        parents[:] = flood_parents.reshape(rows, cols)
+        return filled
+
+    # Identify depressions
+    depth = np.where(valid, filled - elevation, 0)
+    labels, label_count = ndimage.label(depth > 0, structure=connectivity)
+
+    # Convert the lowest cell of each depression deeper than the limit to a sink and reflood only those depressions until all remaining depressions are within the limit
+    while label_count > 0:
+        depression_cells = np.flatnonzero(labels)
+        depression_labels = labels.ravel()[depression_cells]
+        depression_depth = np.zeros(label_count + 1)
+        np.maximum.at(depression_depth, depression_labels, depth.ravel()[depression_cells])
+        deep_depressions = depression_depth > z_limit
+        if deep_depressions.any() == 0:
+            break
+        deep_cells = deep_depressions[labels]
+
+        # Find the lowest cell of each deep depression
+        depression_cells = depression_cells[deep_depressions[depression_labels]]
+        depression_labels = labels.ravel()[depression_cells]
+        order = np.lexsort((elevation.ravel()[depression_cells], depression_labels))
+        lowest = np.ones(len(order), dtype=bool)
+        lowest[1:] = depression_labels[order][1:] != depression_labels[order][:-1]
+        drain_cells.ravel()[depression_cells[order][lowest]] = True
+
+        # Reflood the deep depressions within their bounding window from the unchanged filled cells around them
+        rows_deep, cols_deep = np.nonzero(deep_cells)
+        window = (slice(max(rows_deep.min() - 1, 0), rows_deep.max() + 2),
+                  slice(max(cols_deep.min() - 1, 0), cols_deep.max() + 2))
+        region = deep_cells[window]
+        bounds = ndimage.binary_dilation(region, structure=connectivity) & ~region & valid[window]
+        window_rows, window_cols = region.shape
+        window_filled = np.where(region, elevation[window], filled[window]).astype('float64').ravel()
+        window_parents = np.zeros(window_rows * window_cols, dtype='int8')
+        flood_depressions(window_filled, (region | bounds).ravel(), (bounds | (drain_cells[window] & region)).ravel(),
+                          np.zeros(window_rows * window_cols, dtype='uint8'), window_parents, window_rows,
+                          window_cols, float(epsilon))
+        filled[window] = np.where(region, window_filled.reshape(region.shape), filled[window])
+        window_parents = window_parents.reshape(region.shape)
+        flood_parents.reshape(rows, cols)[window][region] = window_parents[region]
+
+        # Identify the depressions that remain within the refilled depressions
+        depth[window] = np.where(region, filled[window] - elevation[window], depth[window])
+        labels = np.zeros((rows, cols), dtype='int32')
+        labels[window], label_count = ndimage.label((depth[window] > 0) & region, structure=connectivity)
+
+    parents[:] = flood_parents.reshape(rows, cols)
+    return filled
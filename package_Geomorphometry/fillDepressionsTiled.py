@@ -0,0 +1,468 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------------------------
+# Fill depressions in tiles
+# Author: Timm Nawrocki
+# Last Updated: 2026-10-17
+# Usage: Must be executed in a Python 3.8+ distribution with numpy, numba, scipy, and rasterio.
+# Description: "Fill depressions in tiles" is a set of functions that fill depressions in elevation rasters that are larger than memory using the parallel Priority-Flood algorithm of Barnes (2016). Each tile is flooded independently from its edges, the spill elevations between tiles are resolved on a graph of the watersheds of the tile edge cells, and each tile is then raised to the spill elevation of its watersheds. Intermediate results are stored in memory-mapped arrays so that memory use is roughly one tile per process.
+# ---------------------------------------------------------------------------
+
+# Import packages at module level so that the graph kernel can be compiled with numba
+import heapq
+import numpy as np
+from numba import njit
+
+# Define a function to flood a spill graph from outlet nodes
+@njit(cache=True)
+def flood_spill_graph(offsets, targets, weights, outlet_nodes, outlet_elevations, node_count):
+    """
+    Description: calculates the lowest elevation at which water can leave each node of a spill graph by flooding the graph outward from the outlet nodes in order of elevation
+    Inputs: 'offsets' -- an array of the start position of the edges of each node in the targets and weights arrays
+            'targets' -- an array of the node at the other end of each edge
+            'weights' -- an array of the spill elevation of each edge
+            'outlet_nodes' -- an array of nodes that drain out of the raster
+            'outlet_elevations' -- an array of the elevation at which each outlet node drains
+            'node_count' -- the number of nodes in the graph
+    Returned Value: Returns an array of spill elevations for each node with infinity for nodes that do not drain
+    Preconditions: requires a graph in compressed sparse row form; this function is compiled with numba
+    """
+
+    # Add outlet nodes to the heap
+    spill = np.full(node_count, np.inf)
+    open_heap = [(np.inf, np.int64(0))]
+    open_heap.pop()
+    for index in range(len(outlet_nodes)):
+        node = outlet_nodes[index]
+        if outlet_elevations[index] < spill[node]:
+            spill[node] = outlet_elevations[index]
+            heapq.heappush(open_heap, (outlet_elevations[index], np.int64(node)))
+
+    # Flood nodes in order of spill elevation
+    while len(open_heap) > 0:
+        elevation, node = heapq.heappop(open_heap)
+        if elevation > spill[node]:
+            continue
+        for position in range(offsets[node], offsets[node + 1]):
+            target = targets[position]
+            target_elevation = max(elevation, weights[position])
+            if target_elevation < spill[target]:
+                spill[target] = target_elevation
+                heapq.heappush(open_heap, (target_elevation, np.int64(target)))
+
+    return spill
+
+# Define a function to flood a tile from its edges
+def flood_tile(tile_arguments):
+    """
+    Description: fills depressions within a tile from its edge cells, labels every cell with the edge cell it was flooded from, and stores the filled tile and labels in memory-mapped arrays
+    Inputs: 'tile_arguments' -- a tuple of the elevation raster, grid dictionary, filled array file, label array file, sink array file, tile number, start row, end row, start column, and end column
+    Returned Value: Returns the spill edges between labels within the tile and the outlet labels and elevations of cells that drain out of the raster or into a sink
+    Preconditions: requires memory-mapped arrays created by fill_depressions_tiled
+    """
+
+    # Import packages
+    from package_Geomorphometry.fillDepressions import flood_depressions
+    from package_Geomorphometry.rasterBlocks import read_block
+    import numpy as np
+    from scipy import ndimage
+
+    # Parse tile arguments
+    elevation_float, grid, filled_file, label_file, sink_file, tile_number, \
+        row_start, row_end, col_start, col_end = tile_arguments
+
+    # Read elevation with a halo of one cell outside of the grid set to no data to identify cells that drain out of the raster
+    elevation_halo = read_block(elevation_float, grid, row_start, row_end, 1, col_start, col_end)
+    if row_start == 0:
+        elevation_halo[0, :] = np.nan
+    if row_end == grid['height']:
+        elevation_halo[-1, :] = np.nan
+    if col_start == 0:
+        elevation_halo[:, 0] = np.nan
+    if col_end == grid['width']:
+        elevation_halo[:, -1] = np.nan
+    valid_halo = np.isfinite(elevation_halo)
+    connectivity = np.ones((3, 3), dtype=bool)
+    outlet_cells = (valid_halo & ~ndimage.binary_erosion(valid_halo, structure=connectivity, border_value=0))[1:-1, 1:-1]
+    elevation_tile = elevation_halo[1:-1, 1:-1]
+    valid = valid_halo[1:-1, 1:-1]
+    rows, cols = elevation_tile.shape
+
+    # Add sinks of depressions deeper than the fill limit to the outlet cells
+    sink_array = np.load(sink_file, mmap_mode='r')
+    outlet_cells = (outlet_cells | (sink_array[row_start:row_end, col_start:col_end] > 0)) & valid
+    del sink_array
+
+    # Define seed cells as the edge of the tile and the cells that drain out of the raster
+    seed_cells = np.zeros((rows, cols), dtype=bool)
+    seed_cells[[0, -1], :] = True
+    seed_cells[:, [0, -1]] = True
+    seed_cells = (seed_cells | outlet_cells) & valid
+
+    # Label each seed with a number that is unique across tiles
+    labels = np.full(rows * cols, -1, dtype='int64')
+    seed_indices = np.flatnonzero(seed_cells)
+    labels[seed_indices] = tile_number * grid['tile_cells'] + seed_indices
+
+    # Fill the tile from its seeds
+    filled = elevation_tile.flatten()
+    if len(seed_indices) > 0:
+        filled = flood_depressions(filled, valid.ravel(), seed_cells.ravel(), labels, np.zeros(rows * cols, dtype='int8'),
+                              rows, cols, 0.0)
+    filled = filled.reshape(rows, cols)
+    labels = labels.reshape(rows, cols)
+
+    # Store the filled tile and labels
+    filled_array = np.load(filled_file, mmap_mode='r+')
+    label_array = np.load(label_file, mmap_mode='r+')
+    filled_array[row_start:row_end, col_start:col_end] = filled
+    label_array[row_start:row_end, col_start:col_end] = labels
+    filled_array.flush()
+    label_array.flush()
+    del filled_array, label_array
+
+    # Calculate spill edges between neighboring cells with different labels
+    edge_list = [define_spill_edges(filled[:, :-1], labels[:, :-1], filled[:, 1:], labels[:, 1:]),
+                 define_spill_edges(filled[:-1, :], labels[:-1, :], filled[1:, :], labels[1:, :]),
+                 define_spill_edges(filled[:-1, :-1], labels[:-1, :-1], filled[1:, 1:], labels[1:, 1:]),
+                 define_spill_edges(filled[:-1, 1:], labels[:-1, 1:], filled[1:, :-1], labels[1:, :-1])]
+    spill_edges = reduce_spill_edges(edge_list)
+
+    # Define outlet labels and elevations
+    outlet_labels = labels[outlet_cells]
+    outlet_elevations = elevation_tile[outlet_cells]
+
+    return spill_edges, outlet_labels, outlet_elevations
+
+# Define a function to find spill edges between two aligned sets of cells
+def define_spill_edges(filled_a, labels_a, filled_b, labels_b):
+    """
+    Description: finds pairs of neighboring cells with different labels and calculates the elevation at which water spills between them
+    Inputs: 'filled_a' -- a filled elevation array of the first cell of each pair
+            'labels_a' -- a label array of the first cell of each pair
+            'filled_b' -- a filled elevation array of the second cell of each pair
+            'labels_b' -- a label array of the second cell of each pair
+    Returned Value: Returns a tuple of the first labels, second labels, and spill elevations
+    Preconditions: requires arrays of the same shape with -1 as the label of no data
+    """
+
+    # Import packages
+    import numpy as np
+
+    # Select pairs of data cells with different labels
+    pairs = (labels_a != labels_b) & (labels_a >= 0) & (labels_b >= 0)
+
+    return labels_a[pairs], labels_b[pairs], np.maximum(filled_a[pairs], filled_b[pairs])
+
+# Define a function to keep the lowest spill edge between each pair of labels
+def reduce_spill_edges(edge_list):
+    """
+    Description: combines lists of spill edges and keeps the lowest spill elevation between each pair of labels
+    Inputs: 'edge_list' -- a list of tuples of first labels, second labels, and spill elevations
+    Returned Value: Returns a tuple of the first labels, second labels, and spill elevations with one edge per pair of labels
+    Preconditions: requires tuples from define_spill_edges
+    """
+
+    # Import packages
+    import numpy as np
+
+    # Order each pair so that the lower label is first
+    labels_a = np.concatenate([edges[0] for edges in edge_list])
+    labels_b = np.concatenate([edges[1] for edges in edge_list])
+    spill = np.concatenate([edges[2] for edges in edge_list])
+    low_labels = np.minimum(labels_a, labels_b)
+    high_labels = np.maximum(labels_a, labels_b)
+    if len(spill) == 0:
+        return low_labels, high_labels, spill
+
+    # Keep the minimum spill elevation of each pair
+    order = np.lexsort((spill, high_labels, low_labels))
+    low_labels = low_labels[order]
+    high_labels = high_labels[order]
+    spill = spill[order]
+    first = np.ones(len(spill), dtype=bool)
+    first[1:] = (low_labels[1:] != low_labels[:-1]) | (high_labels[1:] != high_labels[:-1])
+
+    return low_labels[first], high_labels[first], spill[first]
+
+# Define a function to read pairs of neighboring cells across tile boundaries
+def read_tile_boundaries(filled_file, label_file, tile_list):
+    """
+    Description: reads the filled elevations and labels of the pairs of neighboring cells that lie on opposite sides of each tile boundary
+    Inputs: 'filled_file' -- a memory-mapped filled elevation array file
+            'label_file' -- a memory-mapped label array file
+            'tile_list' -- a list of tiles from define_tiles
+    Returned Value: Returns a list of tuples of first filled elevations, first labels, second filled elevations, and second labels
+    Preconditions: requires memory-mapped arrays created by fill_depressions_tiled
+    """
+
+    # Import packages
+    import numpy as np
+
+    # Read the rows and columns on each side of the tile boundaries
+    filled_array = np.load(filled_file, mmap_mode='r')
+    label_array = np.load(label_file, mmap_mode='r')
+    line_list = []
+    for row in sorted(set(tile[0] for tile in tile_list) - {0}):
+        line_list.append((filled_array[row - 1], label_array[row - 1], filled_array[row], label_array[row]))
+    for col in sorted(set(tile[2] for tile in tile_list) - {0}):
+        line_list.append((filled_array[:, col - 1], label_array[:, col - 1], filled_array[:, col], label_array[:, col]))
+
+    # Pair each cell with its three neighbors across the boundary
+    pair_list = []
+    for filled_a, labels_a, filled_b, labels_b in line_list:
+        filled_a = np.array(filled_a)
+        labels_a = np.array(labels_a)
+        filled_b = np.array(filled_b)
+        labels_b = np.array(labels_b)
+        pair_list.append((filled_a, labels_a, filled_b, labels_b))
+        pair_list.append((filled_a[:-1], labels_a[:-1], filled_b[1:], labels_b[1:]))
+        pair_list.append((filled_a[1:], labels_a[1:], filled_b[:-1], labels_b[:-1]))
+    del filled_array, label_array
+
+    return pair_list
+
+# Define a function to resolve the spill elevation of each label
+def resolve_spill_elevations(edge_list, outlet_labels, outlet_elevations):
+    """
+    Description: builds a graph of labels connected by spill edges and calculates the lowest elevation at which water can leave each label
+    Inputs: 'edge_list' -- a list of tuples of first labels, second labels, and spill elevations
+            'outlet_labels' -- an array of labels that drain out of the raster
+            'outlet_elevations' -- an array of the elevation at which each outlet label drains
+    Returned Value: Returns a sorted array of labels and an array of the spill elevation of each label
+    Preconditions: requires spill edges from define_spill_edges
+    """
+
+    # Import packages
+    import numpy as np
+
+    # Convert labels to graph nodes
+    low_labels, high_labels, edge_spill = reduce_spill_edges(edge_list)
+    label_list = np.unique(np.concatenate([low_labels, high_labels, outlet_labels]))
+    node_count = len(label_list)
+    low_nodes = np.searchsorted(label_list, low_labels)
+    high_nodes = np.searchsorted(label_list, high_labels)
+    outlet_nodes = np.searchsorted(label_list, outlet_labels)
+
+    # Build the spill graph in compressed sparse row form
+    sources = np.concatenate([low_nodes, high_nodes])
+    targets = np.concatenate([high_nodes, low_nodes])
+    weights = np.concatenate([edge_spill, edge_spill])
+    order = np.argsort(sources, kind='stable')
+    targets = targets[order]
+    weights = weights[order]
+    offsets = np.zeros(node_count + 1, dtype='int64')
+    np.cumsum(np.bincount(sources, minlength=node_count), out=offsets[1:])
+
+    # Flood the spill graph from the outlets
+    spill_list = flood_spill_graph(offsets, targets, weights, outlet_nodes, outlet_elevations, node_count)
+
+    return label_list, spill_list
+
+# Define a function to raise a tile to the spill elevations of its labels
+def correct_tile(tile_arguments):
+    """
+    Description: raises each cell of a filled tile to the spill elevation of its label
+    Inputs: 'tile_arguments' -- a tuple of the filled array file, label array file, label array, spill elevation array, start row, end row, start column, and end column
+    Returned Value: Returns the number of raised cells
+    Preconditions: requires memory-mapped arrays from flood_tile
+    """
+
+    # Import packages
+    import numpy as np
+
+    # Parse tile arguments
+    filled_file, label_file, label_list, spill_list, row_start, row_end, col_start, col_end = tile_arguments
+
+    # Read the filled tile and labels
+    filled_array = np.load(filled_file, mmap_mode='r+')
+    labels = np.load(label_file, mmap_mode='r')[row_start:row_end, col_start:col_end]
+    filled = np.array(filled_array[row_start:row_end, col_start:col_end])
+    valid = labels >= 0
+
+    # Look up the spill elevation of each label
+    spill = np.full(labels.shape, -np.inf)
+    spill[valid] = spill_list[np.searchsorted(label_list, labels[valid])]
+
+    # Raise cells below the spill elevation of their label
+    raised = valid & np.isfinite(spill) & (spill > filled)
+    filled[raised] = spill[raised]
+    filled_array[row_start:row_end, col_start:col_end] = filled
+    filled_array.flush()
+    del filled_array
+
+    return int(raised.sum())
+
+# Define a function to label the filled depressions of a tile
+def label_tile_depressions(tile_arguments):
+    """
+    Description: labels the connected areas of a tile that were raised by filling and summarizes the depth and lowest cell of each area
+    Inputs: 'tile_arguments' -- a tuple of the elevation raster, grid dictionary, filled array file, label array file, tile number, start row, end row, start column, and end column
+    Returned Value: Returns arrays of the depression labels, maximum depth, minimum elevation, and grid row and column of the lowest cell of each depression
+    Preconditions: requires a filled array from correct_tile; the labels replace the labels from flood_tile
+    """
+
+    # Import packages
+    from package_Geomorphometry.rasterBlocks import read_block
+    import numpy as np
+    from scipy import ndimage
+
+    # Parse tile arguments
+    elevation_float, grid, filled_file, label_file, tile_number, row_start, row_end, col_start, col_end = tile_arguments
+
+    # Calculate fill depth
+    elevation_tile = read_block(elevation_float, grid, row_start, row_end, 0, col_start, col_end)
+    filled = np.array(np.load(filled_file, mmap_mode='r')[row_start:row_end, col_start:col_end])
+    depth = np.where(np.isfinite(elevation_tile), filled - elevation_tile, 0)
+
+    # Label connected depressions with numbers that are unique across tiles
+    tile_labels, label_count = ndimage.label(depth > 0, structure=np.ones((3, 3), dtype=bool))
+    depression_labels = np.where(tile_labels > 0, tile_number * grid['tile_cells'] + tile_labels, -1)
+    label_array = np.load(label_file, mmap_mode='r+')
+    label_array[row_start:row_end, col_start:col_end] = depression_labels
+    label_array.flush()
+    del label_array
+
+    # Summarize each depression
+    label_index = np.arange(1, label_count + 1)
+    if label_count == 0:
+        empty_positions = np.zeros(0, dtype='int64')
+        return label_index.astype('int64'), np.zeros(0), np.zeros(0), empty_positions, empty_positions
+    maximum_depth = np.asarray(ndimage.maximum(depth, tile_labels, label_index))
+    minimum_elevation = np.asarray(ndimage.minimum(elevation_tile, tile_labels, label_index))
+    minimum_position = np.array(ndimage.minimum_position(elevation_tile, tile_labels, label_index), dtype='int64')
+
+    return (tile_number * grid['tile_cells'] + label_index, maximum_depth, minimum_elevation,
+            minimum_position[:, 0] + row_start, minimum_position[:, 1] + col_start)
+
+# Define function to fill depressions in tiles
+def fill_depressions_tiled(elevation_float, fill_output, z_limit=None, tile_size=2048, workers=None,
+                           work_folder=None, grid_raster=None):
+    """
+    Description: fills depressions in a float elevation raster in tiles in the same way as fill_depressions so that rasters larger than memory can be filled
+    Inputs: 'elevation_float' -- an input float elevation raster
+            'fill_output' -- a file path for an output filled elevation raster
+            'z_limit' -- the maximum depth of a depression to fill in the vertical units of the elevation (None to fill all depressions)
+            'tile_size' -- the number of rows and columns to process per tile
+            'workers' -- the number of processes to use (defaults to all cores)
+            'work_folder' -- a folder in which to store the memory-mapped arrays (defaults to the system temporary folder)
+            'grid_raster' -- an optional raster that defines the extent of the fill (defaults to the elevation raster)
+    Returned Value: Returns a raster dataset on disk
+    Preconditions: requires float input elevation raster; the work folder must have space for two 64-bit arrays of the raster
+    """
+
+    # Import packages
+    from concurrent.futures import ProcessPoolExecutor
+    import numpy as np
+    import os
+    from package_Geomorphometry.rasterBlocks import create_raster
+    from package_Geomorphometry.rasterBlocks import define_grid
+    from package_Geomorphometry.rasterBlocks import define_tiles
+    from package_Geomorphometry.rasterBlocks import write_block
+    from scipy.sparse import coo_matrix
+    from scipy.sparse.csgraph import connected_components
+    import shutil
+    import tempfile
+
+    # Define grid from grid raster or elevation raster
+    if grid_raster is None:
+        grid_raster = elevation_float
+    grid = define_grid(grid_raster)
+    grid['tile_cells'] = tile_size * tile_size
+    tile_list = define_tiles(grid, tile_size)
+    grid_shape = (grid['height'], grid['width'])
+
+    # Create memory-mapped arrays for the filled elevation, labels, and sinks
+    temporary_folder = tempfile.mkdtemp(dir=work_folder)
+    filled_file = os.path.join(temporary_folder, 'filled.npy')
+    label_file = os.path.join(temporary_folder, 'labels.npy')
+    sink_file = os.path.join(temporary_folder, 'sinks.npy')
+    np.lib.format.open_memmap(filled_file, mode='w+', dtype='float64', shape=grid_shape)
+    np.lib.format.open_memmap(label_file, mode='w+', dtype='int64', shape=grid_shape)
+    np.lib.format.open_memmap(sink_file, mode='w+', dtype='uint8', shape=grid_shape)
+
+    try:
+        # Fill depressions, adding the lowest cell of each depression deeper than the limit as a sink until all remaining depressions are within the limit
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            while True:
+                # Fill each tile from its edges
+                print(f'\t\tFilling {len(tile_list)} tiles...')
+                argument_list = [(elevation_float, grid, filled_file, label_file, sink_file, tile_number) + tile
+                                 for tile_number, tile in enumerate(tile_list)]
+                edge_list = []
+                outlet_labels = []
+                outlet_elevations = []
+                for spill_edges, tile_outlets, tile_elevations in executor.map(flood_tile, argument_list):
+                    edge_list.append(spill_edges)
+                    outlet_labels.append(tile_outlets)
+                    outlet_elevations.append(tile_elevations)
+
+                # Resolve spill elevations on the graph of tile edge labels
+                print('\t\tResolving spill elevations between tiles...')
+                for filled_a, labels_a, filled_b, labels_b in read_tile_boundaries(filled_file, label_file, tile_list):
+                    edge_list.append(define_spill_edges(filled_a, labels_a, filled_b, labels_b))
+                label_list, spill_list = resolve_spill_elevations(edge_list,
+                                                                  np.concatenate(outlet_labels),
+                                                                  np.concatenate(outlet_elevations))
+
+                # Raise each tile to the spill elevations of its labels
+                argument_list = [(filled_file, label_file, label_list, spill_list) + tile for tile in tile_list]
+                raised_count = sum(executor.map(correct_tile, argument_list))
+                print(f'\t\tRaised {raised_count} cells to spill elevations between tiles.')
+                if z_limit is None:
+                    break
+
+                # Label depressions in each tile and join depressions across tile boundaries
+                argument_list = [(elevation_float, grid, filled_file, label_file, tile_number) + tile
+                                 for tile_number, tile in enumerate(tile_list)]
+                summary_list = list(executor.map(label_tile_depressions, argument_list))
+                depression_labels = np.concatenate([summary[0] for summary in summary_list])
+                if len(depression_labels) == 0:
+                    break
+                maximum_depth = np.concatenate([summary[1] for summary in summary_list])
+                minimum_elevation = np.concatenate([summary[2] for summary in summary_list])
+                minimum_rows = np.concatenate([summary[3] for summary in summary_list])
+                minimum_cols = np.concatenate([summary[4] for summary in summary_list])
+                join_a = [np.zeros(0, dtype='int64')]
+                join_b = [np.zeros(0, dtype='int64')]
+                for filled_a, labels_a, filled_b, labels_b in read_tile_boundaries(filled_file, label_file, tile_list):
+                    pairs = define_spill_edges(filled_a, labels_a, filled_b, labels_b)
+                    join_a.append(np.searchsorted(depression_labels, pairs[0]))
+                    join_b.append(np.searchsorted(depression_labels, pairs[1]))
+                join_a = np.concatenate(join_a)
+                join_b = np.concatenate(join_b)
+                join_graph = coo_matrix((np.ones(len(join_a)), (join_a, join_b)),
+                                        shape=(len(depression_labels), len(depression_labels)))
+                component_count, components = connected_components(join_graph, directed=False)
+
+                # Identify depressions deeper than the fill limit
+                component_depth = np.zeros(component_count)
+                np.maximum.at(component_depth, components, maximum_depth)
+                deep_components = np.flatnonzero(component_depth > z_limit)
+                print(f'\t\tFound {len(deep_components)} depressions deeper than the fill limit.')
+                if len(deep_components) == 0:
+                    break
+
+                # Convert the lowest cell of each deep depression to a sink
+                order = np.lexsort((minimum_elevation, components))
+                first = np.ones(len(order), dtype=bool)
+                first[1:] = components[order][1:] != components[order][:-1]
+                lowest = order[first]
+                lowest = lowest[np.isin(components[lowest], deep_components)]
+                sink_array = np.load(sink_file, mmap_mode='r+')
+                sink_array[minimum_rows[lowest], minimum_cols[lowest]] = 1
+                sink_array.flush()
+                del sink_array
+
+        # Export filled raster
+        filled_array = np.load(filled_file, mmap_mode='r')
+        fill_dataset = create_raster(fill_output, grid, '32_BIT_FLOAT')
+        try:
+            for row_start, row_end, col_start, col_end in tile_list:
+                write_block(fill_dataset, np.array(filled_array[row_start:row_end, col_start:col_end]),
+                            row_start, col_start)
+        finally:
+            fill_dataset.close()
+            del filled_array
+        print('\t\tExported filled raster as 32-bit float.')
+    finally:
+        shutil.rmtree(temporary_folder, ignore_errors=True)
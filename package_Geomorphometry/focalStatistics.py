@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------------------------
+# Focal statistics
+# Author: Timm Nawrocki
+# Last Updated: 2026-10-17
+# Usage: Must be executed in a Python 3.8+ distribution with numpy.
+# Description: "Focal statistics" is a set of functions that calculate focal statistics of rectangular neighborhoods on haloed arrays so that the cost per cell does not depend on the size of the neighborhood.
+# ---------------------------------------------------------------------------
+
+# Define a function to calculate the extent of a rectangular neighborhood
+def define_window(axis_length):
+    """
+    Description: calculates the number of cells before and after the processing cell in a rectangular neighborhood, placing the extra cell of even neighborhoods before the processing cell
+    Inputs: 'axis_length' -- the number of cells along the axis of the neighborhood
+    Returned Value: Returns the number of cells before and after the processing cell
+    Preconditions: requires a positive integer axis length
+    """
+
+    # Split neighborhood around processing cell
+    cells_before = axis_length // 2
+    cells_after = axis_length - 1 - cells_before
+
+    return cells_before, cells_after
+
+# Define a function to calculate integral images of values and counts
+def calculate_integral_image(values, power=1, offset=0.0):
+    """
+    Description: calculates zero-padded 64-bit integral images (summed-area tables) of values raised to a power and of valid cell counts, ignoring no data
+    Inputs: 'values' -- a float array with NaN as no data
+            'power' -- the power to raise values to before summing
+            'offset' -- a value subtracted from the values before summing to preserve precision
+    Returned Value: Returns the integral image of values and the integral image of valid counts, each with one more row and column than the input
+    Preconditions: requires a float array
+    """
+
+    # Import packages
+    import numpy as np
+
+    # Convert no data to zero
+    valid = np.isfinite(values)
+    shifted = np.where(valid, values - offset, 0.0) ** power
+
+    # Calculate cumulative sums along both axes
+    value_integral = np.zeros((values.shape[0] + 1, values.shape[1] + 1), dtype='float64')
+    count_integral = np.zeros((values.shape[0] + 1, values.shape[1] + 1), dtype='float64')
+    np.cumsum(np.cumsum(shifted, axis=0), axis=1, out=value_integral[1:, 1:])
+    np.cumsum(np.cumsum(valid, axis=0, dtype='float64'), axis=1, out=count_integral[1:, 1:])
+
+    return value_integral, count_integral
+
+# Define a function to calculate focal sums from an integral image
+def calculate_focal_sum(integral, axis_length, halo):
+    """
+    Description: calculates the focal sum of a square neighborhood for every cell inside the halo of an array using four lookups in its integral image
+    Inputs: 'integral' -- a zero-padded integral image from calculate_integral_image
+            'axis_length' -- the number of cells along each axis of the neighborhood
+            'halo' -- the number of halo cells on each side of the original array
+    Returned Value: Returns an array of focal sums for the cells inside the halo
+    Preconditions: requires a halo at least as large as half of the axis length
+    """
+
+    # Define neighborhood extent
+    cells_before, cells_after = define_window(axis_length)
+
+    # Define output shape inside halo
+    rows = integral.shape[0] - 1 - 2 * halo
+    cols = integral.shape[1] - 1 - 2 * halo
+
+    # Define corners of each neighborhood in the integral image
+    top = halo - cells_before
+    bottom = halo + cells_after + 1
+    left = halo - cells_before
+    right = halo + cells_after + 1
+
+    # Calculate focal sum from four corners
+    focal_sum = (integral[bottom:bottom + rows, right:right + cols]
+                 - integral[top:top + rows, right:right + cols]
+                 - integral[bottom:bottom + rows, left:left + cols]
+                 + integral[top:top + rows, left:left + cols])
+
+    return focal_sum
+
+# Define a function to calculate focal means for multiple neighborhoods
+def calculate_focal_means(values, axis_list, halo):
+    """
+    Description: calculates the focal means of multiple square neighborhoods ignoring no data in the same way as the 'DATA' option of FocalStatistics, building the integral images only once
+    Inputs: 'values' -- a float array with NaN as no data, padded by a halo
+            'axis_list' -- a list of the number of cells along each axis of each neighborhood
+            'halo' -- the number of halo cells on each side of the array
+    Returned Value: Returns a list of arrays of focal means for the cells inside the halo with NaN where the neighborhood has no data
+    Preconditions: requires a halo at least as large as half of the largest axis length
+    """
+
+    # Import packages
+    import numpy as np
+
+    # Calculate integral images relative to the mean value to preserve precision
+    if np.isfinite(values).any():
+        offset = float(np.nanmean(values))
+    else:
+        offset = 0.0
+    value_integral, count_integral = calculate_integral_image(values, 1, offset)
+
+    # Calculate focal mean for each neighborhood from the same integral images
+    mean_list = []
+    for axis_length in axis_list:
+        focal_sum = calculate_focal_sum(value_integral, axis_length, halo)
+        focal_count = np.rint(calculate_focal_sum(count_integral, axis_length, halo))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            focal_mean = np.where(focal_count > 0, focal_sum / focal_count, np.nan) + offset
+        mean_list.append(focal_mean)
+
+    return mean_list
+
+# Define a function to calculate focal mean
+def calculate_focal_mean(values, axis_length, halo):
+    """
+    Description: calculates the focal mean of a square neighborhood ignoring no data in the same way as the 'DATA' option of FocalStatistics
+    Inputs: 'values' -- a float array with NaN as no data, padded by a halo
+            'axis_length' -- the number of cells along each axis of the neighborhood
+            'halo' -- the number of halo cells on each side of the array
+    Returned Value: Returns an array of focal means for the cells inside the halo with NaN where the neighborhood has no data
+    Preconditions: requires a halo at least as large as half of the axis length
+    """
+
+    return calculate_focal_means(values, [axis_length], halo)[0]
+
+# Define a function to calculate running extremes along rows
+def calculate_running_extreme(values, axis_length, extreme_function):
+    """
+    Description: calculates the running minimum or maximum of every window of consecutive cells along the rows of an array using the van Herk/Gil-Werman algorithm, which requires three comparisons per cell regardless of window length
+    Inputs: 'values' -- a two dimensional float array without NaN
+            'axis_length' -- the number of cells in each window
+            'extreme_function' -- either numpy.minimum or numpy.maximum
+    Returned Value: Returns an array with one column for each window start position
+    Preconditions: requires an array with at least as many columns as the window length
+    """
+
+    # Import packages
+    import numpy as np
+
+    # Pad columns to a multiple of the window length with a neutral value
+    rows, cols = values.shape
+    if extreme_function is np.minimum:
+        neutral = np.inf
+    else:
+        neutral = -np.inf
+    segments = -(-cols // axis_length)
+    padded = np.full((rows, segments * axis_length), neutral, dtype='float64')
+    padded[:, :cols] = values
+    shaped = padded.reshape(rows, segments, axis_length)
+
+    # Calculate prefix extremes forward and suffix extremes backward within each segment
+    forward = extreme_function.accumulate(shaped, axis=2).reshape(rows, -1)
+    backward = extreme_function.accumulate(shaped[:, :, ::-1], axis=2)[:, :, ::-1].reshape(rows, -1)
+
+    # Combine the suffix at the window start with the prefix at the window end
+    starts = cols - axis_length + 1
+    return extreme_function(backward[:, :starts], forward[:, axis_length - 1:axis_length - 1 + starts])
+
+# Define a function to calculate focal minimum and maximum
+def calculate_focal_extremes(values, axis_length, halo):
+    """
+    Description: calculates the focal minimum and maximum of a square neighborhood ignoring no data in the same way as the 'DATA' option of FocalStatistics, using separable running extremes along rows and then columns
+    Inputs: 'values' -- a float array with NaN as no data, padded by a halo
+            'axis_length' -- the number of cells along each axis of the neighborhood
+            'halo' -- the number of halo cells on each side of the array
+    Returned Value: Returns arrays of focal minimum and focal maximum for the cells inside the halo with NaN where the neighborhood has no data
+    Preconditions: requires a halo at least as large as half of the axis length
+    """
+
+    # Import packages
+    import numpy as np
+
+    # Define neighborhood extent and output shape
+    cells_before, cells_after = define_window(axis_length)
+    start = halo - cells_before
+    rows = values.shape[0] - 2 * halo
+    cols = values.shape[1] - 2 * halo
+
+    # Calculate separable running extremes with no data as neutral values
+    extreme_list = []
+    for extreme_function, neutral in [(np.minimum, np.inf), (np.maximum, -np.inf)]:
+        filled = np.where(np.isnan(values), neutral, values)
+        column_extreme = calculate_running_extreme(filled, axis_length, extreme_function)[:, start:start + cols]
+        focal_extreme = calculate_running_extreme(column_extreme.T, axis_length, extreme_function)[:, start:start + rows].T
+        extreme_list.append(np.where(np.isinf(focal_extreme), np.nan, focal_extreme))
+
+    return extreme_list[0], extreme_list[1]
+
+# Define a function to calculate focal variance
+def calculate_focal_variance(values, axis_length, halo):
+    """
+    Description: calculates the population variance of a square neighborhood ignoring no data from integral images of values and squared values, which is equal to the square of the 'STD' statistic of FocalStatistics
+    Inputs: 'values' -- a float array with NaN as no data, padded by a halo
+            'axis_length' -- the number of cells along each axis of the neighborhood
+            'halo' -- the number of halo cells on each side of the array
+    Returned Value: Returns an array of focal variance for the cells inside the halo with NaN where the neighborhood has no data
+    Preconditions: requires a halo at least as large as half of the axis length
+    """
+
+    # Import packages
+    import numpy as np
+
+    # Calculate integral images relative to the mean value to preserve precision
+    if np.isfinite(values).any():
+        offset = float(np.nanmean(values))
+    else:
+        offset = 0.0
+    value_integral, count_integral = calculate_integral_image(values, 1, offset)
+    square_integral = calculate_integral_image(values, 2, offset)[0]
+
+    # Calculate focal sums and counts
+    focal_sum = calculate_focal_sum(value_integral, axis_length, halo)
+    focal_square = calculate_focal_sum(square_integral, axis_length, halo)
+    focal_count = np.rint(calculate_focal_sum(count_integral, axis_length, halo))
+
+    # Calculate variance as the mean of squares minus the square of the mean
+    with np.errstate(invalid='ignore', divide='ignore'):
+        focal_mean = focal_sum / focal_count
+        focal_variance = np.maximum(focal_square / focal_count - focal_mean ** 2, 0.0)
+
+    return np.where(focal_count > 0, focal_variance, np.nan)
@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------------------------
+# Nibble nearest values
+# Author: Timm Nawrocki
+# Last Updated: 2026-10-17
+# Usage: Must be executed in a Python 3.8+ distribution with numpy, scipy, and rasterio. The raster object function must be executed in an ArcGIS Pro Python 3.6+ distribution.
+# Description: "Nibble nearest values" is a set of functions that replace masked cells with the value of the nearest unmasked cell in the same way as the Nibble tool. The nearest cell is found for all cells at once with an exact Euclidean distance transform, and rasters larger than memory can be processed in tiles with a bounded search radius.
+# ---------------------------------------------------------------------------
+
+# Define a function to nibble an array
+def nibble_nearest(values, mask=None, nibble_values='DATA_ONLY', nibble_nodata='PROCESS_NODATA', maximum_distance=None):
+    """
+    Description: replaces cells outside of the mask with the value of the nearest cell inside the mask
+    Inputs: 'values' -- a two dimensional float array with NaN as no data
+            'mask' -- an optional boolean array that is true for cells that keep their values (defaults to the data cells of the values)
+            'nibble_values' -- either 'DATA_ONLY' to take values only from data cells or 'ALL_VALUES' to also take no data from the nearest cell
+            'nibble_nodata' -- either 'PROCESS_NODATA' to also replace no data cells inside the mask or 'PRESERVE_NODATA' to keep them as no data
+            'maximum_distance' -- an optional distance in cells beyond which cells are not replaced and are set to no data
+    Returned Value: Returns a 64-bit float array with NaN as no data
+    Preconditions: requires a mask of the same shape as the values
+    """
+
+    # Import packages
+    import numpy as np
+    from scipy import ndimage
+
+    # Identify cells to replace and cells to take values from
+    valid = np.isfinite(values)
+    if mask is None:
+        mask = valid
+    targets = ~mask
+    if nibble_nodata == 'PROCESS_NODATA':
+        targets = targets | ~valid
+    sources = mask & ~targets
+    if nibble_values == 'DATA_ONLY':
+        sources = sources & valid
+
+    # Return no data for all targets if there are no sources
+    output_array = np.where(valid, values, np.nan).astype('float64')
+    if not targets.any():
+        return output_array
+    if not sources.any():
+        output_array[targets] = np.nan
+        return output_array
+
+    # Find the nearest source of every cell with an exact Euclidean distance transform
+    if maximum_distance is None:
+        nearest_index = ndimage.distance_transform_edt(~sources, return_distances=False, return_indices=True)
+    else:
+        distance, nearest_index = ndimage.distance_transform_edt(~sources, return_distances=True,
+                                                                 return_indices=True)
+    nearest_values = output_array[tuple(nearest_index)]
+
+    # Replace targets with the nearest values
+    output_array[targets] = nearest_values[targets]
+    if maximum_distance is not None:
+        output_array[targets & (distance > maximum_distance)] = np.nan
+
+    return output_array
+
+# Define a function to nibble a tile
+def nibble_tile(tile_arguments):
+    """
+    Description: nibbles a tile of an input raster read with a halo of the search radius so that the nearest values within the search radius are exact
+    Inputs: 'tile_arguments' -- a tuple of the input raster, the mask raster, the grid, the nibble values option, the nibble no data option, the halo in cells, the maximum distance in cells, and the start row, end row, start column, and end column of the tile
+    Returned Value: Returns the start row, the start column, and the nibbled tile
+    Preconditions: requires a grid dictionary from define_grid
+    """
+
+    # Import packages
+    import numpy as np
+    from package_Geomorphometry.rasterBlocks import read_block
+
+    # Parse tile arguments
+    (input_raster, mask_raster, grid, nibble_values, nibble_nodata, halo, maximum_distance,
+     row_start, row_end, col_start, col_end) = tile_arguments
+
+    # Read tile and mask with halo
+    values = read_block(input_raster, grid, row_start, row_end, halo, col_start, col_end)
+    if mask_raster is None:
+        mask = np.isfinite(values)
+    else:
+        mask = np.isfinite(read_block(mask_raster, grid, row_start, row_end, halo, col_start, col_end))
+
+    # Remove halo cells outside of the grid
+    row_index = np.arange(row_start - halo, row_end + halo)
+    col_index = np.arange(col_start - halo, col_end + halo)
+    outside = ((row_index < 0) | (row_index >= grid['height']))[:, np.newaxis] | \
+              ((col_index < 0) | (col_index >= grid['width']))[np.newaxis, :]
+    values[outside] = np.nan
+    mask[outside] = False
+
+    # Nibble tile and remove halo
+    nibble_array = nibble_nearest(values, mask, nibble_values, nibble_nodata, maximum_distance)
+    nibble_array[outside] = np.nan
+
+    return row_start, col_start, nibble_array[halo:halo + row_end - row_start, halo:halo + col_end - col_start]
+
+# Define a function to nibble a raster
+def nibble_raster(input_raster, mask_raster, output_raster, data_type, nibble_values='DATA_ONLY',
+                  nibble_nodata='PROCESS_NODATA', search_radius=None, tile_size=None, workers=None,
+                  grid_raster=None):
+    """
+    Description: nibbles a raster in the same way as the Nibble tool, either in memory or in tiles for rasters larger than memory
+    Inputs: 'input_raster' -- an input raster to nibble
+            'mask_raster' -- a raster in which no data marks the cells to replace (None to replace the no data cells of the input raster)
+            'output_raster' -- a file path for the output raster
+            'data_type' -- either '32_BIT_FLOAT' or '16_BIT_SIGNED'
+            'nibble_values' -- either 'DATA_ONLY' or 'ALL_VALUES'
+            'nibble_nodata' -- either 'PROCESS_NODATA' or 'PRESERVE_NODATA'
+            'search_radius' -- an optional distance in map units beyond which cells are not replaced (required for tiles)
+            'tile_size' -- an optional number of rows and columns per tile (None to nibble the whole raster in memory)
+            'workers' -- an optional number of processes for tiles (defaults to the number of processors)
+            'grid_raster' -- an optional raster that defines the output grid (defaults to the input raster)
+    Returned Value: Returns a raster dataset on disk
+    Preconditions: requires input and mask rasters that share the cell size and snap of the grid
+    """
+
+    # Import packages
+    from concurrent.futures import ProcessPoolExecutor
+    import math
+    from package_Geomorphometry.processTiles import map_tiles
+    from package_Geomorphometry.rasterBlocks import create_raster
+    from package_Geomorphometry.rasterBlocks import define_grid
+    from package_Geomorphometry.rasterBlocks import define_tiles
+    from package_Geomorphometry.rasterBlocks import write_block
+
+    # Define grid
+    if grid_raster is None:
+        grid_raster = input_raster
+    grid = define_grid(grid_raster)
+
+    # Define search radius in cells
+    if search_radius is None:
+        if tile_size is not None:
+            print('\t\tA search radius is required to nibble in tiles.')
+            quit()
+        halo = 0
+        maximum_distance = None
+    else:
+        halo = int(math.ceil(search_radius / grid['cell_size']))
+        maximum_distance = search_radius / grid['cell_size']
+
+    # Nibble raster
+    output_dataset = create_raster(output_raster, grid, data_type)
+    try:
+        if tile_size is None:
+            print('\t\tNibbling raster...')
+            nibble_array = nibble_tile((input_raster, mask_raster, grid, nibble_values, nibble_nodata, 0,
+                                        maximum_distance, 0, grid['height'], 0, grid['width']))[2]
+            write_block(output_dataset, nibble_array, 0)
+        else:
+            tile_list = define_tiles(grid, tile_size)
+            print(f'\t\tNibbling raster in {len(tile_list)} tiles...')
+            argument_list = [(input_raster, mask_raster, grid, nibble_values, nibble_nodata, halo,
+                              maximum_distance) + tile for tile in tile_list]
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                for row_start, col_start, nibble_array in map_tiles(executor, nibble_tile, argument_list, workers):
+                    write_block(output_dataset, nibble_array, row_start, col_start)
+    finally:
+        output_dataset.close()
+
+# Define a function to nibble an arcpy raster object
+def nibble_raster_object(input_raster, mask_raster, nibble_values='DATA_ONLY', nibble_nodata='PROCESS_NODATA'):
+    """
+    Description: nibbles an arcpy raster object with numpy and returns a raster object so that it can replace the Nibble tool in map algebra
+    Inputs: 'input_raster' -- an input raster object to nibble
+            'mask_raster' -- a raster object in which no data marks the cells to replace
+            'nibble_values' -- either 'DATA_ONLY' or 'ALL_VALUES'
+            'nibble_nodata' -- either 'PROCESS_NODATA' or 'PRESERVE_NODATA'
+    Returned Value: Returns a raster object with the extent and cell size of the input raster
+    Preconditions: requires raster objects that share the cell size and snap of the input raster
+    """
+
+    # Import packages
+    import arcpy
+    from arcpy.sa import IsNull
+    import numpy as np
+
+    # Read input raster and mask on the input grid
+    arcpy.env.outputCoordinateSystem = input_raster.spatialReference
+    lower_left = arcpy.Point(input_raster.extent.XMin, input_raster.extent.YMin)
+    rows = input_raster.height
+    cols = input_raster.width
+    values = arcpy.RasterToNumPyArray(input_raster, lower_left, cols, rows, 0).astype('float64')
+    values[arcpy.RasterToNumPyArray(IsNull(input_raster), lower_left, cols, rows, 1) == 1] = np.nan
+    mask = arcpy.RasterToNumPyArray(IsNull(mask_raster), lower_left, cols, rows, 1) == 0
+
+    # Nibble values
+    nibble_array = nibble_nearest(values, mask, nibble_values, nibble_nodata)
+
+    # Convert nibbled values to a raster object of the input type
+    if input_raster.isInteger:
+        nibble_array = np.where(np.isfinite(nibble_array), nibble_array, -2147483648).astype('int32')
+        output_raster = arcpy.NumPyArrayToRaster(nibble_array, lower_left, input_raster.meanCellWidth,
+                                                 input_raster.meanCellHeight, -2147483648)
+    else:
+        output_raster = arcpy.NumPyArrayToRaster(nibble_array.astype('float32'), lower_left,
+                                                 input_raster.meanCellWidth, input_raster.meanCellHeight, np.nan)
+
+    return output_raster
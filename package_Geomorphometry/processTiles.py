@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------------------------
+# Process tiles
+# Author: Timm Nawrocki
+# Last Updated: 2026-10-17
+# Usage: Must be executed in a Python 3.8+ distribution with numpy and rasterio.
+# Description: "Process tiles" is a set of functions that apply a focal operator to the grid of a study area raster in haloed tiles. Each worker process reads only its own tile padded by the halo of the operator, the operator returns arrays for the tile without the halo, and the results are written into preallocated output rasters so that memory is bounded by the tile size and throughput scales with the number of processes. Existing output rasters can be patched in place for only the windows affected by changed input data.
+# ---------------------------------------------------------------------------
+
+# Define a function to split the grid into processing windows
+def define_windows(grid, tile_size=None, block_rows=512):
+    """
+    Description: splits a grid into square tiles or into row blocks that span the width of the grid
+    Inputs: 'grid' -- a grid dictionary from define_grid
+            'tile_size' -- an optional number of rows and columns per tile (None to use row blocks)
+            'block_rows' -- the number of rows per block if no tile size is specified
+    Returned Value: Returns a list of tuples of start row, end row, start column, and end column for each window
+    Preconditions: requires a grid dictionary
+    """
+
+    # Import packages
+    from package_Geomorphometry.rasterBlocks import define_blocks
+    from package_Geomorphometry.rasterBlocks import define_tiles
+
+    # Define windows
+    if tile_size is None:
+        window_list = [(row_start, row_end, 0, grid['width'])
+                       for row_start, row_end in define_blocks(grid, block_rows)]
+    else:
+        window_list = define_tiles(grid, tile_size)
+
+    return window_list
+
+# Define a function to split update extents into processing windows
+def define_update_windows(grid, update_extents, halo, tile_size=1024):
+    """
+    Description: converts map extents of changed input data into disjoint windows of the grid that contain every cell whose neighborhood overlaps the changed data
+    Inputs: 'grid' -- a grid dictionary from define_grid
+            'update_extents' -- a list of tuples of minimum x, minimum y, maximum x, and maximum y of changed input data
+            'halo' -- the number of cells that the operator reads beyond each side of a cell
+            'tile_size' -- the maximum number of rows and columns per window
+    Returned Value: Returns a list of tuples of start row, end row, start column, and end column for each window
+    Preconditions: requires extents in the coordinate system of the grid
+    """
+
+    # Import packages
+    import math
+    from package_Geomorphometry.rasterBlocks import define_tiles
+
+    # Convert extents to cell ranges expanded by the halo
+    left = grid['transform'].c
+    top = grid['transform'].f
+    cell_size = grid['cell_size']
+    extent_windows = []
+    for x_minimum, y_minimum, x_maximum, y_maximum in update_extents:
+        row_start = max(int(math.floor((top - y_maximum) / cell_size)) - halo, 0)
+        row_end = min(int(math.ceil((top - y_minimum) / cell_size)) + halo, grid['height'])
+        col_start = max(int(math.floor((x_minimum - left) / cell_size)) - halo, 0)
+        col_end = min(int(math.ceil((x_maximum - left) / cell_size)) + halo, grid['width'])
+        if row_end > row_start and col_end > col_start:
+            extent_windows.append((row_start, row_end, col_start, col_end))
+
+    # Combine the parts of extents within each tile so that windows do not overlap
+    window_list = []
+    for tile_row_start, tile_row_end, tile_col_start, tile_col_end in define_tiles(grid, tile_size):
+        intersections = [(max(row_start, tile_row_start), min(row_end, tile_row_end),
+                          max(col_start, tile_col_start), min(col_end, tile_col_end))
+                         for row_start, row_end, col_start, col_end in extent_windows]
+        intersections = [window for window in intersections if window[1] > window[0] and window[3] > window[2]]
+        if len(intersections) > 0:
+            window_list.append((min([window[0] for window in intersections]),
+                                max([window[1] for window in intersections]),
+                                min([window[2] for window in intersections]),
+                                max([window[3] for window in intersections])))
+
+    return window_list
+
+# Define a function to map tiles to a process pool with bounded memory
+def map_tiles(executor, tile_function, argument_list, workers=None):
+    """
+    Description: submits tiles to a process pool and yields the result of each tile as it completes, keeping at most two tiles per process in flight so that finished tiles do not accumulate in memory
+    Inputs: 'executor' -- an open ProcessPoolExecutor
+            'tile_function' -- a module-level function that processes the arguments of a tile
+            'argument_list' -- a list of the arguments of each tile
+            'workers' -- the number of processes of the executor (defaults to all cores)
+    Returned Value: Returns a generator of tile results in the order in which they complete
+    Preconditions: requires a tile function that can be pickled
+    """
+
+    # Import packages
+    from concurrent.futures import as_completed
+    import os
+
+    # Submit the first window of tiles
+    window_size = 2 * (workers or os.cpu_count())
+    running_tiles = set([executor.submit(tile_function, arguments) for arguments in argument_list[:window_size]])
+    next_tile = window_size
+
+    # Yield each tile as it completes and submit the next tile in its place
+    while len(running_tiles) > 0:
+        finished_tile = next(as_completed(running_tiles))
+        running_tiles.remove(finished_tile)
+        if next_tile < len(argument_list):
+            running_tiles.add(executor.submit(tile_function, argument_list[next_tile]))
+            next_tile += 1
+        yield finished_tile.result()
+
+# Define a function to process a single tile
+def process_tile(tile_arguments):
+    """
+    Description: reads each input raster for a tile with a halo and applies a focal operator to the tile
+    Inputs: 'tile_arguments' -- a tuple of the tile function, the list of input rasters, the area raster, the grid, the halo, a tuple of additional function arguments, and the start row, end row, start column, and end column of the tile
+    Returned Value: Returns the start row, the start column, and the list of output arrays of the tile
+    Preconditions: requires a tile function defined at module level that accepts the list of haloed input arrays, the study area mask of the tile, the grid, the halo, and the additional function arguments and returns a list of arrays without the halo
+    """
+
+    # Import packages
+    from package_Geomorphometry.rasterBlocks import read_block
+    from package_Geomorphometry.rasterBlocks import read_mask
+
+    # Parse tile arguments
+    (tile_function, input_rasters, area_raster, grid, halo, function_arguments,
+     row_start, row_end, col_start, col_end) = tile_arguments
+
+    # Read inputs with halo and study area mask without halo
+    input_tiles = [read_block(input_raster, grid, row_start, row_end, halo, col_start, col_end)
+                   for input_raster in input_rasters]
+    area_mask = read_mask(area_raster, grid, row_start, row_end, col_start, col_end)
+
+    # Apply focal operator
+    output_tiles = tile_function(input_tiles, area_mask, grid, halo, *function_arguments)
+
+    return row_start, col_start, output_tiles
+
+# Define a function to process a raster in tiles
+def process_tiles(area_raster, input_rasters, tile_function, function_arguments, halo, output_rasters, data_types,
+                  label, tile_size=None, block_rows=512, workers=None, update_extents=None):
+    """
+    Description: applies a focal operator to haloed tiles in parallel and writes the results into preallocated output rasters
+    Inputs: 'area_raster' -- a raster of the study area to set snap raster and extract area
+            'input_rasters' -- a list of input rasters snapped to the grid of the area raster
+            'tile_function' -- a module-level function that calculates the outputs of a tile
+            'function_arguments' -- a tuple of additional arguments passed to the tile function
+            'halo' -- the number of cells that the operator reads beyond each side of a tile
+            'output_rasters' -- a list of file paths for the output rasters in the order returned by the tile function
+            'data_types' -- a list of data types of either '32_BIT_FLOAT' or '16_BIT_SIGNED' in the order of the output rasters
+            'label' -- a string describing the operator for progress messages
+            'tile_size' -- an optional number of rows and columns per tile (None to use row blocks)
+            'block_rows' -- the number of rows per block if no tile size is specified
+            'workers' -- the number of processes to use (defaults to all cores)
+            'update_extents' -- an optional list of map extents of changed input data for which existing output rasters are patched in place instead of created
+    Returned Value: Returns raster datasets on disk
+    Preconditions: requires input rasters with the same cell size as the area raster
+    """
+
+    # Import packages
+    from concurrent.futures import ProcessPoolExecutor
+    from package_Geomorphometry.rasterBlocks import create_raster
+    from package_Geomorphometry.rasterBlocks import define_grid
+    from package_Geomorphometry.rasterBlocks import write_block
+    import rasterio
+
+    # Define grid from area raster
+    grid = define_grid(area_raster)
+
+    # Define tiles
+    if update_extents is None:
+        window_list = define_windows(grid, tile_size, block_rows)
+    else:
+        window_list = define_update_windows(grid, update_extents, halo, tile_size or 1024)
+    argument_list = [(tile_function, input_rasters, area_raster, grid, halo, function_arguments) + window
+                     for window in window_list]
+
+    # Create output rasters or open existing output rasters to patch
+    if update_extents is None:
+        output_datasets = [create_raster(output_raster, grid, data_type)
+                           for output_raster, data_type in zip(output_rasters, data_types)]
+    else:
+        output_datasets = [rasterio.open(output_raster, 'r+') for output_raster in output_rasters]
+
+    # Calculate tiles in parallel and write results
+    print(f'\t\tCalculating {label} for {len(window_list)} tiles...')
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for row_start, col_start, output_tiles in map_tiles(executor, process_tile, argument_list, workers):
+                for output_dataset, output_tile in zip(output_datasets, output_tiles):
+                    write_block(output_dataset, output_tile, row_start, col_start)
+    finally:
+        for output_dataset in output_datasets:
+            output_dataset.close()
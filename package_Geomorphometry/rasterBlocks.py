@@ -0,0 +1,270 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------------------------
+# Raster block input and output
+# Author: Timm Nawrocki
+# Last Updated: 2026-10-17
+# Usage: Must be executed in a Python 3.8+ distribution with numpy and rasterio.
+# Description: "Raster block input and output" is a set of functions that read and write row blocks of rasters on the grid of a study area raster so that topographic properties can be calculated with numpy instead of arcpy. Existing rasters can be patched in place for the cells of a changed region.
+# ---------------------------------------------------------------------------
+
+# Define a function to describe the grid of the study area raster
+def define_grid(area_raster):
+    """
+    Description: describes the grid of an area raster that will be used as the snap raster, extent, and mask of array-based outputs
+    Inputs: 'area_raster' -- a raster of the study area to set snap raster and extract area
+    Returned Value: Returns a dictionary of the transform, width, height, coordinate system, cell size, and linear unit factor of the grid
+    Preconditions: requires an area raster in a projected coordinate system
+    """
+
+    # Import packages
+    import rasterio
+
+    # Describe area raster
+    with rasterio.open(area_raster) as area_dataset:
+        crs = area_dataset.crs
+        unit_factor = 1.0
+        if crs is not None and crs.is_projected:
+            unit_factor = float(crs.linear_units_factor[1])
+        grid = {'transform': area_dataset.transform,
+                'width': area_dataset.width,
+                'height': area_dataset.height,
+                'crs': crs,
+                'cell_size': float(area_dataset.transform.a),
+                'unit_factor': unit_factor}
+
+    return grid
+
+# Define a function to split the grid into row blocks
+def define_blocks(grid, block_rows):
+    """
+    Description: splits the rows of a grid into blocks of a fixed number of rows
+    Inputs: 'grid' -- a grid dictionary from define_grid
+            'block_rows' -- the number of rows to process per block
+    Returned Value: Returns a list of tuples of start row and end row for each block
+    Preconditions: requires a grid dictionary
+    """
+
+    # Create list of row ranges
+    block_list = []
+    for row_start in range(0, grid['height'], block_rows):
+        row_end = min(row_start + block_rows, grid['height'])
+        block_list.append((row_start, row_end))
+
+    return block_list
+
+# Define a function to split the grid into square tiles
+def define_tiles(grid, tile_size):
+    """
+    Description: splits a grid into square tiles of a fixed number of cells per side
+    Inputs: 'grid' -- a grid dictionary from define_grid
+            'tile_size' -- the number of rows and columns to process per tile
+    Returned Value: Returns a list of tuples of start row, end row, start column, and end column for each tile
+    Preconditions: requires a grid dictionary
+    """
+
+    # Create list of tile ranges
+    tile_list = []
+    for row_start in range(0, grid['height'], tile_size):
+        row_end = min(row_start + tile_size, grid['height'])
+        for col_start in range(0, grid['width'], tile_size):
+            col_end = min(col_start + tile_size, grid['width'])
+            tile_list.append((row_start, row_end, col_start, col_end))
+
+    return tile_list
+
+# Define a function to read a block of an input raster on the grid
+def read_block(input_raster, grid, row_start, row_end, halo=0, col_start=0, col_end=None):
+    """
+    Description: reads a block of rows from an input raster aligned to the grid, padded on all sides by a halo of cells
+    Inputs: 'input_raster' -- a single band raster snapped to the grid with the same cell size
+            'grid' -- a grid dictionary from define_grid
+            'row_start' -- the first grid row of the block
+            'row_end' -- the grid row after the last row of the block
+            'halo' -- the number of cells to pad the block on each side
+            'col_start' -- the first grid column of the block
+            'col_end' -- the grid column after the last column of the block (defaults to the grid width)
+    Returned Value: Returns a 64-bit float array in which no data and cells outside the input raster are NaN
+    Preconditions: requires an input raster that shares the cell size and snap of the grid
+    """
+
+    # Import packages
+    import numpy as np
+    import rasterio
+    from rasterio.windows import Window
+
+    # Set default column range
+    if col_end is None:
+        col_end = grid['width']
+
+    # Create output array of no data
+    block_height = row_end - row_start + 2 * halo
+    block_width = col_end - col_start + 2 * halo
+    block = np.full((block_height, block_width), np.nan, dtype='float64')
+
+    with rasterio.open(input_raster) as input_dataset:
+        # Calculate offset of grid origin in input cells
+        input_transform = input_dataset.transform
+        col_offset = int(round((grid['transform'].c - input_transform.c) / input_transform.a))
+        row_offset = int(round((grid['transform'].f - input_transform.f) / input_transform.e))
+
+        # Calculate requested window in input cells
+        input_row = row_offset + row_start - halo
+        input_col = col_offset + col_start - halo
+
+        # Intersect the requested window with the input raster
+        read_row_start = max(input_row, 0)
+        read_col_start = max(input_col, 0)
+        read_row_end = min(input_row + block_height, input_dataset.height)
+        read_col_end = min(input_col + block_width, input_dataset.width)
+        if read_row_end <= read_row_start or read_col_end <= read_col_start:
+            return block
+
+        # Read the intersection and convert no data to NaN
+        window = Window(read_col_start, read_row_start,
+                        read_col_end - read_col_start, read_row_end - read_row_start)
+        values = input_dataset.read(1, window=window, masked=True)
+        values = values.astype('float64').filled(np.nan)
+
+    # Place values in output array
+    block[read_row_start - input_row:read_row_end - input_row,
+          read_col_start - input_col:read_col_end - input_col] = values
+
+    return block
+
+# Define a function to read the study area mask of a block
+def read_mask(area_raster, grid, row_start, row_end, col_start=0, col_end=None):
+    """
+    Description: reads a block of the study area raster as a boolean mask of data cells
+    Inputs: 'area_raster' -- a raster of the study area to set snap raster and extract area
+            'grid' -- a grid dictionary from define_grid
+            'row_start' -- the first grid row of the block
+            'row_end' -- the grid row after the last row of the block
+            'col_start' -- the first grid column of the block
+            'col_end' -- the grid column after the last column of the block (defaults to the grid width)
+    Returned Value: Returns a boolean array that is true inside the study area
+    Preconditions: requires the area raster used to define the grid
+    """
+
+    # Import packages
+    import numpy as np
+
+    # Read area raster
+    area_block = read_block(area_raster, grid, row_start, row_end, 0, col_start, col_end)
+
+    return np.isfinite(area_block)
+
+# Define a function to create an output raster on the grid
+def create_raster(output_raster, grid, data_type):
+    """
+    Description: creates an empty GeoTIFF on the grid for block writing
+    Inputs: 'output_raster' -- a file path for the output raster
+            'grid' -- a grid dictionary from define_grid
+            'data_type' -- either '32_BIT_FLOAT' or '16_BIT_SIGNED'
+    Returned Value: Returns an open rasterio dataset in write mode that must be closed by the caller
+    Preconditions: requires a grid dictionary
+    """
+
+    # Import packages
+    import rasterio
+
+    # Assign bit depth and no data value
+    if data_type == '32_BIT_FLOAT':
+        dtype = 'float32'
+        no_data_value = -2147483648
+    else:
+        dtype = 'int16'
+        no_data_value = -32768
+
+    # Open output dataset
+    output_dataset = rasterio.open(output_raster,
+                                   'w',
+                                   driver='GTiff',
+                                   width=grid['width'],
+                                   height=grid['height'],
+                                   count=1,
+                                   dtype=dtype,
+                                   nodata=no_data_value,
+                                   crs=grid['crs'],
+                                   transform=grid['transform'],
+                                   tiled=True,
+                                   blockxsize=256,
+                                   blockysize=256,
+                                   compress='lzw',
+                                   BIGTIFF='IF_SAFER')
+
+    return output_dataset
+
+# Define a function to write a block to an output raster
+def write_block(output_dataset, values, row_start, col_start=0):
+    """
+    Description: writes a block of values into an open output raster, converting NaN to the no data value of the raster
+    Inputs: 'output_dataset' -- an open dataset from create_raster
+            'values' -- an array of values to write
+            'row_start' -- the first grid row of the block
+            'col_start' -- the first grid column of the block
+    Returned Value: Writes the block to the output raster
+    Preconditions: requires an output dataset from create_raster
+    """
+
+    # Import packages
+    import numpy as np
+    from rasterio.windows import Window
+
+    # Convert NaN in float blocks to no data
+    if values.dtype.kind == 'f':
+        values = np.where(np.isfinite(values), values, output_dataset.nodata).astype(output_dataset.dtypes[0])
+
+    # Write block
+    window = Window(col_start, row_start, values.shape[1], values.shape[0])
+    output_dataset.write(values, 1, window=window)
+
+# Define a function to patch the cells of a region into an existing raster
+def write_region(output_raster, values, region, row_start, col_start=0):
+    """
+    Description: replaces the cells of a region within a window of an existing raster and keeps the other cells of the window
+    Inputs: 'output_raster' -- an existing raster created with create_raster
+            'values' -- an array of values for the window with NaN as no data in float arrays
+            'region' -- a boolean array of the shape of the values that is true for the cells to replace
+            'row_start' -- the first grid row of the window
+            'col_start' -- the first grid column of the window
+    Returned Value: Writes the window to the existing raster
+    Preconditions: requires an existing raster on the grid of the window
+    """
+
+    # Import packages
+    import numpy as np
+    import rasterio
+    from rasterio.windows import Window
+
+    # Replace the region within the existing window
+    with rasterio.open(output_raster, 'r+') as output_dataset:
+        window = Window(col_start, row_start, values.shape[1], values.shape[0])
+        window_values = output_dataset.read(1, window=window)
+        if values.dtype.kind == 'f':
+            values = np.where(np.isfinite(values), values, output_dataset.nodata)
+        window_values[region] = values[region].astype(output_dataset.dtypes[0])
+        output_dataset.write(window_values, 1, window=window)
+
+# Define a function to convert float values to 16-bit integers
+def convert_integer(values, conversion_factor, mask):
+    """
+    Description: converts float values to 16-bit signed integers in the same way as Int((raster * conversion_factor) + 0.5) and extracts them to the study area
+    Inputs: 'values' -- an array of float values
+            'conversion_factor' -- an integer to be multiplied with the values for conversion to integer
+            'mask' -- a boolean array that is true inside the study area
+    Returned Value: Returns a 16-bit signed array with -32768 as no data
+    Preconditions: requires float values and a mask of the same shape
+    """
+
+    # Import packages
+    import numpy as np
+
+    # Truncate scaled values towards zero as in arcpy Int
+    scaled = np.trunc(values * conversion_factor + 0.5)
+    valid = mask & np.isfinite(scaled)
+
+    # Limit values to the 16-bit signed range
+    integer_values = np.full(values.shape, -32768, dtype='int16')
+    integer_values[valid] = np.clip(scaled[valid], -32767, 32767).astype('int16')
+
+    return integer_values
@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------------------------
+# Route flow with D8
+# Author: Timm Nawrocki
+# Last Updated: 2026-10-17
+# Usage: Must be executed in a Python 3.8+ distribution with numpy and numba.
+# Description: "Route flow with D8" is a set of functions that calculate D8 flow direction and flow accumulation from a filled elevation array without arcpy. Flow directions use the same codes as the FlowDirection tool, flats are drained towards their outlets, and flow is accumulated in topological order so that the cost is linear in the number of cells.
+# ---------------------------------------------------------------------------
+
+# Import packages at module level so that the routing kernels can be compiled with numba
+import numpy as np
+from numba import njit
+
+# Define neighbor offsets and direction codes in the order east, southeast, south, southwest, west, northwest, north, northeast
+ROW_OFFSETS = np.array([0, 1, 1, 1, 0, -1, -1, -1])
+COL_OFFSETS = np.array([1, 1, 0, -1, -1, -1, 0, 1])
+DIRECTION_CODES = np.array([1, 2, 4, 8, 16, 32, 64, 128])
+
+# Define a function to drain flats towards their outlets
+@njit(cache=True)
+def drain_flats(elevation, direction, rows, cols):
+    """
+    Description: assigns flow directions to cells on flats by searching outward from cells that already drain across cells of equal elevation, so that each flat cell flows along the shortest path to an outlet of the flat
+    Inputs: 'elevation' -- a flattened 64-bit float elevation array
+            'direction' -- a flattened integer array of D8 direction codes with 0 for undefined directions and -1 for no data that is modified in place
+            'rows' -- the number of rows in the elevation array
+            'cols' -- the number of columns in the elevation array
+    Returned Value: Returns the direction array
+    Preconditions: this function is compiled with numba
+    """
+
+    # Add draining cells to the queue
+    queue = np.empty(rows * cols, dtype=np.int64)
+    queue_end = 0
+    for cell in range(rows * cols):
+        if direction[cell] > 0:
+            queue[queue_end] = cell
+            queue_end += 1
+
+    # Search outward across cells of equal elevation
+    queue_start = 0
+    while queue_start < queue_end:
+        cell = queue[queue_start]
+        queue_start += 1
+        cell_row = cell // cols
+        cell_col = cell % cols
+        for neighbor_number in range(8):
+            neighbor_row = cell_row + ROW_OFFSETS[neighbor_number]
+            neighbor_col = cell_col + COL_OFFSETS[neighbor_number]
+            if neighbor_row < 0 or neighbor_row >= rows or neighbor_col < 0 or neighbor_col >= cols:
+                continue
+            neighbor = neighbor_row * cols + neighbor_col
+            if direction[neighbor] != 0 or elevation[neighbor] != elevation[cell]:
+                continue
+            direction[neighbor] = DIRECTION_CODES[(neighbor_number + 4) % 8]
+            queue[queue_end] = neighbor
+            queue_end += 1
+
+    return direction
+
+# Define a function to order cells from upstream to downstream
+@njit(cache=True)
+def order_flow(receivers):
+    """
+    Description: orders cells so that every cell comes before the cell it flows into using Kahn's algorithm on the count of donors of each cell
+    Inputs: 'receivers' -- a flattened integer array of the cell that each cell flows into with -1 for cells that do not flow into another cell
+    Returned Value: Returns an array of cell indices in topological order
+    Preconditions: requires receivers without cycles; this function is compiled with numba
+    """
+
+    # Count the donors of each cell
+    cell_count = len(receivers)
+    donor_count = np.zeros(cell_count, dtype=np.int64)
+    for cell in range(cell_count):
+        if receivers[cell] >= 0:
+            donor_count[receivers[cell]] += 1
+
+    # Add cells without donors to the order
+    order = np.empty(cell_count, dtype=np.int64)
+    order_end = 0
+    for cell in range(cell_count):
+        if donor_count[cell] == 0:
+            order[order_end] = cell
+            order_end += 1
+
+    # Add each receiver once all of its donors are ordered
+    order_start = 0
+    while order_start < order_end:
+        receiver = receivers[order[order_start]]
+        order_start += 1
+        if receiver >= 0:
+            donor_count[receiver] -= 1
+            if donor_count[receiver] == 0:
+                order[order_end] = receiver
+                order_end += 1
+
+    return order[:order_end]
+
+# Define a function to accumulate flow in topological order
+@njit(cache=True)
+def accumulate_flow(receivers, order, weights):
+    """
+    Description: accumulates the weights of all upstream cells into each cell in the same way as the FlowAccumulation tool
+    Inputs: 'receivers' -- a flattened integer array of the cell that each cell flows into with -1 for cells that do not flow into another cell
+            'order' -- an array of cell indices in topological order from order_flow
+            'weights' -- a flattened 64-bit float array of the weight of each cell
+    Returned Value: Returns a 64-bit float array of accumulated upstream weights, excluding the weight of each cell itself
+    Preconditions: this function is compiled with numba
+    """
+
+    # Pass the accumulated weight of each cell to its receiver
+    accumulation = np.zeros(len(receivers))
+    for cell in order:
+        receiver = receivers[cell]
+        if receiver >= 0:
+            accumulation[receiver] += accumulation[cell] + weights[cell]
+
+    return accumulation
+
+# Define a function to calculate D8 flow direction
+def calculate_direction_d8(elevation, cell_size):
+    """
+    Description: calculates D8 flow direction codes in the same way as the 'NORMAL' option of the FlowDirection tool, assigning each cell the direction of steepest descent, draining flats towards their outlets, and letting cells on the edge of the data flow out of the raster when no neighbor is lower
+    Inputs: 'elevation' -- a two dimensional filled elevation array with NaN as no data
+            'cell_size' -- the cell size of the elevation array in the horizontal units of the elevation
+    Returned Value: Returns a 32-bit integer array of direction codes (1, 2, 4, 8, 16, 32, 64, 128) with 0 for sinks and -1 for no data
+    Preconditions: requires a filled elevation array
+    """
+
+    # Import packages
+    import numpy as np
+
+    # Pad elevation with no data
+    rows, cols = elevation.shape
+    padded = np.full((rows + 2, cols + 2), np.nan)
+    padded[1:-1, 1:-1] = elevation
+    valid = np.isfinite(elevation)
+
+    # Calculate the drop to each neighbor per unit distance
+    drop_list = []
+    for row_offset, col_offset in zip(ROW_OFFSETS, COL_OFFSETS):
+        neighbor = padded[1 + row_offset:rows + 1 + row_offset, 1 + col_offset:cols + 1 + col_offset]
+        distance = cell_size * np.hypot(row_offset, col_offset)
+        drop_list.append((elevation - neighbor) / distance)
+    drops = np.stack(drop_list)
+    edge_cells = valid & np.isnan(drops).any(axis=0)
+    drops = np.where(np.isnan(drops), -np.inf, drops)
+
+    # Assign the direction of steepest descent to cells with a lower neighbor
+    steepest = np.argmax(drops, axis=0)
+    maximum_drop = np.take_along_axis(drops, steepest[np.newaxis], axis=0)[0]
+    direction = np.where(maximum_drop > 0, DIRECTION_CODES[steepest], 0).astype('int32')
+
+    # Let edge cells without a lower neighbor flow out of the raster towards no data
+    outward = edge_cells & (direction == 0)
+    no_data_neighbor = np.argmax(drops == -np.inf, axis=0)
+    direction[outward] = DIRECTION_CODES[no_data_neighbor[outward]]
+    direction[~valid] = -1
+
+    # Drain flats towards their outlets
+    direction = drain_flats(np.where(valid, elevation, np.nan).ravel().astype('float64'),
+                            direction.ravel(), rows, cols).reshape(rows, cols)
+
+    return direction
+
+# Define a function to convert D8 direction codes to receiver indices
+def define_receivers_d8(direction):
+    """
+    Description: converts D8 direction codes to the flattened index of the cell that each cell flows into
+    Inputs: 'direction' -- a two dimensional array of D8 direction codes from calculate_direction_d8
+    Returned Value: Returns a flattened 64-bit integer array of receivers with -1 for cells that flow out of the raster, sinks, and no data
+    Preconditions: requires a direction array from calculate_direction_d8
+    """
+
+    # Import packages
+    import numpy as np
+
+    # Locate the neighbor in the direction of flow
+    rows, cols = direction.shape
+    row_index, col_index = np.indices((rows, cols))
+    receiver_rows = row_index.copy()
+    receiver_cols = col_index.copy()
+    for row_offset, col_offset, direction_code in zip(ROW_OFFSETS, COL_OFFSETS, DIRECTION_CODES):
+        selection = direction == direction_code
+        receiver_rows[selection] += row_offset
+        receiver_cols[selection] += col_offset
+
+    # Remove receivers outside of the raster, sinks, and no data
+    inside = (receiver_rows >= 0) & (receiver_rows < rows) & (receiver_cols >= 0) & (receiver_cols < cols)
+    receivers = np.where(inside & (direction > 0), receiver_rows * cols + receiver_cols, -1).ravel()
+    valid_receivers = receivers >= 0
+    receivers[valid_receivers] = np.where(direction.ravel()[receivers[valid_receivers]] >= 0,
+                                          receivers[valid_receivers], -1)
+
+    return receivers.astype('int64')
+
+# Define a function to calculate D8 flow accumulation
+def calculate_accumulation_d8(direction, receivers, weights=None):
+    """
+    Description: calculates float flow accumulation from D8 receivers in the same way as FlowAccumulation with 'FLOAT' and 'D8'
+    Inputs: 'direction' -- a two dimensional array of D8 direction codes from calculate_direction_d8
+            'receivers' -- a flattened receiver array from define_receivers_d8
+            'weights' -- an optional two dimensional array of the weight of each cell (defaults to one for each cell)
+    Returned Value: Returns the topological order of the cells and a 32-bit float flow accumulation array with NaN as no data
+    Preconditions: requires direction and receiver arrays of the same grid
+    """
+
+    # Import packages
+    import numpy as np
+
+    # Accumulate flow in topological order
+    order = order_flow(receivers)
+    if weights is None:
+        weights = np.ones(direction.shape)
+    weights = np.where(direction >= 0, weights, 0).ravel().astype('float64')
+    accumulation = accumulate_flow(receivers, order, weights).reshape(direction.shape)
+    accumulation = np.where(direction >= 0, accumulation, np.nan).astype('float32')
+
+    return order, accumulation
+
+# Define a function to calculate D8 flow direction and accumulation
+def calculate_flow_d8(elevation, cell_size, weights=None):
+    """
+    Description: calculates D8 flow direction and float flow accumulation in the same way as FlowDirection with 'D8' followed by FlowAccumulation with 'FLOAT'
+    Inputs: 'elevation' -- a two dimensional filled elevation array with NaN as no data
+            'cell_size' -- the cell size of the elevation array in the horizontal units of the elevation
+            'weights' -- an optional two dimensional array of the weight of each cell (defaults to one for each cell)
+    Returned Value: Returns the direction array, the flattened receiver array, the topological order, and a 32-bit float flow accumulation array with NaN as no data
+    Preconditions: requires a filled elevation array
+    """
+
+    # Calculate flow direction and receivers
+    direction = calculate_direction_d8(elevation, cell_size)
+    receivers = define_receivers_d8(direction)
+
+    # Calculate flow accumulation
+    order, accumulation = calculate_accumulation_d8(direction, receivers, weights)
+
+    return direction, receivers, order, accumulation
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------------------------
+# Route flow with D-infinity
+# Author: Timm Nawrocki
+# Last Updated: 2026-10-17
+# Usage: Must be executed in a Python 3.8+ distribution with numpy and numba.
+# Description: "Route flow with D-infinity" is a set of functions that calculate D-infinity flow direction and flow accumulation from a filled elevation array without arcpy using the triangular facet method of Tarboton (1997). Flow directions are calculated for all cells at once, and flow is divided between the two receivers of each cell in topological order so that the cost is linear in the number of cells.
+# ---------------------------------------------------------------------------
+
+# Import packages at module level so that the accumulation kernel can be compiled with numba
+import numpy as np
+from numba import njit
+
+# Define the triangular facets as the offsets of the cardinal and diagonal neighbors and the angle multipliers of Tarboton (1997)
+FACETS = [((0, 1), (-1, 1), 0, 1),
+          ((-1, 0), (-1, 1), 1, -1),
+          ((-1, 0), (-1, -1), 1, 1),
+          ((0, -1), (-1, -1), 2, -1),
+          ((0, -1), (1, -1), 2, 1),
+          ((1, 0), (1, -1), 3, -1),
+          ((1, 0), (1, 1), 3, 1),
+          ((0, 1), (1, 1), 4, -1)]
+
+# Define a function to accumulate divided flow in topological order
+@njit(cache=True)
+def accumulate_flow_dinf(receivers_a, receivers_b, proportions_a, weights):
+    """
+    Description: accumulates the weights of all upstream cells into each cell with each cell passing its flow to up to two receivers, ordering cells with Kahn's algorithm on the count of donors of each cell
+    Inputs: 'receivers_a' -- a flattened integer array of the first receiver of each cell with -1 for no receiver
+            'receivers_b' -- a flattened integer array of the second receiver of each cell with -1 for no receiver
+            'proportions_a' -- a flattened float array of the proportion of flow passed to the first receiver
+            'weights' -- a flattened 64-bit float array of the weight of each cell
+    Returned Value: Returns a 64-bit float array of accumulated upstream weights, excluding the weight of each cell itself
+    Preconditions: requires receivers that are strictly downslope or drain flats so that there are no cycles; this function is compiled with numba
+    """
+
+    # Count the donors of each cell
+    cell_count = len(receivers_a)
+    donor_count = np.zeros(cell_count, dtype=np.int64)
+    for cell in range(cell_count):
+        if receivers_a[cell] >= 0 and proportions_a[cell] > 0:
+            donor_count[receivers_a[cell]] += 1
+        if receivers_b[cell] >= 0 and proportions_a[cell] < 1:
+            donor_count[receivers_b[cell]] += 1
+
+    # Add cells without donors to the queue
+    queue = np.empty(cell_count, dtype=np.int64)
+    queue_end = 0
+    for cell in range(cell_count):
+        if donor_count[cell] == 0:
+            queue[queue_end] = cell
+            queue_end += 1
+
+    # Pass the accumulated weight of each cell to its receivers once all of its donors are processed
+    accumulation = np.zeros(cell_count)
+    queue_start = 0
+    while queue_start < queue_end:
+        cell = queue[queue_start]
+        queue_start += 1
+        total = accumulation[cell] + weights[cell]
+        receiver = receivers_a[cell]
+        if receiver >= 0 and proportions_a[cell] > 0:
+            accumulation[receiver] += total * proportions_a[cell]
+            donor_count[receiver] -= 1
+            if donor_count[receiver] == 0:
+                queue[queue_end] = receiver
+                queue_end += 1
+        receiver = receivers_b[cell]
+        if receiver >= 0 and proportions_a[cell] < 1:
+            accumulation[receiver] += total * (1 - proportions_a[cell])
+            donor_count[receiver] -= 1
+            if donor_count[receiver] == 0:
+                queue[queue_end] = receiver
+                queue_end += 1
+
+    return accumulation
+
+# Define a function to calculate D-infinity flow direction
+def calculate_direction_dinf(elevation, cell_size):
+    """
+    Description: calculates D-infinity flow direction in the same way as FlowDirection with 'DINF' as the angle of steepest descent on the eight triangular facets around each cell, using D8 directions to drain flats and edge cells without a lower neighbor
+    Inputs: 'elevation' -- a two dimensional filled elevation array with NaN as no data
+            'cell_size' -- the cell size of the elevation array in the horizontal units of the elevation
+    Returned Value: Returns a 32-bit float array of flow angles in degrees counterclockwise from east with -1 for sinks and NaN for no data, flattened arrays of the first and second receivers of each cell, and a flattened array of the proportion of flow passed to the first receiver
+    Preconditions: requires a filled elevation array
+    """
+
+    # Import packages
+    import numpy as np
+    from package_Geomorphometry.routeFlowD8 import COL_OFFSETS
+    from package_Geomorphometry.routeFlowD8 import ROW_OFFSETS
+    from package_Geomorphometry.routeFlowD8 import calculate_direction_d8
+    from package_Geomorphometry.routeFlowD8 import define_receivers_d8
+
+    # Pad elevation with no data
+    rows, cols = elevation.shape
+    padded = np.full((rows + 2, cols + 2), np.nan)
+    padded[1:-1, 1:-1] = elevation
+    row_index, col_index = np.indices((rows, cols))
+
+    # Calculate the steepest slope and facet angle of each facet
+    slope_list = []
+    angle_list = []
+    for (row_1, col_1), (row_2, col_2), angle_count, angle_sign in FACETS:
+        elevation_1 = padded[1 + row_1:rows + 1 + row_1, 1 + col_1:cols + 1 + col_1]
+        elevation_2 = padded[1 + row_2:rows + 1 + row_2, 1 + col_2:cols + 1 + col_2]
+        slope_1 = (elevation - elevation_1) / cell_size
+        slope_2 = (elevation_1 - elevation_2) / cell_size
+        facet_angle = np.arctan2(slope_2, slope_1)
+        facet_slope = np.hypot(slope_1, slope_2)
+        # Restrict flow to the facet
+        facet_slope = np.where(facet_angle < 0, slope_1, facet_slope)
+        facet_angle = np.where(facet_angle < 0, 0, facet_angle)
+        facet_slope = np.where(facet_angle > np.pi / 4, (elevation - elevation_2) / (cell_size * np.sqrt(2)),
+                               facet_slope)
+        facet_angle = np.where(facet_angle > np.pi / 4, np.pi / 4, facet_angle)
+        slope_list.append(np.where(np.isnan(facet_slope), -np.inf, facet_slope))
+        angle_list.append(facet_angle)
+    slopes = np.stack(slope_list)
+    angles = np.stack(angle_list)
+
+    # Select the facet of steepest descent
+    steepest = np.argmax(slopes, axis=0)
+    maximum_slope = np.take_along_axis(slopes, steepest[np.newaxis], axis=0)[0]
+    facet_angle = np.take_along_axis(angles, steepest[np.newaxis], axis=0)[0]
+    downslope = maximum_slope > 0
+
+    # Convert the facet angle to a flow angle and divide flow between the two facet neighbors
+    facet_table = np.array([[row_1, col_1, row_2, col_2, angle_count, angle_sign]
+                            for (row_1, col_1), (row_2, col_2), angle_count, angle_sign in FACETS])
+    facet_values = facet_table[steepest]
+    flow_angle = np.mod(np.degrees(facet_values[..., 4] * np.pi / 2 + facet_values[..., 5] * facet_angle), 360)
+    proportion_a = 1 - facet_angle / (np.pi / 4)
+    receivers_a = (row_index + facet_values[..., 0]) * cols + col_index + facet_values[..., 1]
+    receivers_b = (row_index + facet_values[..., 2]) * cols + col_index + facet_values[..., 3]
+
+    # Use D8 directions to drain cells without a lower neighbor
+    direction_d8 = calculate_direction_d8(elevation, cell_size)
+    receivers_d8 = define_receivers_d8(direction_d8).reshape(rows, cols)
+    angle_d8 = np.mod(np.degrees(np.arctan2(-ROW_OFFSETS, COL_OFFSETS)), 360)
+    angle_d8 = angle_d8[np.log2(np.maximum(direction_d8, 1)).astype('int64')]
+    flow_angle = np.where(downslope, flow_angle, np.where(direction_d8 > 0, angle_d8, -1))
+    flow_angle = np.where(direction_d8 < 0, np.nan, flow_angle)
+    proportion_a = np.where(downslope, proportion_a, 1)
+    receivers_a = np.where(downslope, receivers_a, receivers_d8)
+    receivers_b = np.where(downslope, receivers_b, -1)
+
+    return (flow_angle.astype('float32'), receivers_a.ravel().astype('int64'), receivers_b.ravel().astype('int64'),
+            proportion_a.ravel().astype('float64'))
+
+# Define a function to calculate D-infinity flow direction and accumulation
+def calculate_flow_dinf(elevation, cell_size, weights=None):
+    """
+    Description: calculates D-infinity flow direction and float flow accumulation in the same way as FlowDirection with 'DINF' followed by FlowAccumulation with 'FLOAT' and 'DINF'
+    Inputs: 'elevation' -- a two dimensional filled elevation array with NaN as no data
+            'cell_size' -- the cell size of the elevation array in the horizontal units of the elevation
+            'weights' -- an optional two dimensional array of the weight of each cell (defaults to one for each cell)
+    Returned Value: Returns the flow angle array and a 32-bit float flow accumulation array with NaN as no data
+    Preconditions: requires a filled elevation array
+    """
+
+    # Import packages
+    import numpy as np
+
+    # Calculate flow direction and receivers
+    flow_angle, receivers_a, receivers_b, proportions_a = calculate_direction_dinf(elevation, cell_size)
+    valid = np.isfinite(flow_angle)
+
+    # Accumulate flow in topological order
+    if weights is None:
+        weights = np.ones(elevation.shape)
+    weights = np.where(valid, weights, 0).ravel().astype('float64')
+    accumulation = accumulate_flow_dinf(receivers_a, receivers_b, proportions_a, weights).reshape(elevation.shape)
+    accumulation = np.where(valid, accumulation, np.nan).astype('float32')
+
+    return flow_angle, accumulation
@@ -0,0 +1,327 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------------------------
+# Surface kernels
+# Author: Timm Nawrocki
+# Last Updated: 2026-10-17
+# Usage: Must be executed in a Python 3.8+ distribution with numpy.
+# Description: "Surface kernels" is a set of functions that calculate surface derivatives and curvature from blocks of elevation using vectorized 3x3 stencils. Exposure, heat load, and radiation can optionally be interpolated from lookup tables of slope and aspect instead of evaluated per cell.
+# ---------------------------------------------------------------------------
+
+# Create a cache of lookup tables for each process
+LOOKUP_TABLES = {}
+
+# Define a function to calculate the vertical unit conversion factor
+def calculate_z_factor(z_unit, unit_factor):
+    """
+    Description: calculates the factor that converts vertical units to horizontal units
+    Inputs: 'z_unit' -- a string value of either 'METER' or 'FOOT' representing the vertical unit of the elevation raster
+            'unit_factor' -- the length of the horizontal unit in meters
+    Returned Value: Returns a float z factor
+    Preconditions: requires a recognized vertical unit
+    """
+
+    # Define vertical units in meters
+    unit_dictionary = {'METER': 1.0,
+                       'FOOT': 0.3048,
+                       'FOOT_US': 0.3048006096}
+
+    return unit_dictionary[z_unit.upper()] / unit_factor
+
+# Define a function to extract the 3x3 neighborhood of a block
+def define_neighborhood(elevation_block):
+    """
+    Description: splits a haloed elevation block into the nine shifted views of its 3x3 neighborhood, with no data neighbors replaced by the center cell
+    Inputs: 'elevation_block' -- a float elevation array padded by a halo of one cell
+    Returned Value: Returns a list of nine arrays ordered from the northwest to the southeast cell
+    Preconditions: requires an elevation block with a halo of one cell
+    """
+
+    # Import packages
+    import numpy as np
+
+    # Define block shape without halo
+    rows = elevation_block.shape[0] - 2
+    cols = elevation_block.shape[1] - 2
+    center = elevation_block[1:rows + 1, 1:cols + 1]
+
+    # Create shifted views
+    neighborhood = []
+    for row_shift in range(3):
+        for col_shift in range(3):
+            neighbor = elevation_block[row_shift:row_shift + rows, col_shift:col_shift + cols]
+            neighborhood.append(np.where(np.isnan(neighbor), center, neighbor))
+
+    return neighborhood
+
+# Define a function to calculate surface coefficients
+def calculate_coefficients(elevation_block, cell_size, z_factor, surface_type='QUADRATIC', second_order=False):
+    """
+    Description: calculates the first derivatives and optionally the second derivatives of a local surface fit to each 3x3 neighborhood
+    Inputs: 'elevation_block' -- a float elevation array padded by a halo of one cell
+            'cell_size' -- the cell size of the elevation raster
+            'z_factor' -- a factor to convert vertical units to horizontal units
+            'surface_type' -- either 'QUADRATIC' for the least squares quadratic surface (Evans-Young) or 'PLANAR' for the weighted plane (Horn)
+            'second_order' -- a boolean that also returns the second derivatives of the quadratic surface from the same neighborhood
+    Returned Value: Returns the east-west and north-south gradients of the block without halo, followed by the second derivatives along x, along y, and across x and y if second order is requested
+    Preconditions: requires an elevation block with a halo of one cell
+    """
+
+    # Define neighborhood
+    z1, z2, z3, z4, z5, z6, z7, z8, z9 = define_neighborhood(elevation_block * z_factor)
+
+    # Calculate gradients
+    if surface_type == 'PLANAR':
+        gradient_x = ((z3 + 2 * z6 + z9) - (z1 + 2 * z4 + z7)) / (8 * cell_size)
+        gradient_y = ((z1 + 2 * z2 + z3) - (z7 + 2 * z8 + z9)) / (8 * cell_size)
+    else:
+        gradient_x = ((z3 + z6 + z9) - (z1 + z4 + z7)) / (6 * cell_size)
+        gradient_y = ((z1 + z2 + z3) - (z7 + z8 + z9)) / (6 * cell_size)
+    if not second_order:
+        return gradient_x, gradient_y
+
+    # Calculate second derivatives of the quadratic surface
+    second_x = ((z1 + z3 + z4 + z6 + z7 + z9) - 2 * (z2 + z5 + z8)) / (3 * cell_size ** 2)
+    second_y = ((z1 + z2 + z3 + z7 + z8 + z9) - 2 * (z4 + z5 + z6)) / (3 * cell_size ** 2)
+    second_xy = ((z3 + z7) - (z1 + z9)) / (4 * cell_size ** 2)
+
+    return gradient_x, gradient_y, second_x, second_y, second_xy
+
+# Define a function to calculate slope and aspect from gradients
+def calculate_slope_aspect_kernel(gradient_x, gradient_y):
+    """
+    Description: calculates slope and north pole aspect in degrees from surface gradients
+    Inputs: 'gradient_x' -- the east-west gradient
+            'gradient_y' -- the north-south gradient
+    Returned Value: Returns float slope in degrees and float aspect in degrees clockwise from north with flat cells as -1
+    Preconditions: requires gradients from calculate_coefficients
+    """
+
+    # Import packages
+    import numpy as np
+
+    # Calculate slope
+    slope = np.degrees(np.arctan(np.hypot(gradient_x, gradient_y)))
+
+    # Calculate aspect as the azimuth of steepest descent
+    aspect = np.mod(np.degrees(np.arctan2(-gradient_x, -gradient_y)), 360.0)
+    aspect = np.where((gradient_x == 0) & (gradient_y == 0), -1.0, aspect)
+    aspect = np.where(np.isnan(slope), np.nan, aspect)
+
+    return slope, aspect
+
+# Define a function to calculate curvature from surface derivatives
+def calculate_curvature_kernel(gradient_x, gradient_y, second_x, second_y, second_xy):
+    """
+    Description: calculates plan, profile, and mean curvature of the quadratic surface with convex surfaces positive and concave surfaces negative
+    Inputs: 'gradient_x' -- the east-west gradient
+            'gradient_y' -- the north-south gradient
+            'second_x' -- the second derivative along x
+            'second_y' -- the second derivative along y
+            'second_xy' -- the second derivative across x and y
+    Returned Value: Returns float plan, profile, and mean curvature in inverse horizontal units with plan and profile curvature of flat cells as 0
+    Preconditions: requires derivatives from calculate_coefficients with second order
+    """
+
+    # Import packages
+    import numpy as np
+
+    # Calculate squared gradient terms
+    gradient_xx = gradient_x ** 2
+    gradient_yy = gradient_y ** 2
+    gradient_squared = gradient_xx + gradient_yy
+    cross_term = 2 * gradient_x * gradient_y * second_xy
+
+    # Calculate plan curvature along the contour and profile curvature along the slope line
+    with np.errstate(invalid='ignore', divide='ignore'):
+        plan = -(gradient_yy * second_x - cross_term + gradient_xx * second_y) / gradient_squared ** 1.5
+        profile = -(gradient_xx * second_x + cross_term + gradient_yy * second_y) / \
+            (gradient_squared * (1 + gradient_squared) ** 1.5)
+    plan = np.where(gradient_squared == 0, 0.0, plan)
+    profile = np.where(gradient_squared == 0, 0.0, profile)
+
+    # Calculate mean curvature
+    mean = -((1 + gradient_yy) * second_x - cross_term + (1 + gradient_xx) * second_y) / \
+        (2 * (1 + gradient_squared) ** 1.5)
+    plan = np.where(np.isnan(mean), np.nan, plan)
+    profile = np.where(np.isnan(mean), np.nan, profile)
+
+    return plan, profile, mean
+
+# Define a function to calculate solar exposure from slope and aspect
+def calculate_exposure_kernel(slope, aspect):
+    """
+    Description: calculates solar exposure index in the same way as calculate_exposure
+    Inputs: 'slope' -- float slope in degrees
+            'aspect' -- float aspect in degrees
+    Returned Value: Returns float solar exposure index
+    Preconditions: requires slope and aspect from calculate_slope_aspect_kernel
+    """
+
+    # Import packages
+    import numpy as np
+
+    # Calculate cosine of modified aspect multiplied by slope
+    return np.cos(aspect * 0.0174533 - 3.31613) * slope
+
+# Define a function to calculate heat load from slope and aspect
+def calculate_heat_load_kernel(slope, aspect, middle_latitude):
+    """
+    Description: calculates heat load index in the same way as calculate_heat_load
+    Inputs: 'slope' -- float slope in degrees
+            'aspect' -- float aspect in degrees
+            'middle_latitude' -- the middle latitude of the elevation raster extent
+    Returned Value: Returns float heat load index
+    Preconditions: requires slope and aspect from calculate_slope_aspect_kernel
+    """
+
+    # Import packages
+    import math
+    import numpy as np
+
+    # Calculate latitude terms
+    middle_radian = middle_latitude * 0.0174533
+    cos_latitude = math.cos(middle_radian)
+    sin_latitude = math.sin(middle_radian)
+
+    # Convert degrees to radians
+    slope_radian = slope * 0.0174533
+    aspect_radian = aspect * 0.0174533
+
+    # Calculate heat load index
+    modified_aspect = np.abs(3.141593 - np.abs(aspect_radian - 3.926991))
+    cos_slope = np.cos(slope_radian)
+    sin_slope = np.sin(slope_radian)
+    cos_aspect = np.cos(modified_aspect)
+    sin_aspect = np.sin(modified_aspect)
+    heat_load = np.exp(-1.467 + 1.582 * cos_latitude * cos_slope - 1.5 * cos_aspect * sin_slope * sin_latitude
+                       - 0.262 * sin_latitude * sin_slope + 0.607 * sin_aspect * sin_slope)
+
+    return heat_load
+
+# Define a function to calculate topographic radiation from aspect
+def calculate_radiation_kernel(aspect):
+    """
+    Description: calculates topographic radiation in the same way as calculate_radiation
+    Inputs: 'aspect' -- float aspect in degrees
+    Returned Value: Returns float topographic radiation with flat cells as 0.5
+    Preconditions: requires aspect from calculate_slope_aspect_kernel
+    """
+
+    # Import packages
+    import numpy as np
+
+    # Calculate topographic radiation aspect index
+    aspect_radian = aspect * 0.0174533
+    radiation = (1 - np.cos(aspect_radian - 0.523599)) / 2
+
+    return np.where(aspect_radian < 0, 0.5, radiation)
+
+# Define a function to calculate surface area ratio from slope
+def calculate_surface_area_kernel(slope, cell_size):
+    """
+    Description: calculates surface area ratio in the same way as calculate_surface_area
+    Inputs: 'slope' -- float slope in degrees
+            'cell_size' -- the cell size of the slope raster
+    Returned Value: Returns float surface area ratio
+    Preconditions: requires slope from calculate_slope_aspect_kernel
+    """
+
+    # Import packages
+    import numpy as np
+
+    # Divide cell area by cosine of slope
+    return float(cell_size) ** 2 / np.cos(slope * 0.0174533)
+
+# Define a function to create lookup tables of slope and aspect properties
+def define_lookup_tables(middle_latitude, table_step=0.1):
+    """
+    Description: evaluates exposure, heat load, and radiation once for every node of a grid of slope and aspect values so that the properties can be interpolated from tables instead of evaluated per cell
+    Inputs: 'middle_latitude' -- the middle latitude of the elevation raster extent used for heat load
+            'table_step' -- the spacing of table nodes in degrees of slope and aspect
+    Returned Value: Returns a dictionary of two dimensional exposure and heat load tables indexed by slope and aspect node and a one dimensional radiation table indexed by aspect node
+    Preconditions: aspect nodes start at -1 so that flat cells fall on a node
+    """
+
+    # Import packages
+    import numpy as np
+
+    # Define table nodes
+    slope_nodes = np.arange(int(round(90 / table_step)) + 1) * table_step
+    aspect_nodes = np.arange(int(round(361 / table_step)) + 1) * table_step - 1
+    slope_grid, aspect_grid = np.meshgrid(slope_nodes, aspect_nodes, indexing='ij')
+
+    # Evaluate properties at table nodes
+    table_dictionary = {'exposure': calculate_exposure_kernel(slope_grid, aspect_grid),
+                        'heat_load': calculate_heat_load_kernel(slope_grid, aspect_grid, middle_latitude),
+                        'radiation': calculate_radiation_kernel(aspect_nodes)}
+
+    return table_dictionary
+
+# Define a function to interpolate slope and aspect properties between table nodes
+def interpolate_tables(slope, aspect, exposure_table, heat_load_table, radiation_table, table_step):
+    """
+    Description: calculates exposure, heat load, and radiation for each cell by bilinear interpolation between the four table nodes around its slope and aspect
+    Inputs: 'slope' -- a float array of slope in degrees
+            'aspect' -- a float array of aspect in degrees
+            'exposure_table' -- a two dimensional exposure table indexed by slope and aspect node
+            'heat_load_table' -- a two dimensional heat load table indexed by slope and aspect node
+            'radiation_table' -- a one dimensional radiation table indexed by aspect node
+            'table_step' -- the spacing of table nodes in degrees
+    Returned Value: Returns 64-bit float exposure, heat load, and radiation arrays with NaN for no data
+    Preconditions: requires tables from define_lookup_tables
+    """
+
+    # Import packages
+    import numpy as np
+
+    # Calculate the index of the lower table node and the fraction to the upper node for each cell
+    slope_count, aspect_count = heat_load_table.shape
+    valid = np.isfinite(slope) & np.isfinite(aspect)
+    slope_position = np.clip(np.where(valid, slope, 0) / table_step, 0, slope_count - 1)
+    slope_index = np.minimum(slope_position.astype('int64'), slope_count - 2)
+    slope_fraction = slope_position - slope_index
+    aspect_position = np.clip((np.where(valid, aspect, 0) + 1) / table_step, 0, aspect_count - 1)
+    aspect_index = np.minimum(aspect_position.astype('int64'), aspect_count - 2)
+    aspect_fraction = aspect_position - aspect_index
+
+    # Gather the four surrounding nodes of each two dimensional table and interpolate between them
+    node_index = slope_index * aspect_count + aspect_index
+    output_list = []
+    for table in [exposure_table, heat_load_table]:
+        lower_value = np.take(table, node_index)
+        lower_value = lower_value + aspect_fraction * (np.take(table, node_index + 1) - lower_value)
+        upper_value = np.take(table, node_index + aspect_count)
+        upper_value = upper_value + aspect_fraction * (np.take(table, node_index + aspect_count + 1) - upper_value)
+        output_list.append(np.where(valid, lower_value + slope_fraction * (upper_value - lower_value), np.nan))
+
+    # Interpolate radiation between aspect nodes
+    lower_value = np.take(radiation_table, aspect_index)
+    radiation = lower_value + aspect_fraction * (np.take(radiation_table, aspect_index + 1) - lower_value)
+    output_list.append(np.where(valid, radiation, np.nan))
+
+    return output_list
+
+# Define a function to calculate slope and aspect properties from lookup tables
+def calculate_table_kernel(slope, aspect, middle_latitude, table_step=0.1):
+    """
+    Description: calculates exposure, heat load, and radiation by interpolation from lookup tables, which are created once per process and latitude and keep the error far below the precision of the integer outputs
+    Inputs: 'slope' -- float slope in degrees
+            'aspect' -- float aspect in degrees
+            'middle_latitude' -- the middle latitude of the elevation raster extent used for heat load
+            'table_step' -- the spacing of table nodes in degrees of slope and aspect
+    Returned Value: Returns float exposure, heat load, and radiation arrays with NaN for no data
+    Preconditions: requires slope and aspect from calculate_slope_aspect_kernel
+    """
+
+    # Create lookup tables once per process and latitude
+    table_key = (middle_latitude, table_step)
+    if table_key not in LOOKUP_TABLES:
+        LOOKUP_TABLES[table_key] = define_lookup_tables(middle_latitude, table_step)
+    table_dictionary = LOOKUP_TABLES[table_key]
+
+    # Interpolate properties
+    output_list = interpolate_tables(slope.astype('float64'), aspect.astype('float64'),
+                                     table_dictionary['exposure'], table_dictionary['heat_load'],
+                                     table_dictionary['radiation'], table_step)
+
+    return output_list
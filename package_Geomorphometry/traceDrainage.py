@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------------------------
+# Trace drainage
+# Author: Timm Nawrocki
+# Last Updated: 2026-10-17
+# Usage: Must be executed in a Python 3.8+ distribution with numpy and numba.
+# Description: "Trace drainage" is a set of functions that calculate height above nearest drainage from D8 receivers without arcpy. The elevation of the first stream cell along the flow path of each cell is propagated upstream in one pass in reverse topological order so that the cost is linear in the number of cells.
+# ---------------------------------------------------------------------------
+
+# Import packages at module level so that the drainage kernel can be compiled with numba
+import numpy as np
+from numba import njit
+
+# Define a function to propagate drainage elevation upstream
+@njit(cache=True)
+def propagate_drainage(receivers, order, streams, elevation):
+    """
+    Description: assigns each cell the elevation of the first stream cell reached by following D8 receivers downstream
+    Inputs: 'receivers' -- a flattened integer array of the cell that each cell flows into with -1 for cells that do not flow into another cell
+            'order' -- an array of cell indices in topological order
+            'streams' -- a flattened boolean array that is true for stream cells
+            'elevation' -- a flattened 64-bit float elevation array
+    Returned Value: Returns a flattened 64-bit float array of drainage elevation with NaN for cells that do not drain to a stream
+    Preconditions: this function is compiled with numba
+    """
+
+    # Visit receivers before their donors
+    drainage = np.full(len(receivers), np.nan)
+    for position in range(len(order) - 1, -1, -1):
+        cell = order[position]
+        if streams[cell]:
+            drainage[cell] = elevation[cell]
+        elif receivers[cell] >= 0:
+            drainage[cell] = drainage[receivers[cell]]
+
+    return drainage
+
+# Define a function to calculate height above nearest drainage
+def calculate_height_above_drainage(elevation, cell_size, stream_mask, fill_array=None):
+    """
+    Description: calculates height above nearest drainage as the difference between the elevation of each cell and the elevation of the stream cell that it drains to along D8 flow directions
+    Inputs: 'elevation' -- a two dimensional elevation array with NaN as no data
+            'cell_size' -- the cell size of the elevation array in the horizontal units of the elevation
+            'stream_mask' -- a two dimensional boolean array that is true for stream cells
+            'fill_array' -- an optional two dimensional filled elevation array to route flow (defaults to filling all depressions in the elevation array)
+    Returned Value: Returns a two dimensional 64-bit float array of height above nearest drainage with NaN for no data and cells that do not drain to a stream
+    Preconditions: requires a stream mask of the same grid as the elevation
+    """
+
+    # Import packages
+    import numpy as np
+    from package_Geomorphometry.fillDepressions import fill_depressions
+    from package_Geomorphometry.routeFlowD8 import calculate_direction_d8
+    from package_Geomorphometry.routeFlowD8 import define_receivers_d8
+    from package_Geomorphometry.routeFlowD8 import order_flow
+
+    # Route flow on filled elevation
+    if fill_array is None:
+        fill_array = fill_depressions(elevation)
+    direction = calculate_direction_d8(fill_array, cell_size)
+    receivers = define_receivers_d8(direction)
+    order = order_flow(receivers)
+
+    # Propagate drainage elevation upstream
+    valid = np.isfinite(elevation)
+    streams = (stream_mask & valid).ravel()
+    drainage = propagate_drainage(receivers, order, streams, elevation.ravel().astype('float64'))
+
+    return np.where(valid, elevation - drainage.reshape(elevation.shape), np.nan)
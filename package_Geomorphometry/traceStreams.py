@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------------------------
+# Trace streams
+# Author: Timm Nawrocki
+# Last Updated: 2026-10-17
+# Usage: Must be executed in a Python 3.8+ distribution with numpy and numba.
+# Description: "Trace streams" is a set of functions that calculate Strahler stream order from D8 receivers and trace the stream network into polylines without arcpy. Stream order is calculated in topological order and each stream link is traced once from its upstream end to the junction where it ends.
+# ---------------------------------------------------------------------------
+
+# Import packages at module level so that the stream kernels can be compiled with numba
+import numpy as np
+from numba import njit
+
+# Define a function to calculate Strahler stream order
+@njit(cache=True)
+def order_strahler(receivers, order, streams):
+    """
+    Description: calculates Strahler stream order in the same way as the 'STRAHLER' option of the StreamOrder tool, increasing the order only where two or more streams of the highest incoming order meet
+    Inputs: 'receivers' -- a flattened integer array of the cell that each cell flows into with -1 for cells that do not flow into another cell
+            'order' -- an array of cell indices in topological order
+            'streams' -- a flattened boolean array that is true for stream cells
+    Returned Value: Returns a flattened 32-bit integer array of stream order with 0 for cells that are not streams
+    Preconditions: this function is compiled with numba
+    """
+
+    # Track the highest incoming order and the number of streams with that order
+    cell_count = len(receivers)
+    stream_order = np.zeros(cell_count, dtype=np.int32)
+    maximum_order = np.zeros(cell_count, dtype=np.int32)
+    maximum_count = np.zeros(cell_count, dtype=np.int32)
+
+    # Assign order downstream from headwaters
+    for cell in order:
+        if not streams[cell]:
+            continue
+        if maximum_order[cell] == 0:
+            cell_order = 1
+        elif maximum_count[cell] >= 2:
+            cell_order = maximum_order[cell] + 1
+        else:
+            cell_order = maximum_order[cell]
+        stream_order[cell] = cell_order
+        receiver = receivers[cell]
+        if receiver >= 0 and streams[receiver]:
+            if cell_order > maximum_order[receiver]:
+                maximum_order[receiver] = cell_order
+                maximum_count[receiver] = 1
+            elif cell_order == maximum_order[receiver]:
+                maximum_count[receiver] += 1
+
+    return stream_order
+
+# Define a function to trace stream links
+@njit(cache=True)
+def trace_links(receivers, streams):
+    """
+    Description: traces each stream link from a headwater or junction downstream to the next junction or the end of the stream network, including the junction as the last vertex so that links connect
+    Inputs: 'receivers' -- a flattened integer array of the cell that each cell flows into with -1 for cells that do not flow into another cell
+            'streams' -- a flattened boolean array that is true for stream cells
+    Returned Value: Returns a flattened array of the cells of all links in downstream order and an array of the start position of each link with the total number of vertices appended
+    Preconditions: this function is compiled with numba
+    """
+
+    # Count the stream donors of each stream cell
+    cell_count = len(receivers)
+    donor_count = np.zeros(cell_count, dtype=np.int64)
+    stream_count = 0
+    for cell in range(cell_count):
+        if streams[cell]:
+            stream_count += 1
+            receiver = receivers[cell]
+            if receiver >= 0 and streams[receiver]:
+                donor_count[receiver] += 1
+
+    # Trace a link from every headwater and junction
+    vertices = np.empty(2 * stream_count + 1, dtype=np.int64)
+    offsets = np.empty(stream_count + 1, dtype=np.int64)
+    vertex_count = 0
+    link_count = 0
+    for cell in range(cell_count):
+        if not streams[cell] or donor_count[cell] == 1:
+            continue
+        offsets[link_count] = vertex_count
+        link_count += 1
+        vertices[vertex_count] = cell
+        vertex_count += 1
+        current = cell
+        while True:
+            receiver = receivers[current]
+            if receiver < 0 or not streams[receiver]:
+                break
+            vertices[vertex_count] = receiver
+            vertex_count += 1
+            if donor_count[receiver] != 1:
+                break
+            current = receiver
+    offsets[link_count] = vertex_count
+
+    return vertices[:vertex_count], offsets[:link_count + 1]
+
+# Define a function to calculate Strahler stream order
+def calculate_stream_order(receivers, order, stream_mask):
+    """
+    Description: calculates Strahler stream order for a stream raster from D8 receivers
+    Inputs: 'receivers' -- a flattened receiver array from define_receivers_d8
+            'order' -- an array of cell indices in topological order from calculate_accumulation_d8
+            'stream_mask' -- a two dimensional boolean array that is true for stream cells
+    Returned Value: Returns a two dimensional 32-bit integer array of stream order with 0 for cells that are not streams
+    Preconditions: requires receivers and order of the same grid as the stream mask
+    """
+
+    # Calculate stream order
+    stream_order = order_strahler(receivers, order, stream_mask.ravel())
+
+    return stream_order.reshape(stream_mask.shape)
+
+# Define a function to trace stream orders into polylines
+def trace_stream_lines(receivers, stream_order, class_breaks, left, top, cell_size):
+    """
+    Description: traces stream links into polylines through cell centers in one walk of the stream network, removing vertices along straight runs and assigning each line to a class by its stream order
+    Inputs: 'receivers' -- a flattened receiver array from define_receivers_d8
+            'stream_order' -- a two dimensional stream order array with 0 for cells that are not streams
+            'class_breaks' -- a list of the maximum stream order of each class except the last, which includes all higher orders
+            'left' -- the x coordinate of the left edge of the grid
+            'top' -- the y coordinate of the top edge of the grid
+            'cell_size' -- the cell size of the grid
+    Returned Value: Returns a list of line lists, one per class, in which each line is a tuple of stream order and an array of x and y vertex coordinates
+    Preconditions: requires receivers of the same grid as the stream order
+    """
+
+    # Import packages
+    import numpy as np
+
+    # Trace stream links
+    rows, cols = stream_order.shape
+    vertices, offsets = trace_links(receivers, stream_order.ravel() > 0)
+
+    # Convert vertices to cell center coordinates
+    vertex_x = left + (vertices % cols + 0.5) * cell_size
+    vertex_y = top - (vertices // cols + 0.5) * cell_size
+    vertex_coordinates = np.column_stack([vertex_x, vertex_y])
+    link_orders = stream_order.ravel()[vertices[offsets[:-1]]]
+    link_classes = np.searchsorted(np.array(class_breaks), link_orders, side='left')
+
+    # Create lines with at least two vertices
+    class_lines = [[] for break_number in range(len(class_breaks) + 1)]
+    for link_number in range(len(offsets) - 1):
+        coordinates = vertex_coordinates[offsets[link_number]:offsets[link_number + 1]]
+        if len(coordinates) < 2:
+            continue
+        # Remove vertices where the line does not change direction
+        steps = np.diff(coordinates, axis=0)
+        turns = np.any(steps[1:] != steps[:-1], axis=1)
+        keep = np.concatenate([[True], turns, [True]])
+        class_lines[link_classes[link_number]].append((int(link_orders[link_number]), coordinates[keep]))
+
+    return class_lines
@@ -0,0 +1,460 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------------------------
+# Update flow accumulation with numpy
+# Author: Timm Nawrocki
+# Last Updated: 2026-10-17
+# Usage: Must be executed in a Python 3.8+ distribution with numpy, numba, scipy, and rasterio.
+# Description: "Update flow accumulation with numpy" is a set of functions that store the filled elevation, flood parents, and D-infinity flow direction of a flow accumulation raster and use them to recalculate flow accumulation for only the region affected by changed elevation. The filled elevation can only change for cells that were flooded through the changed cells, for cells flooded from a sink that the changed cells drain to, and for depressions that touch the changed cells, so only those cells are refilled, bounded by the filled elevation of the cells around them. Flow direction can only change where the filled elevation changed and on the flats connected to those cells, and flow accumulation can only change downstream of changed flow direction, so flow is rerouted and accumulated for only those cells with the unchanged flow from upstream cells as inflow.
+# ---------------------------------------------------------------------------
+
+# Import packages at module level so that the tracing kernels can be compiled with numba
+import numpy as np
+from numba import njit
+
+# Define the neighbor offsets in the order of flood parents and in the order of flow angles counterclockwise from east
+ROW_OFFSETS = np.array([-1, -1, -1, 0, 0, 1, 1, 1])
+COL_OFFSETS = np.array([-1, 0, 1, -1, 1, -1, 0, 1])
+ANGLE_ROW_OFFSETS = np.array([0, -1, -1, -1, 0, 1, 1, 1])
+ANGLE_COL_OFFSETS = np.array([1, 1, 0, -1, -1, -1, 0, 1])
+
+# Define a function to trace the cells flooded through seed cells
+@njit(cache=True)
+def trace_flooded(parents, seeds, rows, cols):
+    """
+    Description: finds every cell whose flood path passes through a seed cell by searching outward from the seeds to the cells that were flooded from them
+    Inputs: 'parents' -- a flattened integer array of the neighbor number from 1 to 8 from which each cell was flooded with 0 for seeds of the flood
+            'seeds' -- a flattened boolean array of seed cells
+            'rows' -- the number of rows in the array
+            'cols' -- the number of columns in the array
+    Returned Value: Returns a flattened boolean array of the seeds and the cells flooded through them
+    Preconditions: requires flood parents from fill_depressions; this function is compiled with numba
+    """
+
+    # Add seeds to the queue
+    flooded = seeds.copy()
+    queue = np.empty(rows * cols, dtype=np.int64)
+    queue_end = 0
+    for cell in range(rows * cols):
+        if seeds[cell]:
+            queue[queue_end] = cell
+            queue_end += 1
+
+    # Add neighbors that were flooded from cells in the queue
+    queue_start = 0
+    while queue_start < queue_end:
+        cell = queue[queue_start]
+        queue_start += 1
+        cell_row = cell // cols
+        cell_col = cell % cols
+        for neighbor_number in range(8):
+            neighbor_row = cell_row + ROW_OFFSETS[neighbor_number]
+            neighbor_col = cell_col + COL_OFFSETS[neighbor_number]
+            if neighbor_row < 0 or neighbor_row >= rows or neighbor_col < 0 or neighbor_col >= cols:
+                continue
+            neighbor = neighbor_row * cols + neighbor_col
+            if flooded[neighbor] or parents[neighbor] != 8 - neighbor_number:
+                continue
+            flooded[neighbor] = True
+            queue[queue_end] = neighbor
+            queue_end += 1
+
+    return flooded
+
+# Define a function to expand seed cells across flats
+@njit(cache=True)
+def trace_flats(values, seeds, rows, cols):
+    """
+    Description: finds every cell connected to a seed cell through neighbors of equal value, which are the flats on which flow direction depends on the outlets of the flat
+    Inputs: 'values' -- a flattened 64-bit float array of filled elevation with NaN as no data
+            'seeds' -- a flattened boolean array of seed cells
+            'rows' -- the number of rows in the array
+            'cols' -- the number of columns in the array
+    Returned Value: Returns a flattened boolean array of the seeds and the cells connected to them through equal values
+    Preconditions: this function is compiled with numba
+    """
+
+    # Add seeds to the queue
+    connected = seeds.copy()
+    queue = np.empty(rows * cols, dtype=np.int64)
+    queue_end = 0
+    for cell in range(rows * cols):
+        if seeds[cell]:
+            queue[queue_end] = cell
+            queue_end += 1
+
+    # Add neighbors of equal value
+    queue_start = 0
+    while queue_start < queue_end:
+        cell = queue[queue_start]
+        queue_start += 1
+        cell_row = cell // cols
+        cell_col = cell % cols
+        for neighbor_number in range(8):
+            neighbor_row = cell_row + ROW_OFFSETS[neighbor_number]
+            neighbor_col = cell_col + COL_OFFSETS[neighbor_number]
+            if neighbor_row < 0 or neighbor_row >= rows or neighbor_col < 0 or neighbor_col >= cols:
+                continue
+            neighbor = neighbor_row * cols + neighbor_col
+            if connected[neighbor] or values[neighbor] != values[cell]:
+                continue
+            connected[neighbor] = True
+            queue[queue_end] = neighbor
+            queue_end += 1
+
+    return connected
+
+# Define a function to trace the cells downstream of seed cells
+@njit(cache=True)
+def trace_downstream(links, seeds):
+    """
+    Description: finds every cell that receives flow from a seed cell
+    Inputs: 'links' -- a two dimensional integer array with one row for each receiver link and one column for each cell containing the receiver of the cell with -1 for no link
+            'seeds' -- a flattened boolean array of seed cells
+    Returned Value: Returns a flattened boolean array of the seeds and the cells downstream of them
+    Preconditions: requires receivers without cycles; this function is compiled with numba
+    """
+
+    # Add seeds to the queue
+    cell_count = len(seeds)
+    downstream = seeds.copy()
+    queue = np.empty(cell_count, dtype=np.int64)
+    queue_end = 0
+    for cell in range(cell_count):
+        if seeds[cell]:
+            queue[queue_end] = cell
+            queue_end += 1
+
+    # Add the receivers of cells in the queue
+    queue_start = 0
+    while queue_start < queue_end:
+        cell = queue[queue_start]
+        queue_start += 1
+        for link in range(links.shape[0]):
+            receiver = links[link, cell]
+            if receiver < 0 or downstream[receiver]:
+                continue
+            downstream[receiver] = True
+            queue[queue_end] = receiver
+            queue_end += 1
+
+    return downstream
+
+# Define a function to define the files that store the flow network of a flow accumulation raster
+def define_flow_files(flow_accumulation):
+    """
+    Description: defines the file paths of the filled elevation, flood parent, and flow direction rasters stored next to a flow accumulation raster
+    Inputs: 'flow_accumulation' -- a file path for a flow accumulation raster
+    Returned Value: Returns the file paths of the filled elevation raster, the flood parent raster, and the flow direction raster
+    Preconditions: None
+    """
+
+    # Import packages
+    import os
+
+    # Define flow files
+    flow_base = os.path.splitext(flow_accumulation)[0]
+    fill_raster = flow_base + '_Fill.tif'
+    parent_raster = flow_base + '_Parents.tif'
+    direction_raster = flow_base + '_Direction.tif'
+
+    return fill_raster, parent_raster, direction_raster
+
+# Define a function to write the flow network of a flow accumulation raster
+def write_flow_network(flow_accumulation, grid, fill_array, parent_array, flow_angle):
+    """
+    Description: writes the filled elevation, flood parents, and flow direction that are used to update a flow accumulation raster
+    Inputs: 'flow_accumulation' -- a file path for a flow accumulation raster
+            'grid' -- a grid dictionary from define_grid
+            'fill_array' -- a filled elevation array on the grid with NaN as no data
+            'parent_array' -- an integer array of flood parents on the grid from fill_depressions
+            'flow_angle' -- a D-infinity flow angle array on the grid from calculate_flow_dinf
+    Returned Value: Returns raster datasets on disk
+    Preconditions: requires arrays on the grid
+    """
+
+    # Import packages
+    from package_Geomorphometry.rasterBlocks import create_raster
+    from package_Geomorphometry.rasterBlocks import write_block
+
+    # Define flow files
+    fill_raster, parent_raster, direction_raster = define_flow_files(flow_accumulation)
+
+    # Export filled elevation, flood parents, and flow direction
+    for output_raster, output_array, data_type in [(fill_raster, fill_array, '32_BIT_FLOAT'),
+                                                   (parent_raster, parent_array.astype('int16'), '16_BIT_SIGNED'),
+                                                   (direction_raster, flow_angle, '32_BIT_FLOAT')]:
+        output_dataset = create_raster(output_raster, grid, data_type)
+        try:
+            write_block(output_dataset, output_array, 0)
+        finally:
+            output_dataset.close()
+
+# Define a function to convert flow angles to receivers
+def define_receivers_angle(flow_angle, valid):
+    """
+    Description: converts D-infinity flow angles to the two receivers of each cell and the proportion of flow passed to the first receiver
+    Inputs: 'flow_angle' -- a two dimensional array of flow angles in degrees counterclockwise from east with -1 for sinks and NaN for no data
+            'valid' -- a two dimensional boolean array of cells that can receive flow
+    Returned Value: Returns flattened arrays of the first and second receivers of each cell with -1 for no receiver and a flattened array of the proportion of flow passed to the first receiver
+    Preconditions: requires flow angles from calculate_flow_dinf
+    """
+
+    # Import packages
+    import numpy as np
+
+    # Divide flow between the directions on either side of the angle
+    rows, cols = flow_angle.shape
+    row_index, col_index = np.indices((rows, cols))
+    draining = np.isfinite(flow_angle) & (flow_angle >= 0)
+    angle = np.where(draining, flow_angle, 0) / 45
+    sector = np.floor(angle).astype('int64')
+    fraction = angle - sector
+    sector = np.where(fraction > 1 - 1e-6, sector + 1, sector) % 8
+    fraction = np.where((fraction < 1e-6) | (fraction > 1 - 1e-6), 0, fraction)
+
+    # Locate the receivers that are within the array and have data
+    receiver_list = []
+    for direction, proportion in [(sector, 1 - fraction), ((sector + 1) % 8, fraction)]:
+        receiver_row = row_index + ANGLE_ROW_OFFSETS[direction]
+        receiver_col = col_index + ANGLE_COL_OFFSETS[direction]
+        inside = (receiver_row >= 0) & (receiver_row < rows) & (receiver_col >= 0) & (receiver_col < cols)
+        receivers = np.where(inside, receiver_row * cols + receiver_col, -1)
+        receivers = np.where(inside, receivers, 0)
+        linked = draining & inside & (proportion > 0) & valid.ravel()[receivers].reshape(rows, cols)
+        receiver_list.append(np.where(linked, receivers, -1).ravel())
+
+    return receiver_list[0], receiver_list[1], (1 - fraction).ravel()
+
+# Define a function to find the sides of a window that a region reaches
+def find_window_edges(region, window, grid, margin=2):
+    """
+    Description: finds the sides of a window at which a region comes within a margin of the edge of the window where the window does not reach the edge of the grid
+    Inputs: 'region' -- a boolean array of the window
+            'window' -- a tuple of start row, end row, start column, and end column of the window
+            'grid' -- a grid dictionary from define_grid
+            'margin' -- the number of cells from the edge of the window
+    Returned Value: Returns a list of booleans for the top, bottom, left, and right sides
+    Preconditions: None
+    """
+
+    # Check each side of the window
+    row_start, row_end, col_start, col_end = window
+    edge_list = [row_start > 0 and region[:margin].any(),
+                 row_end < grid['height'] and region[-margin:].any(),
+                 col_start > 0 and region[:, :margin].any(),
+                 col_end < grid['width'] and region[:, -margin:].any()]
+
+    return edge_list
+
+# Define a function to expand a window
+def expand_window(window, edge_list, grid, minimum_step=256):
+    """
+    Description: expands the sides of a window that a region reaches by at least the size of the window
+    Inputs: 'window' -- a tuple of start row, end row, start column, and end column of the window
+            'edge_list' -- a list of booleans for the top, bottom, left, and right sides from find_window_edges
+            'grid' -- a grid dictionary from define_grid
+            'minimum_step' -- the minimum number of cells to add to an expanded side
+    Returned Value: Returns the expanded window
+    Preconditions: None
+    """
+
+    # Expand the window
+    row_start, row_end, col_start, col_end = window
+    row_step = max(minimum_step, row_end - row_start)
+    col_step = max(minimum_step, col_end - col_start)
+    window = (max(row_start - row_step, 0) if edge_list[0] else row_start,
+              min(row_end + row_step, grid['height']) if edge_list[1] else row_end,
+              max(col_start - col_step, 0) if edge_list[2] else col_start,
+              min(col_end + col_step, grid['width']) if edge_list[3] else col_end)
+
+    return window
+
+# Define a function to find the seeds of the flood paths of cells
+def find_flood_seeds(parents, cells, rows, cols):
+    """
+    Description: follows the flood parents of cells back to the seeds from which they were flooded
+    Inputs: 'parents' -- a flattened integer array of flood parents from fill_depressions
+            'cells' -- an array of flattened cell indices
+            'rows' -- the number of rows in the array
+            'cols' -- the number of columns in the array
+    Returned Value: Returns an array of the flattened indices of the seeds, or None if a flood path leaves the array
+    Preconditions: requires flood parents from fill_depressions
+    """
+
+    # Import packages
+    import numpy as np
+
+    # Step along flood paths until every path reaches its seed
+    visited = np.zeros(rows * cols, dtype=bool)
+    seed_list = []
+    cells = np.unique(cells)
+    while len(cells) > 0:
+        visited[cells] = True
+        codes = parents[cells].astype('int64')
+        seed_list.append(cells[codes == 0])
+        cells = cells[codes > 0]
+        codes = codes[codes > 0]
+        parent_rows = cells // cols + ROW_OFFSETS[codes - 1]
+        parent_cols = cells % cols + COL_OFFSETS[codes - 1]
+        if ((parent_rows < 0) | (parent_rows >= rows) | (parent_cols < 0) | (parent_cols >= cols)).any():
+            return None
+        cells = np.unique(parent_rows * cols + parent_cols)
+        cells = cells[~visited[cells]]
+
+    return np.concatenate(seed_list)
+
+# Define a function to update flow accumulation for changed elevation
+def update_flow_numpy(area_raster, elevation_float, flow_accumulation, update_extents, z_limit=3,
+                      window_margin=64):
+    """
+    Description: refills, reroutes, and reaccumulates only the cells affected by changed elevation and patches the flow accumulation, filled elevation, flood parent, and flow direction rasters for those cells
+    Inputs: 'area_raster' -- a raster of the study area to set snap raster and extract area
+            'elevation_float' -- an input float elevation raster
+            'flow_accumulation' -- an existing flow accumulation raster written by calculate_flow_numpy with its flow network
+            'update_extents' -- a list of map extents of changed elevation
+            'z_limit' -- the maximum depth of a depression to fill in the vertical units of the elevation
+            'window_margin' -- the number of cells around the changed elevation in the first window that is read
+    Returned Value: Returns a list of tuples of start row, end row, start column, and end column of the windows that contain updated cells
+    Preconditions: requires a flow accumulation raster with the flow network written by calculate_flow_numpy
+    """
+
+    # Import packages
+    import numpy as np
+    from package_Geomorphometry.fillDepressions import fill_depressions
+    from package_Geomorphometry.processTiles import define_update_windows
+    from package_Geomorphometry.rasterBlocks import define_grid
+    from package_Geomorphometry.rasterBlocks import read_block
+    from package_Geomorphometry.rasterBlocks import write_region
+    from package_Geomorphometry.routeFlowDinf import accumulate_flow_dinf
+    from package_Geomorphometry.routeFlowDinf import calculate_direction_dinf
+    from scipy import ndimage
+
+    # Define grid, flow files, and the windows around changed elevation
+    grid = define_grid(area_raster)
+    fill_raster, parent_raster, direction_raster = define_flow_files(flow_accumulation)
+    changed_windows = define_update_windows(grid, update_extents, 1)
+    if len(changed_windows) == 0:
+        return []
+    connectivity = np.ones((3, 3), dtype=bool)
+
+    # Define the first window as the changed elevation with a margin
+    window = (max(min([changed[0] for changed in changed_windows]) - window_margin, 0),
+              min(max([changed[1] for changed in changed_windows]) + window_margin, grid['height']),
+              max(min([changed[2] for changed in changed_windows]) - window_margin, 0),
+              min(max([changed[3] for changed in changed_windows]) + window_margin, grid['width']))
+
+    # Expand the window until it contains every affected cell
+    while True:
+        # Read the window
+        row_start, row_end, col_start, col_end = window
+        rows = row_end - row_start
+        cols = col_end - col_start
+        print(f'\t\tTracing cells affected by changed elevation in {rows} rows and {cols} columns...')
+        elevation_array = read_block(elevation_float, grid, row_start, row_end, 0, col_start, col_end)
+        previous_fill = read_block(fill_raster, grid, row_start, row_end, 0, col_start, col_end)
+        previous_parents = np.nan_to_num(read_block(parent_raster, grid, row_start, row_end, 0, col_start, col_end))
+        previous_parents = previous_parents.astype('int8').ravel()
+        previous_angle = read_block(direction_raster, grid, row_start, row_end, 0, col_start, col_end)
+        changed = np.zeros((rows, cols), dtype=bool)
+        for changed_row_start, changed_row_end, changed_col_start, changed_col_end in changed_windows:
+            changed[changed_row_start - row_start:changed_row_end - row_start,
+                    changed_col_start - col_start:changed_col_end - col_start] = True
+        previous_valid = np.isfinite(previous_fill)
+
+        # Find the seeds of the flood paths of the changed cells and keep those that are sinks
+        flood_seeds = find_flood_seeds(previous_parents, np.flatnonzero(changed & previous_valid), rows, cols)
+        if flood_seeds is None:
+            window = expand_window(window, [True, True, True, True], grid)
+            continue
+        drain_cells = previous_valid & ~ndimage.binary_erosion(previous_valid, structure=connectivity,
+                                                                border_value=0)
+        seed_rows = flood_seeds // cols
+        seed_cols = flood_seeds % cols
+        grid_edge = (seed_rows + row_start == 0) | (seed_rows + row_start == grid['height'] - 1) | \
+                    (seed_cols + col_start == 0) | (seed_cols + col_start == grid['width'] - 1)
+        sinks = flood_seeds[~drain_cells.ravel()[flood_seeds] & ~grid_edge]
+
+        # Define the region to refill as the cells flooded through changed cells or sinks and the touching depressions
+        flood_sources = (changed & previous_valid).ravel()
+        flood_sources[sinks] = True
+        region = trace_flooded(previous_parents, flood_sources, rows, cols).reshape(rows, cols)
+        depressed = previous_fill > np.where(np.isfinite(elevation_array), elevation_array, np.inf)
+        depression_labels = ndimage.label(depressed, structure=connectivity)[0]
+        touching_labels = np.unique(depression_labels[ndimage.binary_dilation(changed, structure=connectivity)])
+        region = region | np.isin(depression_labels, touching_labels[touching_labels > 0])
+        region = region | (changed & np.isfinite(elevation_array))
+        edge_list = find_window_edges(region, window, grid)
+        if any(edge_list):
+            window = expand_window(window, edge_list, grid)
+            continue
+
+        # Refill the region from the filled elevation of the cells around it
+        bounds = ndimage.binary_dilation(region, structure=connectivity) & ~region & previous_valid
+        fill_input = np.where(region, elevation_array, np.where(bounds, previous_fill, np.nan))
+        region_parents = np.zeros((rows, cols), dtype='int8')
+        fill_array = fill_depressions(fill_input, z_limit=z_limit, seeds=bounds, parents=region_parents)
+        fill_array = np.where(region, fill_array, previous_fill)
+        parent_array = np.where(region.ravel(), region_parents.ravel(), previous_parents).reshape(rows, cols)
+
+        # Find the cells whose flow direction can change, which neighbor changed fill or share a flat with them
+        changed_fill = region & ~((fill_array == previous_fill) | (np.isnan(fill_array) & np.isnan(previous_fill)))
+        rerouted_seeds = ndimage.binary_dilation(changed_fill, structure=connectivity).ravel()
+        rerouted = trace_flats(fill_array.ravel(), rerouted_seeds, rows, cols) | \
+            trace_flats(previous_fill.ravel(), rerouted_seeds, rows, cols)
+        rerouted = rerouted.reshape(rows, cols) & (np.isfinite(fill_array) | previous_valid)
+        edge_list = find_window_edges(rerouted, window, grid)
+        if any(edge_list):
+            window = expand_window(window, edge_list, grid)
+            continue
+
+        # Calculate flow direction for the rerouted cells
+        flow_angle = np.where(rerouted, calculate_direction_dinf(fill_array, grid['cell_size'])[0],
+                              previous_angle)
+        previous_a, previous_b, previous_proportions = define_receivers_angle(previous_angle, previous_valid)
+        receivers_a, receivers_b, proportions_a = define_receivers_angle(flow_angle, np.isfinite(fill_array))
+
+        # Find the cells downstream of the previous and new flow direction of the rerouted cells
+        rerouted_flat = rerouted.ravel()
+        links = np.stack([previous_a, previous_b,
+                          np.where(rerouted_flat, receivers_a, -1), np.where(rerouted_flat, receivers_b, -1)])
+        updated = trace_downstream(links, rerouted_flat)
+        edge_list = find_window_edges(updated.reshape(rows, cols), window, grid)
+        if any(edge_list):
+            window = expand_window(window, edge_list, grid)
+            continue
+        break
+
+    # Calculate the inflow to the updated cells from the unchanged cells upstream of them
+    print(f'\t\tRefilled {int(region.sum())} cells and rerouted {int(rerouted.sum())} cells...')
+    previous_accumulation = read_block(flow_accumulation, grid, row_start, row_end, 0, col_start, col_end).ravel()
+    inflow = np.zeros(rows * cols)
+    for receivers, proportions in [(receivers_a, proportions_a), (receivers_b, 1 - proportions_a)]:
+        selection = ~updated & (receivers >= 0) & (proportions > 0)
+        selection[selection] = updated[receivers[selection]]
+        np.add.at(inflow, receivers[selection], (previous_accumulation[selection] + 1) * proportions[selection])
+
+    # Accumulate flow within the updated cells
+    print(f'\t\tAccumulating flow for {int(updated.sum())} cells...')
+    valid = np.isfinite(flow_angle).ravel()
+    weights = np.where(updated & valid, 1 + inflow, 0)
+    accumulation_array = accumulate_flow_dinf(np.where(updated, receivers_a, -1),
+                                              np.where(updated, receivers_b, -1), proportions_a, weights) + inflow
+    accumulation_array = np.where(valid, accumulation_array, np.nan).reshape(rows, cols)
+
+    # Patch the updated cells into the existing rasters
+    updated = updated.reshape(rows, cols)
+    write_region(flow_accumulation, accumulation_array, updated, row_start, col_start)
+    write_region(fill_raster, fill_array, region, row_start, col_start)
+    write_region(parent_raster, parent_array, region, row_start, col_start)
+    write_region(direction_raster, flow_angle, rerouted, row_start, col_start)
+
+    # List the blocks of the window that contain updated cells or changed elevation
+    update_windows = []
+    for block_row in range(0, rows, 256):
+        for block_col in range(0, cols, 256):
+            block_region = (updated | changed)[block_row:block_row + 256, block_col:block_col + 256]
+            if block_region.any():
+                update_windows.append((row_start + block_row, row_start + block_row + block_region.shape[0],
+                                       col_start + block_col, col_start + block_col + block_region.shape[1]))
+
+    return update_windows
@@ -22,6 +22,7 @@ from package_GeospatialProcessing.createSampleBlock import create_sample_block
 from package_GeospatialProcessing.downloadFromCSV import download_from_csv
 from package_GeospatialProcessing.downloadFromDrive import download_from_drive
 from package_GeospatialProcessing.extractRaster import extract_raster
+from package_GeospatialProcessing.extractSegmentCovariates import extract_segment_covariates
 from package_GeospatialProcessing.generateHydrographicPosition import generate_hydrographic_position
 from package_GeospatialProcessing.generateFlowlines import generate_flowlines
 from package_GeospatialProcessing.listFromDrive import list_from_drive
@@ -2,44 +2,101 @@
 # ---------------------------------------------------------------------------
 # Calculate Topographic Properties
 # Author: Timm Nawrocki
-# Last Updated: 2022-01-02
+# Last Updated: 2026-10-17
 # Usage: Must be executed in an ArcGIS Pro Python 3.7 installation.
-# Description: "Calculate Topographic Properties" is a function that calculates multiple integer topographic properties from a float elevation raster.
+# Description: "Calculate Topographic Properties" is a function that calculates multiple integer topographic properties from a float elevation raster. Each property is declared as a task with the tasks that produce its inputs, and independent tasks are calculated concurrently.
 # ---------------------------------------------------------------------------
 
+# Define a function to calculate flow accumulation and topographic wetness in one task
+def calculate_flow_wetness(area_raster, elevation_float, slope_float, wetness_output, flow_accumulation=None,
+                           update_extents=None):
+    """
+    Description: calculates flow accumulation and passes it directly to the topographic wetness calculation, or updates both for only the region affected by changed elevation
+    Inputs: 'area_raster' -- a raster of the study area to set snap raster and extract area
+            'elevation_float' -- an input float elevation raster
+            'slope_float' -- an input float slope raster in degrees
+            'wetness_output' -- a file path for an output topographic wetness raster
+            'flow_accumulation' -- an optional file path of a flow accumulation raster written by calculate_flow_numpy (None to hold flow accumulation in memory)
+            'update_extents' -- an optional list of map extents of changed elevation for which existing flow accumulation and wetness rasters are patched in place
+    Returned Value: Returns a raster dataset on disk
+    Preconditions: requires float input elevation and slope rasters
+    """
+
+    # Import packages
+    import os
+    from package_Geomorphometry import calculate_flow_numpy
+    from package_Geomorphometry import calculate_wetness_numpy
+    from package_Geomorphometry.updateFlowNumpy import define_flow_files
+    from package_Geomorphometry.updateFlowNumpy import update_flow_numpy
+
+    # Update flow accumulation and wetness for the region affected by changed elevation
+    if update_extents is not None and flow_accumulation is not None \
+            and all([os.path.exists(flow_file) for flow_file in define_flow_files(flow_accumulation)]):
+        update_windows = update_flow_numpy(area_raster, elevation_float, flow_accumulation, update_extents)
+        calculate_wetness_numpy(area_raster, flow_accumulation, slope_float, 100, wetness_output,
+                                update_windows=update_windows)
+        return
+
+    # Otherwise calculate flow accumulation and topographic wetness for the entire raster
+    if update_extents is not None:
+        print('\t\tThe flow network of a previous flow accumulation raster does not exist; recalculating flow for the entire raster...')
+    flow_array = calculate_flow_numpy(area_raster, elevation_float, flow_accumulation)
+    calculate_wetness_numpy(area_raster, flow_array, slope_float, 100, wetness_output)
+
 # Define a function to calculate topographic properties.
 def calculate_topographic_properties(**kwargs):
     """
     Description: calculates integer topographic properties from a float elevation raster
     Inputs: 'z_unit' -- a string value of either 'Meter' or 'Foot' representing the vertical unit of the elevation raster
-            'position_width' -- an integer value of the distance to consider for topographic position in the same units as the input raster
+            'position_width' -- an integer value of the distance to consider for topographic position in the same units as the input raster, or a list of distances to calculate topographic position at multiple scales
             'input_array' -- an array containing the grid raster (must be first) and the float elevation raster
-            'output_array' -- an array containing the output rasters for elevation (integer), slope, aspect, exposure, heat load, position, radiation, roughness, surface area, surface relief, wetness (in that order).
+            'output_array' -- an array containing the output rasters for elevation (integer), slope, aspect, exposure, heat load, position, radiation, roughness, surface area, surface relief, wetness (in that order). If multiple position widths are specified, the position output must be a list of rasters in the order of the widths.
+            'engine' -- an optional string of either 'arcpy' (default) or 'numpy' to select the backend used for array-based properties
+            'lookup_table' -- an optional boolean that controls whether the numpy engine interpolates exposure, heat load, and radiation from lookup tables of slope and aspect (default False)
+            'export_flow' -- an optional boolean that controls whether the numpy engine writes the flow accumulation raster (default True); if False, flow accumulation is passed to the wetness calculation in memory
+            'curvature_array' -- an optional array containing output rasters for plan, profile, and mean curvature (in that order) that the numpy engine calculates in the same pass as slope and aspect
+            'manifest' -- an optional file path for the manifest of elevation tiles written by merge_elevation_tiles; if the numpy engine has calculated the outputs from a previous manifest, only the windows affected by changed tiles are recalculated and patched into the existing outputs, and flow accumulation and wetness are recalculated for only the cells that the changed tiles affect if flow accumulation is exported
+            'workers' -- an optional number of processes to run independent topographic properties concurrently (defaults to all cores); if 1, properties are calculated one at a time. The numpy engine divides the cores between concurrent properties for the tile pools of each property.
     Returned Value: Returns a raster dataset on disk for each topographic property
     Preconditions: requires an input DEM that can be created through other scripts in this repository
     """
 
     # Import packages
-    import arcpy
     from package_Geomorphometry import calculate_aspect
     from package_Geomorphometry import calculate_exposure
     from package_Geomorphometry import calculate_flow
+    from package_Geomorphometry import calculate_flow_numpy
     from package_Geomorphometry import calculate_heat_load
     from package_Geomorphometry import calculate_integer_elevation
     from package_Geomorphometry import calculate_position
+    from package_Geomorphometry import calculate_position_numpy
     from package_Geomorphometry import calculate_radiation
     from package_Geomorphometry import calculate_roughness
+    from package_Geomorphometry import calculate_roughness_numpy
     from package_Geomorphometry import calculate_slope
+    from package_Geomorphometry import calculate_surface_derivatives
     from package_Geomorphometry import calculate_surface_area
     from package_Geomorphometry import calculate_surface_relief
+    from package_Geomorphometry import calculate_surface_relief_numpy
     from package_Geomorphometry import calculate_wetness
+    from package_Geomorphometry import calculate_wetness_numpy
     import datetime
     import os
+    from package_GeospatialProcessing.elevationManifest import compare_manifests
+    from package_GeospatialProcessing.elevationManifest import read_manifest
+    from package_GeospatialProcessing.elevationManifest import write_manifest
+    from package_GeospatialProcessing.executeTaskGraph import execute_task_graph
     import time
 
     # Parse key word argument inputs
     z_unit = kwargs['z_unit']
     position_width = kwargs['position_width']
+    engine = kwargs.get('engine', 'arcpy')
+    lookup_table = kwargs.get('lookup_table', False)
+    export_flow = kwargs.get('export_flow', True)
+    workers = kwargs.get('workers', None)
+    curvature_array = kwargs.get('curvature_array', None)
+    manifest_file = kwargs.get('manifest', None)
     area_raster = kwargs['input_array'][0]
     elevation_float = kwargs['input_array'][1]
     elevation_integer = kwargs['output_array'][0]
@@ -54,6 +111,29 @@ def calculate_topographic_properties(**kwargs):
     surfacerelief_output = kwargs['output_array'][9]
     wetness_output = kwargs['output_array'][10]
 
+    # Convert position inputs to lists
+    if isinstance(position_width, list):
+        position_widths = position_width
+        position_outputs = position_output
+    else:
+        position_widths = [position_width]
+        position_outputs = [position_output]
+
+    # Define outputs of point-wise properties
+    pointwise_outputs = [elevation_integer,
+                         slope_integer,
+                         aspect_integer,
+                         exposure_output,
+                         heatload_output,
+                         radiation_output,
+                         surfacearea_output]
+
+    # Add curvature to the outputs of the point-wise pass
+    if curvature_array is not None and engine == 'numpy':
+        pointwise_outputs = pointwise_outputs + list(curvature_array)
+    elif curvature_array is not None:
+        print('\tCurvature is only calculated by the numpy engine.')
+
     # Define folder structure
     float_folder = os.path.split(elevation_float)[0]
 
@@ -61,25 +141,43 @@ def calculate_topographic_properties(**kwargs):
     flow_accumulation = os.path.join(float_folder, 'Flow_Accumulation.tif')
     slope_float = os.path.join(float_folder, 'Slope.tif')
     aspect_float = os.path.join(float_folder, 'Aspect.tif')
+    record_file = os.path.join(os.path.split(elevation_integer)[0], 'Topography_Manifest.json')
 
     #### PERFORM UNITS CHECK
 
     # Describe the type of spatial reference
     print(f'\tChecking projection and units of elevation raster...')
-    description = arcpy.Describe(elevation_float)
-    spatial_reference = description.spatialReference
-    reference_type = spatial_reference.type
+    if engine == 'numpy':
+        import rasterio
+        with rasterio.open(elevation_float) as elevation_dataset:
+            spatial_reference = elevation_dataset.crs
+        geographic = spatial_reference is None or spatial_reference.is_projected == 0
+    else:
+        import arcpy
+        spatial_reference = arcpy.Describe(elevation_float).spatialReference
+        geographic = spatial_reference.type == "Geographic"
 
     # Warn user and quit script if the elevation raster is in a geographic spatial reference
-    if reference_type == "Geographic":
+    if geographic:
         print(
             '\tERROR: Elevation raster must be in a projected spatial reference, not a geographic spatial reference.')
         quit()
     # Check units
     else:
         print('\tElevation raster is in a projected spatial reference.')
+    # Name the horizontal unit from its length in meters if using the numpy engine
+    if engine == 'numpy':
+        unit_name, unit_factor = spatial_reference.linear_units_factor
+        unit_dictionary = {1.0: 'METER',
+                           0.3048: 'FOOT',
+                           0.3048006096: 'FOOT_US'}
+        reference_unit = unit_name.upper()
+        for unit_length, unit_code in unit_dictionary.items():
+            if abs(unit_factor - unit_length) < 1e-9:
+                reference_unit = unit_code
+    else:
+        reference_unit = spatial_reference.linearUnitName.upper()
     # Warn user and quit script if the vertical and horizontal units are not the same
-    reference_unit = spatial_reference.linearUnitName.upper()
     if reference_unit != z_unit:
         print(f'\tERROR: Vertical units ({z_unit}) and horizontal units ({reference_unit}) do not match.')
         quit()
@@ -88,215 +186,196 @@ def calculate_topographic_properties(**kwargs):
         print(f'\tVertical units ({z_unit}) and horizontal units ({reference_unit}) match.')
     print('\t----------')
 
-    #### CALCULATE FOUNDATIONAL TOPOGRAPHY DATASETS
+    #### IDENTIFY CHANGED ELEVATION TILES
 
-    # Calculate integer elevation if it does not already exist
-    if arcpy.Exists(elevation_integer) == 0:
-        print(f'\tCalculating integer elevation...')
-        iteration_start = time.time()
-        calculate_integer_elevation(area_raster, elevation_float, elevation_integer)
-        # End timing
-        iteration_end = time.time()
-        iteration_elapsed = int(iteration_end - iteration_start)
-        iteration_success_time = datetime.datetime.now()
-        # Report success
-        print(
-            f'\tCompleted at {iteration_success_time.strftime("%Y-%m-%d %H:%M")} (Elapsed time: {datetime.timedelta(seconds=iteration_elapsed)})')
+    # Compare the elevation manifest to the manifest of the previous calculation
+    update_extents = None
+    if manifest_file is not None and engine == 'numpy' and os.path.exists(record_file):
+        update_extents = compare_manifests(read_manifest(manifest_file), read_manifest(record_file))
+        if len(update_extents) == 0:
+            print('\tTopographic properties are up to date with the elevation tiles.')
+            print('\t----------')
+            outprocess = f'Finished calculating topographic properties.'
+            return outprocess
+        print(f'\tUpdating topographic properties for {len(update_extents)} changed tile extents...')
         print('\t----------')
-    else:
-        print(f'\tInteger elevation already exists.')
+    elif manifest_file is not None and engine != 'numpy':
+        print('\tIncremental updates from the elevation manifest require the numpy engine.')
         print('\t----------')
 
-    # Calculate slope in degrees if it does not already exist
-    if os.path.exists(slope_integer) == 0:
-        # Calculate slope
-        print(f'\tCalculating slope...')
-        iteration_start = time.time()
-        calculate_slope(area_raster, elevation_float, z_unit, slope_float, slope_integer)
-        # End timing
-        iteration_end = time.time()
-        iteration_elapsed = int(iteration_end - iteration_start)
-        iteration_success_time = datetime.datetime.now()
-        # Report success
-        print(
-            f'\tCompleted at {iteration_success_time.strftime("%Y-%m-%d %H:%M")} (Elapsed time: {datetime.timedelta(seconds=iteration_elapsed)})')
-        print('\t----------')
-    else:
-        print(f'\tRaw slope already exists.')
-        print('\t----------')
+    #### DEFINE TOPOGRAPHY TASK GRAPH
 
-    # Calculate aspect if it does not already exist
-    if os.path.exists(aspect_integer) == 0:
-        # Calculate aspect
-        print(f'\tCalculating aspect...')
-        iteration_start = time.time()
-        calculate_aspect(area_raster, elevation_float, z_unit, aspect_float, aspect_integer)
-        # End timing
-        iteration_end = time.time()
-        iteration_elapsed = int(iteration_end - iteration_start)
-        iteration_success_time = datetime.datetime.now()
-        # Report success
-        print(
-            f'\tCompleted at {iteration_success_time.strftime("%Y-%m-%d %H:%M")} (Elapsed time: {datetime.timedelta(seconds=iteration_elapsed)})')
-        print('\t----------')
-    else:
-        print(f'\tAspect already exists.')
-        print('\t----------')
+    # Define tasks for point-wise properties in one pass if using the numpy engine
+    task_list = []
+    if engine == 'numpy':
+        task_list.append({'name': 'surface_derivatives',
+                          'label': 'integer elevation, slope, aspect, exposure, heat load, radiation, and surface area',
+                          'function': calculate_surface_derivatives,
+                          'arguments': (area_raster, elevation_float, z_unit, slope_float, aspect_float,
+                                        pointwise_outputs[:7]),
+                          'keywords': {'lookup_table': lookup_table, 'curvature_array': curvature_array},
+                          'outputs': [slope_float, aspect_float] + pointwise_outputs,
+                          'inputs': [],
+                          'pooled': True})
+        slope_task = 'surface_derivatives'
+        aspect_task = 'surface_derivatives'
 
-    # Calculate flow accumulation if it does not already exist
-    if arcpy.Exists(flow_accumulation) == 0:
-        # Calculate flow direction
-        print(f'\tCalculating flow direction...')
-        iteration_start = time.time()
-        calculate_flow(area_raster, elevation_float, flow_accumulation)
-        # End timing
-        iteration_end = time.time()
-        iteration_elapsed = int(iteration_end - iteration_start)
-        iteration_success_time = datetime.datetime.now()
-        # Report success
-        print(
-            f'\tCompleted at {iteration_success_time.strftime("%Y-%m-%d %H:%M")} (Elapsed time: {datetime.timedelta(seconds=iteration_elapsed)})')
-        print('\t----------')
+    # Otherwise define tasks for integer elevation, slope, aspect, and their derivatives separately
     else:
-        print(f'\tFlow direction already exists.')
-        print('\t----------')
+        task_list.append({'name': 'elevation',
+                          'label': 'integer elevation',
+                          'function': calculate_integer_elevation,
+                          'arguments': (area_raster, elevation_float, elevation_integer),
+                          'outputs': [elevation_integer],
+                          'inputs': []})
+        task_list.append({'name': 'slope',
+                          'label': 'slope',
+                          'function': calculate_slope,
+                          'arguments': (area_raster, elevation_float, z_unit, slope_float, slope_integer),
+                          'outputs': [slope_float, slope_integer],
+                          'inputs': []})
+        task_list.append({'name': 'aspect',
+                          'label': 'aspect',
+                          'function': calculate_aspect,
+                          'arguments': (area_raster, elevation_float, z_unit, aspect_float, aspect_integer),
+                          'outputs': [aspect_float, aspect_integer],
+                          'inputs': []})
+        task_list.append({'name': 'exposure',
+                          'label': 'solar exposure',
+                          'function': calculate_exposure,
+                          'arguments': (area_raster, aspect_float, slope_float, 100, exposure_output),
+                          'outputs': [exposure_output],
+                          'inputs': ['slope', 'aspect']})
+        task_list.append({'name': 'heat_load',
+                          'label': 'heat load index',
+                          'function': calculate_heat_load,
+                          'arguments': (area_raster, elevation_float, slope_float, aspect_float, 10000,
+                                        heatload_output),
+                          'outputs': [heatload_output],
+                          'inputs': ['slope', 'aspect']})
+        task_list.append({'name': 'radiation',
+                          'label': 'topographic radiation',
+                          'function': calculate_radiation,
+                          'arguments': (area_raster, aspect_float, 1000, radiation_output),
+                          'outputs': [radiation_output],
+                          'inputs': ['aspect']})
+        task_list.append({'name': 'surface_area',
+                          'label': 'surface area ratio',
+                          'function': calculate_surface_area,
+                          'arguments': (area_raster, slope_float, 10, surfacearea_output),
+                          'outputs': [surfacearea_output],
+                          'inputs': ['slope']})
+        slope_task = 'slope'
+        aspect_task = 'aspect'
 
-    #### CALCULATE DERIVED TOPOGRAPHY DATASETS
-
-    # Calculate solar exposure index if it does not already exist
-    if arcpy.Exists(exposure_output) == 0:
-        print(f'\tCalculating solar exposure...')
-        iteration_start = time.time()
-        calculate_exposure(area_raster, aspect_float, slope_float, 100, exposure_output)
-        # End timing
-        iteration_end = time.time()
-        iteration_elapsed = int(iteration_end - iteration_start)
-        iteration_success_time = datetime.datetime.now()
-        # Report success
-        print(
-            f'\tCompleted at {iteration_success_time.strftime("%Y-%m-%d %H:%M")} (Elapsed time: {datetime.timedelta(seconds=iteration_elapsed)})')
-        print('\t----------')
+    # Define tasks for flow accumulation and topographic wetness
+    if engine == 'numpy' and export_flow == 0:
+        task_list.append({'name': 'wetness',
+                          'label': 'flow accumulation in memory and topographic wetness',
+                          'function': calculate_flow_wetness,
+                          'arguments': (area_raster, elevation_float, slope_float, wetness_output),
+                          'outputs': [wetness_output],
+                          'inputs': [slope_task]})
     else:
-        print(f'\tSite exposure already exists.')
-        print('\t----------')
+        if engine == 'numpy':
+            task_list.append({'name': 'flow',
+                              'label': 'flow accumulation',
+                              'function': calculate_flow_numpy,
+                              'arguments': (area_raster, elevation_float, flow_accumulation),
+                              'outputs': [flow_accumulation],
+                              'inputs': []})
+            task_list.append({'name': 'wetness',
+                              'label': 'topographic wetness',
+                              'function': calculate_wetness_numpy,
+                              'arguments': (area_raster, flow_accumulation, slope_float, 100, wetness_output),
+                              'outputs': [wetness_output],
+                              'inputs': ['flow', slope_task]})
+        else:
+            task_list.append({'name': 'flow',
+                              'label': 'flow accumulation',
+                              'function': calculate_flow,
+                              'arguments': (area_raster, elevation_float, flow_accumulation, engine),
+                              'outputs': [flow_accumulation],
+                              'inputs': []})
+            task_list.append({'name': 'wetness',
+                              'label': 'topographic wetness',
+                              'function': calculate_wetness,
+                              'arguments': (area_raster, elevation_float, flow_accumulation, slope_float, 100,
+                                            wetness_output),
+                              'outputs': [wetness_output],
+                              'inputs': ['flow', slope_task]})
 
-    # Calculate heat load index if it does not already exist
-    if arcpy.Exists(heatload_output) == 0:
-        print('\tCalculating heat load index...')
-        iteration_start = time.time()
-        calculate_heat_load(area_raster, elevation_float, slope_float, aspect_float, 10000, heatload_output)
-        # End timing
-        iteration_end = time.time()
-        iteration_elapsed = int(iteration_end - iteration_start)
-        iteration_success_time = datetime.datetime.now()
-        # Report success
-        print(
-            f'\tCompleted at {iteration_success_time.strftime("%Y-%m-%d %H:%M")} (Elapsed time: {datetime.timedelta(seconds=iteration_elapsed)})')
-        print('\t----------')
+    # Define tasks for topographic position
+    if engine == 'numpy':
+        task_list.append({'name': 'position',
+                          'label': 'topographic position',
+                          'function': calculate_position_numpy,
+                          'arguments': (area_raster, elevation_float, position_widths, position_outputs),
+                          'outputs': position_outputs,
+                          'inputs': [],
+                          'pooled': True})
     else:
-        print(f'\tHeat load index already exists.')
-        print('\t----------')
+        for width, output in zip(position_widths, position_outputs):
+            task_list.append({'name': f'position_{width}',
+                              'label': f'topographic position at {width}',
+                              'function': calculate_position,
+                              'arguments': (area_raster, elevation_float, width, output),
+                              'outputs': [output],
+                              'inputs': []})
 
-    # Calculate topographic position if it does not already exist
-    if arcpy.Exists(position_output) == 0:
-        print(f'\tCalculating topographic position...')
-        iteration_start = time.time()
-        calculate_position(area_raster, elevation_float, position_width, position_output)
-        # End timing
-        iteration_end = time.time()
-        iteration_elapsed = int(iteration_end - iteration_start)
-        iteration_success_time = datetime.datetime.now()
-        # Report success
-        print(
-            f'\tCompleted at {iteration_success_time.strftime("%Y-%m-%d %H:%M")} (Elapsed time: {datetime.timedelta(seconds=iteration_elapsed)})')
-        print('\t----------')
-    else:
-        print(f'\tTopographic position already exists.')
-        print('\t----------')
+    # Define tasks for roughness and surface relief ratio
+    task_list.append({'name': 'roughness',
+                      'label': 'roughness',
+                      'function': calculate_roughness_numpy if engine == 'numpy' else calculate_roughness,
+                      'arguments': (area_raster, elevation_float, 10, roughness_output),
+                      'outputs': [roughness_output],
+                      'inputs': [],
+                      'pooled': engine == 'numpy'})
+    task_list.append({'name': 'surface_relief',
+                      'label': 'surface relief ratio',
+                      'function': calculate_surface_relief_numpy if engine == 'numpy' else calculate_surface_relief,
+                      'arguments': (area_raster, elevation_float, 10000, surfacerelief_output),
+                      'outputs': [surfacerelief_output],
+                      'inputs': [],
+                      'pooled': engine == 'numpy'})
 
-    # Calculate topographic radiation if it does not already exist
-    if arcpy.Exists(radiation_output) == 0:
-        print(f'\tCalculating topographic radiation...')
-        iteration_start = time.time()
-        calculate_radiation(area_raster, aspect_float, 1000, radiation_output)
-        # End timing
-        iteration_end = time.time()
-        iteration_elapsed = int(iteration_end - iteration_start)
-        iteration_success_time = datetime.datetime.now()
-        # Report success
-        print(
-            f'\tCompleted at {iteration_success_time.strftime("%Y-%m-%d %H:%M")} (Elapsed time: {datetime.timedelta(seconds=iteration_elapsed)})')
-        print('\t----------')
-    else:
-        print(f'\tTopographic radiation already exists.')
-        print('\t----------')
+    # Patch existing outputs in place if only some elevation tiles have changed
+    if update_extents is not None:
+        flow_output = flow_accumulation if export_flow else None
+        task_list = [task for task in task_list if task['name'] not in ['flow', 'wetness']]
+        task_list.append({'name': 'wetness',
+                          'label': 'flow accumulation and topographic wetness for changed elevation',
+                          'function': calculate_flow_wetness,
+                          'arguments': (area_raster, elevation_float, slope_float, wetness_output, flow_output),
+                          'outputs': [],
+                          'inputs': [slope_task]})
+        for task in task_list:
+            task['outputs'] = []
+            task['keywords'] = dict(task.get('keywords', {}), update_extents=update_extents)
 
-    # Calculate roughness if it does not already exist
-    if arcpy.Exists(roughness_output) == 0:
-        print(f'\tCalculating roughness...')
-        iteration_start = time.time()
-        calculate_roughness(area_raster, elevation_float, 10, roughness_output)
-        # End timing
-        iteration_end = time.time()
-        iteration_elapsed = int(iteration_end - iteration_start)
-        iteration_success_time = datetime.datetime.now()
-        # Report success
-        print(
-            f'\tCompleted at {iteration_success_time.strftime("%Y-%m-%d %H:%M")} (Elapsed time: {datetime.timedelta(seconds=iteration_elapsed)})')
-        print('\t----------')
-    else:
-        print(f'\tRoughness already exists.')
-        print('\t----------')
+    #### CALCULATE TOPOGRAPHY DATASETS
 
-    # Calculate surface area ratio if it does not already exist
-    if os.path.exists(surfacearea_output) == 0:
-        print(f'\tCalculating surface area ratio...')
-        iteration_start = time.time()
-        calculate_surface_area(area_raster, slope_float, 10, surfacearea_output)
-        # End timing
-        iteration_end = time.time()
-        iteration_elapsed = int(iteration_end - iteration_start)
-        iteration_success_time = datetime.datetime.now()
-        # Report success
-        print(
-            f'\tCompleted at {iteration_success_time.strftime("%Y-%m-%d %H:%M")} (Elapsed time: {datetime.timedelta(seconds=iteration_elapsed)})')
-        print('\t----------')
-    else:
-        print(f'\tSurface area ratio already exists.')
-        print('\t----------')
+    # List outputs of all tasks
+    output_list = [output for task in task_list for output in task['outputs']]
 
-    # Calculate surface relief ratio if it does not already exist
-    if arcpy.Exists(surfacerelief_output) == 0:
-        print(f'\tCalculating surface relief ratio...')
-        iteration_start = time.time()
-        calculate_surface_relief(area_raster, elevation_float, 10000, surfacerelief_output)
-        # End timing
-        iteration_end = time.time()
-        iteration_elapsed = int(iteration_end - iteration_start)
-        iteration_success_time = datetime.datetime.now()
-        # Report success
-        print(
-            f'\tCompleted at {iteration_success_time.strftime("%Y-%m-%d %H:%M")} (Elapsed time: {datetime.timedelta(seconds=iteration_elapsed)})')
-        print('\t----------')
-    else:
-        print(f'\tSurface relief ratio already exists.')
-        print('\t----------')
+    # Run tasks concurrently as their inputs become available
+    print(f'\tCalculating {len(task_list)} topographic tasks with up to {min(workers or os.cpu_count(), len(task_list))} workers...')
+    print('\t----------')
+    iteration_start = time.time()
+    elapsed_dictionary = execute_task_graph(task_list, workers)
+    # End timing
+    iteration_end = time.time()
+    iteration_elapsed = int(iteration_end - iteration_start)
+    iteration_success_time = datetime.datetime.now()
+    # Report success
+    print(
+        f'\tCompleted {len(elapsed_dictionary)} tasks at {iteration_success_time.strftime("%Y-%m-%d %H:%M")} (Elapsed time: {datetime.timedelta(seconds=iteration_elapsed)})')
+    print('\t----------')
 
-    # Calculate topographic wetness if it does not already exist
-    if arcpy.Exists(wetness_output) == 0:
-        print(f'\tCalculating topographic wetness...')
-        iteration_start = time.time()
-        calculate_wetness(area_raster, elevation_float, flow_accumulation, slope_float, 100, wetness_output)
-        # End timing
-        iteration_end = time.time()
-        iteration_elapsed = int(iteration_end - iteration_start)
-        iteration_success_time = datetime.datetime.now()
-        # Report success
-        print(f'\tCompleted at {iteration_success_time.strftime("%Y-%m-%d %H:%M")} (Elapsed time: {datetime.timedelta(seconds=iteration_elapsed)})')
-        print('\t----------')
-    else:
-        print(f'\tTopographic wetness already exists.')
-        print('\t----------')
+    # Record the elevation manifest that the outputs were calculated from
+    if manifest_file is not None and engine == 'numpy':
+        if all([os.path.exists(output) for output in output_list]):
+            write_manifest(record_file, read_manifest(manifest_file))
 
     outprocess = f'Finished calculating topographic properties.'
     return outprocess
@@ -2,9 +2,9 @@
 # ---------------------------------------------------------------------------
 # Calculate zonal statistics
 # Author: Timm Nawrocki
-# Last Updated: 2022-01-02
-# Usage: Must be executed in an ArcGIS Pro Python 3.7 installation.
-# Description: "Calculate zonal statistics" is a function that calculates zonal statistics of an input raster to a zone raster.
+# Last Updated: 2026-10-17
+# Usage: Must be executed in an ArcGIS Pro Python 3.7 installation, or in a Python 3.8+ distribution with numpy and rasterio for the numpy engine.
+# Description: "Calculate zonal statistics" is a function that calculates zonal statistics of an input raster to a zone raster. The numpy engine reduces the input raster with the same reducer as the segment covariates, which streams windowed reads of tiles of the zone raster through mergeable zonal accumulators in parallel processes so that memory is bounded by the tile size and the number of zones, or uses overlap weights at the native resolution of input rasters coarser than the zone raster.
 # ---------------------------------------------------------------------------
 
 # Define a function to calculate zonal statistics
@@ -12,29 +12,104 @@ def calculate_zonal_statistics(**kwargs):
     """
     Description: calculates integer zonal statistics of an input raster to a zone raster
     Inputs: 'statistic' -- a string value of the statistic to calculate
-            'zone_field' -- a string value of the field to use from the zone raster to define zones
+            'zone_field' -- a string value of the field to use from the zone raster to define zones, which must be 'VALUE' for the numpy engine
             'work_geodatabase' -- a geodatabase to store temporary results
-            'input_array' -- an array containing the area raster, the input raster, and the zone raster
+            'engine' -- an optional string of either 'arcpy' (default) or 'numpy' to calculate the statistic with ZonalStatistics or with zonal accumulators that support 'MEAN', 'STD', 'RANGE', 'MINIMUM', 'MAXIMUM', 'SUM', 'COUNT', and, with bin edges, 'MEDIAN' and 'MAJORITY'
+            'tile_size' -- an optional number of rows and columns of the zone raster per tile for the numpy engine (default 2048)
+            'workers' -- an optional number of processes for the numpy engine (defaults to all cores)
+            'bin_edges' -- an optional increasing array of histogram bin edges for the median and majority of the numpy engine, such as one bin per integer value
+            'input_array' -- an array containing the zone raster and the input raster
             'output_array' -- an array containing the output summary raster
     Returned Value: Returns a raster dataset on disk
     Preconditions: requires an input raster and zone raster from image segmentation that can be created through other scripts in this repository
     """
 
     # Import packages
-    import arcpy
-    from arcpy.sa import Raster
-    from arcpy.sa import ZonalStatistics
     import datetime
+    import numpy as np
+    from package_Geomorphometry.rasterBlocks import define_grid
+    from package_Geomorphometry.rasterBlocks import define_tiles
+    from package_GeospatialProcessing.zonalAccumulators import split_band
+    from package_GeospatialProcessing.zonalAccumulators import summarize_zones
+    from package_GeospatialProcessing.zoneIndex import reduce_raster
+    import rasterio
+    from rasterio.windows import Window
     import time
 
     # Parse key word argument inputs
     statistic = kwargs['statistic']
     zone_field = kwargs['zone_field']
     work_geodatabase = kwargs['work_geodatabase']
+    engine = kwargs.get('engine', 'arcpy')
+    tile_size = kwargs.get('tile_size', 2048)
+    workers = kwargs.get('workers', None)
+    bin_edges = kwargs.get('bin_edges', None)
     zone_raster = kwargs['input_array'][0]
     input_raster = kwargs['input_array'][1]
     output_raster = kwargs['output_array'][0]
 
+    # Calculate zonal statistics with streaming accumulators if using the numpy engine
+    if engine == 'numpy':
+        # Check that zones are defined by raster values
+        if zone_field != 'VALUE':
+            print('\t\tERROR: The numpy engine requires the zone field VALUE.')
+            quit()
+
+        # Describe zone raster and input raster
+        input_path, input_band = split_band(input_raster)
+        with rasterio.open(zone_raster) as zone_dataset, rasterio.open(input_path) as input_dataset:
+            zone_profile = zone_dataset.profile
+            value_type = input_dataset.dtypes[input_band - 1]
+            no_data_value = input_dataset.nodatavals[input_band - 1]
+        if no_data_value is None:
+            if np.dtype(value_type).kind == 'u':
+                no_data_value = np.iinfo(value_type).max
+            elif np.dtype(value_type).kind == 'i':
+                no_data_value = -32768
+            else:
+                no_data_value = -2147483648
+        print(f'\t\tOutput data type will be {value_type}.')
+        print(f'\t\tOutput no data value will be {no_data_value}.')
+        print('\t\t----------')
+
+        # Accumulate tiles and calculate statistic per zone
+        print(f'\t\tCalculating zonal {statistic.lower()}...')
+        iteration_start = time.time()
+        accumulators = reduce_raster(zone_raster, None, input_raster, tile_size=tile_size, workers=workers,
+                                     bin_edges=bin_edges)[0]
+        summary = summarize_zones(accumulators, statistic)
+        if np.dtype(value_type).kind in 'iu':
+            summary = np.rint(summary)
+        summary = np.where(np.isnan(summary), no_data_value, summary).astype(value_type)
+
+        # Write summary tile by tile
+        output_profile = dict(zone_profile, driver='GTiff', count=1, dtype=value_type, nodata=no_data_value,
+                              compress='lzw', BIGTIFF='IF_SAFER')
+        with rasterio.open(zone_raster) as zone_dataset, rasterio.open(output_raster, 'w', **output_profile) as output_dataset:
+            for row_start, row_end, col_start, col_end in define_tiles(define_grid(zone_raster), tile_size):
+                window = Window(col_start, row_start, col_end - col_start, row_end - row_start)
+                zone_values = zone_dataset.read(1, window=window, masked=True).astype('int64').filled(-1)
+                zone_values[zone_values >= len(summary)] = -1
+                output_block = np.where(zone_values >= 0, summary[np.maximum(zone_values, 0)], no_data_value)
+                output_dataset.write(output_block.astype(value_type), 1, window=window)
+        # End timing
+        iteration_end = time.time()
+        iteration_elapsed = int(iteration_end - iteration_start)
+        iteration_success_time = datetime.datetime.now()
+        # Report success
+        print(
+            f'\t\tCompleted at {iteration_success_time.strftime("%Y-%m-%d %H:%M")} (Elapsed time: {datetime.timedelta(seconds=iteration_elapsed)})')
+        print('\t\t----------')
+
+        # Return success message
+        outprocess = f'\tSuccessfully created zonal {statistic.lower()}.'
+        return outprocess
+
+    # Import arcpy packages
+    import arcpy
+    from arcpy.sa import Raster
+    from arcpy.sa import ZonalStatistics
+
     # Set overwrite option
     arcpy.env.overwriteOutput = True
 
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------------------------
+# Elevation manifest
+# Author: Timm Nawrocki
+# Last Updated: 2026-10-17
+# Usage: Must be executed in a Python 3.8+ distribution.
+# Description: "Elevation manifest" is a set of functions that record the checksum and projected extent of each source elevation tile in a merged DEM and compare two records to find the extents of tiles that were added, removed, or changed.
+# ---------------------------------------------------------------------------
+
+# Define a function to calculate the checksum of a file
+def calculate_checksum(file_path, chunk_size=1048576):
+    """
+    Description: calculates the SHA-256 checksum of a file read in chunks
+    Inputs: 'file_path' -- a file path
+            'chunk_size' -- the number of bytes to read at a time
+    Returned Value: Returns the hexadecimal checksum as a string
+    Preconditions: requires an existing file
+    """
+
+    # Import packages
+    import hashlib
+
+    # Hash file contents
+    file_hash = hashlib.sha256()
+    with open(file_path, 'rb') as input_file:
+        for chunk in iter(lambda: input_file.read(chunk_size), b''):
+            file_hash.update(chunk)
+
+    return file_hash.hexdigest()
+
+# Define a function to read a manifest
+def read_manifest(manifest_file):
+    """
+    Description: reads a manifest of elevation tiles
+    Inputs: 'manifest_file' -- a file path for a json manifest
+    Returned Value: Returns a dictionary of tile names to dictionaries of checksum and extent, which is empty if the manifest does not exist
+    Preconditions: requires a manifest written by write_manifest if it exists
+    """
+
+    # Import packages
+    import json
+    import os
+
+    # Return an empty manifest if none exists
+    if os.path.exists(manifest_file) == 0:
+        return {}
+
+    # Read manifest
+    with open(manifest_file, 'r') as input_file:
+        manifest = json.load(input_file)
+
+    return manifest
+
+# Define a function to write a manifest
+def write_manifest(manifest_file, manifest):
+    """
+    Description: writes a manifest of elevation tiles
+    Inputs: 'manifest_file' -- a file path for a json manifest
+            'manifest' -- a dictionary of tile names to dictionaries of 'checksum' and 'extent' as minimum x, minimum y, maximum x, and maximum y
+    Returned Value: Returns a json file on disk
+    Preconditions: None
+    """
+
+    # Import packages
+    import json
+
+    # Write manifest
+    with open(manifest_file, 'w') as output_file:
+        json.dump(manifest, output_file, indent=2, sort_keys=True)
+
+# Define a function to compare manifests
+def compare_manifests(current_manifest, previous_manifest):
+    """
+    Description: finds the extents of tiles that were added, removed, or changed between two manifests, including both the previous and current extents of changed tiles
+    Inputs: 'current_manifest' -- a dictionary of the current tiles from read_manifest
+            'previous_manifest' -- a dictionary of the previous tiles from read_manifest
+    Returned Value: Returns a list of tuples of minimum x, minimum y, maximum x, and maximum y
+    Preconditions: requires extents in the same coordinate system
+    """
+
+    # Compare tiles in either manifest
+    update_extents = []
+    for tile_name in sorted(set(current_manifest) | set(previous_manifest)):
+        current_tile = current_manifest.get(tile_name)
+        previous_tile = previous_manifest.get(tile_name)
+        if current_tile is not None and previous_tile is not None \
+                and current_tile['checksum'] == previous_tile['checksum'] \
+                and current_tile['extent'] == previous_tile['extent']:
+            continue
+        for tile in [current_tile, previous_tile]:
+            if tile is not None and tuple(tile['extent']) not in update_extents:
+                update_extents.append(tuple(tile['extent']))
+
+    return update_extents
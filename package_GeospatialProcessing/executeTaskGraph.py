@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------------------------
+# Execute task graph
+# Author: Timm Nawrocki
+# Last Updated: 2026-10-17
+# Usage: Must be executed in a Python 3.8+ distribution.
+# Description: "Execute task graph" is a set of functions that run a list of geoprocessing tasks with declared dependencies, starting each task in a process pool as soon as the tasks that produce its inputs have finished, so that independent tasks run concurrently. Tasks that process tiles in their own process pools share one budget of cores with the task graph so that nested pools do not start more processes than there are cores.
+# ---------------------------------------------------------------------------
+
+# Define a function to run a single task
+def run_task(task_arguments):
+    """
+    Description: runs a task function and measures its wall time
+    Inputs: 'task_arguments' -- a tuple of the task function, a tuple of positional arguments, and a dictionary of key word arguments
+    Returned Value: Returns the elapsed wall time of the task in seconds
+    Preconditions: requires a function that writes its outputs to disk
+    """
+
+    # Import packages
+    import time
+
+    # Run task
+    task_start = time.time()
+    task_function, task_positional, task_keywords = task_arguments
+    task_function(*task_positional, **task_keywords)
+
+    return time.time() - task_start
+
+# Define a function to define the key word arguments of a task
+def define_keywords(task, tile_workers):
+    """
+    Description: adds the number of tile processes to the key word arguments of tasks that process tiles in a pool
+    Inputs: 'task' -- a task dictionary
+            'tile_workers' -- the number of processes available to the tile pool of each concurrent task
+    Returned Value: Returns a dictionary of key word arguments
+    Preconditions: requires task functions that accept a 'workers' key word argument if the task is marked as 'pooled'
+    """
+
+    # Add the number of tile processes to pooled tasks
+    task_keywords = dict(task.get('keywords', {}))
+    if task.get('pooled', False):
+        task_keywords['workers'] = tile_workers
+
+    return task_keywords
+
+# Define a function to report a completed task
+def report_task(task, task_elapsed):
+    """
+    Description: prints the completion time and wall time of a task
+    Inputs: 'task' -- a task dictionary
+            'task_elapsed' -- the elapsed wall time of the task in seconds
+    Returned Value: Prints a message
+    Preconditions: None
+    """
+
+    # Import packages
+    import datetime
+
+    # Report success
+    task_success_time = datetime.datetime.now()
+    print(
+        f'\tCompleted {task["label"]} at {task_success_time.strftime("%Y-%m-%d %H:%M")} (Elapsed time: {datetime.timedelta(seconds=int(task_elapsed))})')
+    print('\t----------')
+
+# Define a function to execute a task graph
+def execute_task_graph(task_list, workers=None):
+    """
+    Description: runs tasks in dependency order, skipping tasks whose outputs already exist and running tasks whose inputs are ready concurrently
+    Inputs: 'task_list' -- a list of task dictionaries, each with a 'name', a 'label', a 'function', a tuple of 'arguments', an optional dictionary of 'keywords', a list of 'outputs' (empty to always run the task), a list of the names of the tasks that produce its 'inputs', and an optional 'pooled' boolean for tasks that accept a 'workers' key word argument for their own tile pools
+            'workers' -- the number of tasks to run concurrently (defaults to all cores, limited to the number of tasks); if 1, tasks run one at a time in the current process. The cores are divided between concurrent tasks for the tile pools of pooled tasks.
+    Returned Value: Returns a dictionary of the elapsed wall time in seconds of each task that ran
+    Preconditions: requires task functions that are defined at module level so that they can be sent to other processes
+    """
+
+    # Import packages
+    from concurrent.futures import FIRST_COMPLETED
+    from concurrent.futures import ProcessPoolExecutor
+    from concurrent.futures import wait
+    import os
+
+    # Mark tasks with existing outputs as complete
+    completed_tasks = set()
+    for task in task_list:
+        if len(task['outputs']) > 0 and all([os.path.exists(output) for output in task['outputs']]):
+            print(f'\t{task["label"].capitalize()} already exists.')
+            print('\t----------')
+            completed_tasks.add(task['name'])
+    waiting_tasks = [task for task in task_list if task['name'] not in completed_tasks]
+
+    # Divide the cores between concurrent tasks and the tile pools of pooled tasks
+    if workers == 1:
+        graph_workers = 1
+    else:
+        graph_workers = max(1, min(workers or os.cpu_count(), len(waiting_tasks)))
+    tile_workers = max(1, os.cpu_count() // graph_workers)
+
+    # Run tasks one at a time in the current process if only one worker is requested
+    elapsed_dictionary = {}
+    if graph_workers == 1:
+        while len(waiting_tasks) > 0:
+            ready_tasks = [task for task in waiting_tasks
+                           if all([name in completed_tasks for name in task['inputs']])]
+            if len(ready_tasks) == 0:
+                break
+            task = ready_tasks[0]
+            print(f'\tCalculating {task["label"]}...')
+            task_elapsed = run_task((task['function'], task['arguments'], define_keywords(task, tile_workers)))
+            report_task(task, task_elapsed)
+            elapsed_dictionary[task['name']] = task_elapsed
+            completed_tasks.add(task['name'])
+            waiting_tasks.remove(task)
+
+    # Otherwise submit each task as soon as its inputs are complete
+    else:
+        running_tasks = {}
+        with ProcessPoolExecutor(max_workers=graph_workers) as executor:
+            while len(waiting_tasks) > 0 or len(running_tasks) > 0:
+                ready_tasks = [task for task in waiting_tasks
+                               if all([name in completed_tasks for name in task['inputs']])]
+                for task in ready_tasks:
+                    print(f'\tCalculating {task["label"]}...')
+                    future = executor.submit(run_task, (task['function'], task['arguments'],
+                                                        define_keywords(task, tile_workers)))
+                    running_tasks[future] = task
+                    waiting_tasks.remove(task)
+                if len(running_tasks) == 0:
+                    break
+                finished_futures = wait(running_tasks, return_when=FIRST_COMPLETED)[0]
+                for future in finished_futures:
+                    task = running_tasks.pop(future)
+                    task_elapsed = future.result()
+                    report_task(task, task_elapsed)
+                    elapsed_dictionary[task['name']] = task_elapsed
+                    completed_tasks.add(task['name'])
+
+    # Report tasks that could not run because their inputs were never produced
+    for task in waiting_tasks:
+        print(f'\tERROR: Inputs of {task["label"]} could not be produced.')
+
+    return elapsed_dictionary
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------------------------
+# Extract segment covariates
+# Author: Timm Nawrocki
+# Last Updated: 2026-10-17
+# Usage: Must be executed in a Python 3.8+ distribution with numpy, pandas, and rasterio.
+# Description: "Extract segment covariates" is a function that summarizes covariate rasters to the segments of a gridded segment raster and writes one row per segment to a table without creating intermediate zonal rasters. Each covariate raster is read once and the statistics of every segment are reduced with the same reducer as the numpy engine of zonal statistics, with the zone index stored next to the segment raster, either as a single gather for covariates aligned with the segment grid or with overlap weights at the native resolution of covariates that are coarser than the segments; other covariates are streamed in tiles resampled to the segment grid as in ZonalStatistics. The area, perimeter, and an interior point of each segment are calculated from block reads of the segment raster.
+# ---------------------------------------------------------------------------
+
+# Define a function to extract segment covariates
+def extract_segment_covariates(**kwargs):
+    """
+    Description: summarizes covariate rasters to segments and exports a table of covariates keyed by segment id
+    Inputs: 'column_array' -- an array containing a dictionary for each covariate raster of statistics from 'MEAN', 'STD', 'RANGE', 'MINIMUM', 'MAXIMUM', 'SUM', and 'COUNT' to output column names
+            'block_rows' -- an optional number of rows of the segment raster to read at a time when calculating geometry or building the zone index (default 1024)
+            'input_array' -- an array containing the segment raster followed by the covariate rasters, which may be bands of multiband rasters such as 'raster.tif/Band_1'
+            'output_array' -- an array containing the output csv table
+    Returned Value: Returns a csv table on disk with the columns segment_id, POINT_X, POINT_Y, shape_m, shape_m2, and the covariate columns
+    Preconditions: requires a segment raster with segment ids as values and covariate rasters that can be created through other scripts in this repository
+    """
+
+    # Import packages
+    import datetime
+    import numpy as np
+    from package_GeospatialProcessing.zonalAccumulators import accumulate_geometry
+    from package_GeospatialProcessing.zonalAccumulators import create_geometry
+    from package_GeospatialProcessing.zonalAccumulators import locate_interior
+    from package_GeospatialProcessing.zonalAccumulators import read_zones
+    from package_GeospatialProcessing.zonalAccumulators import resize_accumulators
+    from package_GeospatialProcessing.zonalAccumulators import summarize_zones
+    from package_GeospatialProcessing.zoneIndex import load_zone_index
+    from package_GeospatialProcessing.zoneIndex import reduce_raster
+    import pandas as pd
+    import rasterio
+    import time
+
+    # Parse key word argument inputs
+    column_list = kwargs['column_array']
+    block_rows = kwargs.get('block_rows', 1024)
+    segment_raster = kwargs['input_array'][0]
+    covariate_rasters = kwargs['input_array'][1:]
+    output_table = kwargs['output_array'][0]
+
+    # Check that each covariate raster has output columns
+    if len(column_list) != len(covariate_rasters):
+        print('\t\tERROR: The number of column dictionaries and covariate rasters do not match.')
+        quit()
+
+    # Calculate segment geometry
+    print('\t\tCalculating segment geometry...')
+    iteration_start = time.time()
+    geometry = create_geometry(1)
+    with rasterio.open(segment_raster) as segment_dataset:
+        transform = segment_dataset.transform
+        cell_width = abs(transform.a)
+        cell_height = abs(transform.e)
+        for row_start in range(0, segment_dataset.height, block_rows):
+            row_end = min(row_start + block_rows, segment_dataset.height)
+            zone_block = read_zones(segment_dataset, row_start, row_end, 1)
+            geometry = accumulate_geometry(geometry, zone_block, row_start, cell_width, cell_height)
+        for row_start in range(0, segment_dataset.height, block_rows):
+            row_end = min(row_start + block_rows, segment_dataset.height)
+            locate_interior(geometry, read_zones(segment_dataset, row_start, row_end), row_start)
+    zone_count = len(geometry['count'])
+    # End timing
+    iteration_end = time.time()
+    iteration_elapsed = int(iteration_end - iteration_start)
+    iteration_success_time = datetime.datetime.now()
+    # Report success
+    print(
+        f'\t\tCompleted at {iteration_success_time.strftime("%Y-%m-%d %H:%M")} (Elapsed time: {datetime.timedelta(seconds=iteration_elapsed)})')
+    print('\t\t----------')
+
+    # Create table of segments
+    segment_ids = np.nonzero(geometry['count'] > 0)[0]
+    point_x, point_y = rasterio.transform.xy(transform, geometry['row'][segment_ids],
+                                             geometry['column'][segment_ids])
+    output_data = pd.DataFrame({'segment_id': segment_ids,
+                                'POINT_X': point_x,
+                                'POINT_Y': point_y,
+                                'shape_m': geometry['perimeter'][segment_ids],
+                                'shape_m2': geometry['count'][segment_ids] * cell_width * cell_height})
+    print(f'\t\tOutput table will contain {len(segment_ids)} segments.')
+    print('\t\t----------')
+
+    # Load zone index of segments to gather aligned and coarse covariates
+    zone_index = load_zone_index(segment_raster, block_rows)
+
+    # Summarize each covariate raster to segments
+    count = 1
+    raster_length = len(covariate_rasters)
+    for covariate_raster, column_dictionary in zip(covariate_rasters, column_list):
+        print(f'\t\tSummarizing covariate {count} of {raster_length}...')
+        iteration_start = time.time()
+        accumulators, value_type = reduce_raster(segment_raster, zone_index, covariate_raster)
+        accumulators = resize_accumulators(accumulators, zone_count)
+
+        # Calculate statistics per segment with the rounding of a zonal raster of the input data type
+        for statistic, column_name in column_dictionary.items():
+            summary = summarize_zones(accumulators, statistic)[segment_ids]
+            if np.dtype(value_type).kind in 'iu':
+                summary = np.rint(summary)
+            output_data[column_name] = summary
+        # End timing
+        iteration_end = time.time()
+        iteration_elapsed = int(iteration_end - iteration_start)
+        iteration_success_time = datetime.datetime.now()
+        # Report success
+        print(
+            f'\t\tCompleted at {iteration_success_time.strftime("%Y-%m-%d %H:%M")} (Elapsed time: {datetime.timedelta(seconds=iteration_elapsed)})')
+        print('\t\t----------')
+        count += 1
+
+    # Export table
+    output_data.to_csv(output_table, header=True, index=False, sep=',', encoding='utf-8')
+
+    # Return success message
+    outprocess = f'\tSuccessfully extracted {raster_length} covariates to {len(segment_ids)} segments.'
+    return outprocess
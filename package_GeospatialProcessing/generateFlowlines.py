@@ -2,20 +2,55 @@
 # ---------------------------------------------------------------------------
 # Generate flowlines
 # Author: Timm Nawrocki
-# Last Updated: 2022-01-17
+# Last Updated: 2026-10-17
 # Usage: Must be executed in an ArcGIS Pro Python 3.7 installation.
 # Description: "Generate flowlines" is a function that calculates flowlines from a float elevation raster.
 # ---------------------------------------------------------------------------
 
+# Define a function to write traced lines to a feature class
+def write_flowlines(line_list, flowline_feature, spatial_reference):
+    """
+    Description: writes traced stream lines to a new polyline feature class
+    Inputs: 'line_list' -- a list of tuples of stream order and an array of x and y vertex coordinates from trace_stream_lines
+            'flowline_feature' -- a file path for an output polyline feature class
+            'spatial_reference' -- the spatial reference of the vertex coordinates
+    Returned Value: Returns a polyline feature class on disk
+    Preconditions: requires lines from trace_stream_lines
+    """
+
+    # Import packages
+    import arcpy
+    import os
+
+    # Create feature class
+    output_location, output_name = os.path.split(flowline_feature)
+    arcpy.management.CreateFeatureclass(output_location,
+                                        output_name,
+                                        'POLYLINE',
+                                        '',
+                                        'DISABLED',
+                                        'DISABLED',
+                                        spatial_reference)
+    arcpy.management.AddField(flowline_feature, 'grid_code', 'LONG')
+    arcpy.management.AddField(flowline_feature, 'stream_order', 'SHORT')
+
+    # Insert lines
+    with arcpy.da.InsertCursor(flowline_feature, ['SHAPE@', 'grid_code', 'stream_order']) as cursor:
+        for stream_order, coordinates in line_list:
+            point_array = arcpy.Array([arcpy.Point(x, y) for x, y in coordinates])
+            cursor.insertRow([arcpy.Polyline(point_array, spatial_reference), 1, stream_order])
+
 # Define a function to generate flowlines.
 def generate_flowlines(**kwargs):
     """
     Description: generates flowlines from a float elevation raster
-    Inputs: 'threshold' -- flow accumulation threshold for minimum stream size
+    Inputs: 'threshold' -- flow accumulation threshold for minimum stream size, or a list of thresholds to generate a set of flowlines for each threshold from one calculation of flow accumulation
             'fill_value' -- a value in the vertical units of the elevation raster to set as the fill limit
             'work_geodatabase' -- a geodatabase to store temporary results
+            'engine' -- an optional string of either 'arcpy' (default) or 'numpy' to fill depressions with the Priority-Flood algorithm and route flow with numpy
+            'tile_size' -- an optional number of rows and columns per tile to fill depressions in tiles with the numpy engine, which bounds the memory of the fill only; the numpy engine routes flow and traces streams on the whole filled raster in memory
             'input_array' -- an array containing the area feature class (must be first), the float elevation raster (must be second), and an optional mask raster (if present, must be last)
-            'output_array' -- an array containing the the river feature class and the stream feature class
+            'output_array' -- an array containing the the river feature class and the stream feature class. If multiple thresholds are specified, each must be a list of feature classes in the order of the thresholds.
     Returned Value: Returns a set filled elevation raster and a set of flowline feature classes on disk
     Preconditions: requires an input elevation raster that can be created through other scripts in this repository
     """
@@ -27,9 +62,13 @@ def generate_flowlines(**kwargs):
     from arcpy.sa import Fill
     from arcpy.sa import FlowAccumulation
     from arcpy.sa import FlowDirection
+    from arcpy.sa import IsNull
     from arcpy.sa import Raster
     from arcpy.sa import StreamOrder
     import datetime
+    import numpy as np
+    from package_Geomorphometry.bufferMask import calculate_buffer_mask
+    from package_Geomorphometry.bufferMask import convert_distance
     import os
     import time
 
@@ -37,15 +76,39 @@ def generate_flowlines(**kwargs):
     threshold = kwargs['threshold']
     fill_value = kwargs['fill_value']
     work_geodatabase = kwargs['work_geodatabase']
+    engine = kwargs.get('engine', 'arcpy')
+    tile_size = kwargs.get('tile_size', None)
     area_feature = kwargs['input_array'][0]
     elevation_raster = kwargs['input_array'][1]
     river_feature = kwargs['output_array'][0]
     stream_feature = kwargs['output_array'][1]
 
+    # Import the numpy engine, which requires numba
+    if engine == 'numpy':
+        from package_Geomorphometry.fillDepressions import fill_depressions
+        from package_Geomorphometry.fillDepressionsTiled import fill_depressions_tiled
+        from package_Geomorphometry.routeFlowD8 import calculate_accumulation_d8
+        from package_Geomorphometry.routeFlowD8 import calculate_direction_d8
+        from package_Geomorphometry.routeFlowD8 import define_receivers_d8
+        from package_Geomorphometry.traceStreams import calculate_stream_order
+        from package_Geomorphometry.traceStreams import trace_stream_lines
+
+    # Convert threshold inputs to lists
+    if isinstance(threshold, list):
+        threshold_list = threshold
+        river_features = river_feature
+        stream_features = stream_feature
+    else:
+        threshold_list = [threshold]
+        river_features = [river_feature]
+        stream_features = [stream_feature]
+
     # Define intermediate dataset
     topography_folder = os.path.split(elevation_raster)[0]
-    area_buffer = os.path.join(work_geodatabase, 'StudyArea_Buffer_5km')
+    area_raster = os.path.join(topography_folder, 'StudyArea_Raster.tif')
     buffer_raster = os.path.join(topography_folder, 'Buffer_Raster.tif')
+    extract_float = os.path.join(topography_folder, 'Elevation_Extract.tif')
+    fill_float = os.path.join(topography_folder, 'Elevation_Fill.tif')
 
     # Set overwrite option
     arcpy.env.overwriteOutput = True
@@ -66,19 +129,36 @@ def generate_flowlines(**kwargs):
     # Buffer study area
     print('\tCreating calculation area...')
     iteration_start = time.time()
-    arcpy.analysis.PairwiseBuffer(area_feature,
-                                  area_buffer,
-                                  '10 Kilometers',
-                                  'NONE',
-                                  '',
-                                  'PLANAR')
+    # Convert study area to raster on the elevation grid
+    print('\t\tConverting study area to raster...')
+    elevation_grid = Raster(elevation_raster)
+    arcpy.env.extent = elevation_grid.extent
     arcpy.conversion.PolygonToRaster(area_feature,
                                      'OBJECTID',
-                                     buffer_raster,
+                                     area_raster,
                                      'CELL_CENTER',
                                      '',
                                      cell_size,
                                      'BUILD')
+    arcpy.ClearEnvironment('extent')
+    grid_lower_left = arcpy.Point(elevation_grid.extent.XMin, elevation_grid.extent.YMin)
+    area_mask = arcpy.RasterToNumPyArray(IsNull(Raster(area_raster)), grid_lower_left,
+                                         elevation_grid.width, elevation_grid.height, 1) == 0
+    # Buffer study area by distance transform
+    print('\t\tBuffering study area...')
+    buffer_distance = convert_distance('10 Kilometers', elevation_grid.spatialReference.metersPerUnit)
+    buffer_array = calculate_buffer_mask(area_mask, buffer_distance, float(cell_size))
+    # Crop buffer to the extent of buffered cells
+    buffer_rows = np.flatnonzero(buffer_array.any(axis=1))
+    buffer_cols = np.flatnonzero(buffer_array.any(axis=0))
+    row_start, row_end = buffer_rows[0], buffer_rows[-1] + 1
+    col_start, col_end = buffer_cols[0], buffer_cols[-1] + 1
+    buffer_lower_left = arcpy.Point(elevation_grid.extent.XMin + col_start * float(cell_size),
+                                    elevation_grid.extent.YMax - row_end * float(cell_size))
+    arcpy.env.outputCoordinateSystem = elevation_grid.spatialReference
+    buffer_mask = arcpy.NumPyArrayToRaster(buffer_array[row_start:row_end, col_start:col_end].astype('int16'),
+                                           buffer_lower_left, float(cell_size), float(cell_size), 0)
+    buffer_mask.save(buffer_raster)
     # End timing
     iteration_end = time.time()
     iteration_elapsed = int(iteration_end - iteration_start)
@@ -103,7 +183,18 @@ def generate_flowlines(**kwargs):
     # Fill elevation
     print('\tFilling elevation raster...')
     iteration_start = time.time()
-    fill_raster = Fill(elevation_extract, fill_value)
+    if engine == 'numpy':
+        arcpy.env.outputCoordinateSystem = elevation_extract.spatialReference
+        lower_left = arcpy.Point(elevation_extract.extent.XMin, elevation_extract.extent.YMin)
+        if tile_size is not None:
+            elevation_extract.save(extract_float)
+            fill_depressions_tiled(extract_float, fill_float, z_limit=fill_value, tile_size=tile_size)
+            fill_array = arcpy.RasterToNumPyArray(Raster(fill_float), nodata_to_value=np.nan).astype('float64')
+        else:
+            elevation_array = arcpy.RasterToNumPyArray(elevation_extract, nodata_to_value=np.nan).astype('float64')
+            fill_array = fill_depressions(elevation_array, z_limit=fill_value)
+    else:
+        fill_raster = Fill(elevation_extract, fill_value)
     # End timing
     iteration_end = time.time()
     iteration_elapsed = int(iteration_end - iteration_start)
@@ -116,7 +207,11 @@ def generate_flowlines(**kwargs):
     # Calculate flow direction
     print('\tCalculating flow direction...')
     iteration_start = time.time()
-    direction_raster = FlowDirection(fill_raster, 'NORMAL', '', 'D8')
+    if engine == 'numpy':
+        direction_array = calculate_direction_d8(fill_array, float(cell_size))
+        receiver_array = define_receivers_d8(direction_array)
+    else:
+        direction_raster = FlowDirection(fill_raster, 'NORMAL', '', 'D8')
     # End timing
     iteration_end = time.time()
     iteration_elapsed = int(iteration_end - iteration_start)
@@ -129,7 +224,10 @@ def generate_flowlines(**kwargs):
     # Calculate flow accumulation
     print('\tCalculating flow accumulation...')
     iteration_start = time.time()
-    accumulation_raster = FlowAccumulation(direction_raster, '', 'FLOAT', 'D8')
+    if engine == 'numpy':
+        flow_order, accumulation_array = calculate_accumulation_d8(direction_array, receiver_array)
+    else:
+        accumulation_raster = FlowAccumulation(direction_raster, '', 'FLOAT', 'D8')
     # End timing
     iteration_end = time.time()
     iteration_elapsed = int(iteration_end - iteration_start)
@@ -139,41 +237,40 @@ def generate_flowlines(**kwargs):
         f'\tCompleted at {iteration_success_time.strftime("%Y-%m-%d %H:%M")} (Elapsed time: {datetime.timedelta(seconds=iteration_elapsed)})')
     print('\t----------')
 
-    # Apply threshold to the flow accumulation
-    print('\tDefining stream network from flow accumulation...')
-    iteration_start = time.time()
-    stream_definition = f'VALUE >= {threshold}'
-    stream_raster = Con(accumulation_raster, 1, '', stream_definition)
-    # End timing
-    iteration_end = time.time()
-    iteration_elapsed = int(iteration_end - iteration_start)
-    iteration_success_time = datetime.datetime.now()
-    # Report success
-    print(
-        f'\tCompleted at {iteration_success_time.strftime("%Y-%m-%d %H:%M")} (Elapsed time: {datetime.timedelta(seconds=iteration_elapsed)})')
-    print('\t----------')
+    # Read mask raster once for all thresholds
+    if len(kwargs['input_array']) == 3:
+        mask_raster = kwargs['input_array'][2]
+        if engine == 'numpy':
+            rows, cols = accumulation_array.shape
+            mask_array = arcpy.RasterToNumPyArray(IsNull(Raster(mask_raster)), lower_left, cols, rows, 1)
 
-    # Calculate stream order
-    print('\tDefining stream order...')
-    iteration_start = time.time()
-    stream_order = StreamOrder(stream_raster, direction_raster, 'STRAHLER')
-    # End timing
-    iteration_end = time.time()
-    iteration_elapsed = int(iteration_end - iteration_start)
-    iteration_success_time = datetime.datetime.now()
-    # Report success
-    print(
-        f'\tCompleted at {iteration_success_time.strftime("%Y-%m-%d %H:%M")} (Elapsed time: {datetime.timedelta(seconds=iteration_elapsed)})')
-    print('\t----------')
+    # Generate flowlines for each threshold from the same flow accumulation
+    for threshold, river_feature, stream_feature in zip(threshold_list, river_features, stream_features):
+        # Apply threshold to the flow accumulation
+        print(f'\tDefining stream network from flow accumulation for threshold {threshold}...')
+        iteration_start = time.time()
+        if engine == 'numpy':
+            with np.errstate(invalid='ignore'):
+                stream_mask = accumulation_array >= threshold
+        else:
+            stream_definition = f'VALUE >= {threshold}'
+            stream_raster = Con(accumulation_raster, 1, '', stream_definition)
+        # End timing
+        iteration_end = time.time()
+        iteration_elapsed = int(iteration_end - iteration_start)
+        iteration_success_time = datetime.datetime.now()
+        # Report success
+        print(
+            f'\tCompleted at {iteration_success_time.strftime("%Y-%m-%d %H:%M")} (Elapsed time: {datetime.timedelta(seconds=iteration_elapsed)})')
+        print('\t----------')
 
-    # If a mask raster is supplied, then extract the stream order
-    if len(kwargs['input_array']) == 3:
-        print('\tExtracting stream order to mask...')
+        # Calculate stream order
+        print('\tDefining stream order...')
         iteration_start = time.time()
-        # Define mask raster
-        mask_raster = kwargs['input_array'][2]
-        # Extract flow accumulation to mask raster
-        final_raster = ExtractByMask(stream_order, mask_raster)
+        if engine == 'numpy':
+            order_array = calculate_stream_order(receiver_array, flow_order, stream_mask)
+        else:
+            stream_order = StreamOrder(stream_raster, direction_raster, 'STRAHLER')
         # End timing
         iteration_end = time.time()
         iteration_elapsed = int(iteration_end - iteration_start)
@@ -182,40 +279,74 @@ def generate_flowlines(**kwargs):
         print(
             f'\tCompleted at {iteration_success_time.strftime("%Y-%m-%d %H:%M")} (Elapsed time: {datetime.timedelta(seconds=iteration_elapsed)})')
         print('\t----------')
-    # If no mask is specified, then use full raster
-    else:
-        final_raster = stream_order
 
-    # Convert stream order to flowline feature classes
-    print('\tConverting raster stream order to flowline feature classes...')
-    iteration_start = time.time()
-    # Convert streams
-    stream_raster = Con(final_raster, 1, '', 'VALUE <= 3')
-    arcpy.conversion.RasterToPolyline(stream_raster,
-                                      stream_feature,
-                                      'NODATA',
-                                      0,
-                                      'SIMPLIFY')
-    # Convert rivers
-    river_raster = Con(final_raster, 1, '', 'VALUE > 3')
-    arcpy.conversion.RasterToPolyline(river_raster,
-                                      river_feature,
-                                      'NODATA',
-                                      0,
-                                      'SIMPLIFY')
+        # If a mask raster is supplied, then extract the stream order
+        if len(kwargs['input_array']) == 3:
+            print('\tExtracting stream order to mask...')
+            iteration_start = time.time()
+            # Extract flow accumulation to mask raster
+            if engine == 'numpy':
+                order_array = np.where(mask_array == 0, order_array, 0)
+            else:
+                final_raster = ExtractByMask(stream_order, mask_raster)
+            # End timing
+            iteration_end = time.time()
+            iteration_elapsed = int(iteration_end - iteration_start)
+            iteration_success_time = datetime.datetime.now()
+            # Report success
+            print(
+                f'\tCompleted at {iteration_success_time.strftime("%Y-%m-%d %H:%M")} (Elapsed time: {datetime.timedelta(seconds=iteration_elapsed)})')
+            print('\t----------')
+        # If no mask is specified, then use full raster
+        elif engine == 'arcpy':
+            final_raster = stream_order
+
+        # Convert stream order to flowline feature classes
+        print('\tConverting raster stream order to flowline feature classes...')
+        iteration_start = time.time()
+        if engine == 'numpy':
+            # Trace streams and rivers in one walk of the stream network
+            stream_lines, river_lines = trace_stream_lines(receiver_array,
+                                                           order_array,
+                                                           [3],
+                                                           elevation_extract.extent.XMin,
+                                                           elevation_extract.extent.YMax,
+                                                           float(cell_size))
+            write_flowlines(stream_lines, stream_feature, elevation_extract.spatialReference)
+            write_flowlines(river_lines, river_feature, elevation_extract.spatialReference)
+        else:
+            # Convert streams
+            stream_raster = Con(final_raster, 1, '', 'VALUE <= 3')
+            arcpy.conversion.RasterToPolyline(stream_raster,
+                                              stream_feature,
+                                              'NODATA',
+                                              0,
+                                              'SIMPLIFY')
+            # Convert rivers
+            river_raster = Con(final_raster, 1, '', 'VALUE > 3')
+            arcpy.conversion.RasterToPolyline(river_raster,
+                                              river_feature,
+                                              'NODATA',
+                                              0,
+                                              'SIMPLIFY')
+        # End timing
+        iteration_end = time.time()
+        iteration_elapsed = int(iteration_end - iteration_start)
+        iteration_success_time = datetime.datetime.now()
+        # Report success
+        print(
+            f'\tFinished at {iteration_success_time.strftime("%Y-%m-%d %H:%M")} (Elapsed time: {datetime.timedelta(seconds=iteration_elapsed)})')
+        print('\t----------')
+
     # Delete intermediate datasets
     if arcpy.Exists(buffer_raster) == 1:
         arcpy.management.Delete(buffer_raster)
-    if arcpy.Exists(area_buffer) == 1:
-        arcpy.management.Delete(area_buffer)
-    # End timing
-    iteration_end = time.time()
-    iteration_elapsed = int(iteration_end - iteration_start)
-    iteration_success_time = datetime.datetime.now()
-    # Report success
-    print(
-        f'\tFinished at {iteration_success_time.strftime("%Y-%m-%d %H:%M")} (Elapsed time: {datetime.timedelta(seconds=iteration_elapsed)})')
-    print('\t----------')
+    if arcpy.Exists(area_raster) == 1:
+        arcpy.management.Delete(area_raster)
+    if arcpy.Exists(extract_float) == 1:
+        arcpy.management.Delete(extract_float)
+    if arcpy.Exists(fill_float) == 1:
+        arcpy.management.Delete(fill_float)
 
     # Return success message
     outprocess = 'Successfully created flowlines.'
@@ -2,9 +2,9 @@
 # ---------------------------------------------------------------------------
 # Generate hydrographic position
 # Author: Timm Nawrocki
-# Last Updated: 2022-03-14
+# Last Updated: 2026-10-17
 # Usage: Must be executed in an ArcGIS Pro Python 3.7 installation.
-# Description: "Generate hydrographic position" is a function that calculates the vertical difference between flowline elevation and landscape elevation from a float elevation raster and a set of flowlines, which can be derived from a DEM, the NHD, or manual delineation (or some combination thereof).
+# Description: "Generate hydrographic position" is a function that calculates the vertical difference between flowline elevation and landscape elevation from a float elevation raster and a set of flowlines, which can be derived from a DEM, the NHD, or manual delineation (or some combination thereof). The elevation of the nearest flowline is expanded without arcpy in tiles limited to the search distance. Optionally, the flowline elevation can be defined as the height above nearest drainage along D8 flow paths instead of the elevation of the nearest flowline.
 # ---------------------------------------------------------------------------
 
 # Define a function to generate hydrographic position.
@@ -13,6 +13,7 @@ def generate_hydrographic_position(**kwargs):
     Description: calculates hydrographic position from a float elevation raster and a set of flowlines
     Inputs: 'distance' -- a string of numerical distance and unit representing search distance from flowline
             'work_geodatabase' -- a geodatabase to store temporary results
+            'mode' -- an optional string of either 'nearest' (default) to compare each cell to the nearest flowline or 'hand' to compare each cell to the flowline it drains to along D8 flow paths
             'input_array' -- an array containing the area raster, the float elevation raster, and the flowlines (in that order)
             'output_array' -- an array containing the hydrographic position raster
     Returned Value: Returns a raster on disk
@@ -25,15 +26,19 @@ def generate_hydrographic_position(**kwargs):
     from arcpy.sa import ExtractByMask
     from arcpy.sa import Int
     from arcpy.sa import IsNull
-    from arcpy.sa import Nibble
     from arcpy.sa import Raster
     import datetime
+    import numpy as np
     import os
+    from package_Geomorphometry.bufferMask import calculate_buffer_mask
+    from package_Geomorphometry.bufferMask import convert_distance
+    from package_Geomorphometry.nibbleNearest import nibble_raster
     import time
 
     # Parse key word argument inputs
     distance = kwargs['distance']
     work_geodatabase = kwargs['work_geodatabase']
+    mode = kwargs.get('mode', 'nearest')
     area_raster = kwargs['input_array'][0]
     elevation_raster = kwargs['input_array'][1]
     flowline_feature = kwargs['input_array'][2]
@@ -43,7 +48,8 @@ def generate_hydrographic_position(**kwargs):
     hydrography_folder = os.path.split(hydrography_raster)[0]
     flowline_raster = os.path.join(hydrography_folder, 'Flowlines.tif')
     preliminary_raster = os.path.join(hydrography_folder, 'Preliminary.tif')
-    flowline_buffered = os.path.join(work_geodatabase, 'flowlines_buffered')
+    elevation_flowline = os.path.join(hydrography_folder, 'Flowline_Elevation.tif')
+    position_flowline = os.path.join(hydrography_folder, 'Flowline_Position.tif')
 
     # Set overwrite option
     arcpy.env.overwriteOutput = True
@@ -87,12 +93,31 @@ def generate_hydrographic_position(**kwargs):
                                       '',
                                       cell_size,
                                       'BUILD')
-    # Extract elevation to stream network
-    print('\t\tExtracting elevation to flowlines...')
-    flowline_elevation = ExtractByMask(elevation_extract, Raster(flowline_raster))
-    # Expand stream elevation
-    print('\t\tExpanding flowline elevation...')
-    flowline_position = Nibble(flowline_elevation, Raster(flowline_raster), 'DATA_ONLY', 'PROCESS_NODATA')
+    # Convert flowlines to array
+    print('\t\tConverting flowlines to array...')
+    arcpy.env.outputCoordinateSystem = elevation_extract.spatialReference
+    lower_left = arcpy.Point(elevation_extract.extent.XMin, elevation_extract.extent.YMin)
+    rows = elevation_extract.height
+    cols = elevation_extract.width
+    stream_mask = arcpy.RasterToNumPyArray(IsNull(Raster(flowline_raster)), lower_left, cols, rows, 1) == 0
+    buffer_distance = convert_distance(distance, elevation_extract.spatialReference.metersPerUnit)
+    if mode == 'hand':
+        from package_Geomorphometry.traceDrainage import calculate_height_above_drainage
+        # Convert elevation to array
+        elevation_array = arcpy.RasterToNumPyArray(elevation_extract, nodata_to_value=np.nan).astype('float64')
+        # Calculate height above nearest drainage
+        print('\t\tCalculating height above nearest drainage...')
+        height_array = calculate_height_above_drainage(elevation_array, float(cell_size), stream_mask)
+    else:
+        # Extract elevation to stream network
+        print('\t\tExtracting elevation to flowlines...')
+        flowline_elevation = ExtractByMask(elevation_extract, Raster(flowline_raster))
+        flowline_elevation.save(elevation_flowline)
+        # Expand stream elevation within the search distance
+        print('\t\tExpanding flowline elevation...')
+        nibble_raster(elevation_flowline, flowline_raster, position_flowline, '32_BIT_FLOAT',
+                      'DATA_ONLY', 'PROCESS_NODATA', search_radius=buffer_distance, tile_size=2048)
+        flowline_position = Raster(position_flowline)
     # End timing
     iteration_end = time.time()
     iteration_elapsed = int(iteration_end - iteration_start)
@@ -105,9 +130,17 @@ def generate_hydrographic_position(**kwargs):
     # Calculate hydrographic position
     print('\tCalculating hydrographic position...')
     iteration_start = time.time()
-    hydrographic_position = ((elevation_extract - flowline_position) * (elevation_extract - flowline_position)) * 100
-    # Control for excessively high values
-    limit_raster = Con(hydrographic_position, Int(hydrographic_position + 0.5), 32000, 'VALUE < 32000')
+    if mode == 'hand':
+        hydrographic_position = (height_array * height_array) * 100
+        # Control for excessively high values and cells that do not drain to a flowline
+        with np.errstate(invalid='ignore'):
+            limit_array = np.where(hydrographic_position < 32000, np.trunc(hydrographic_position + 0.5), 32000)
+        limit_array[np.isnan(hydrographic_position)] = 32000
+    else:
+        hydrographic_position = ((elevation_extract - flowline_position)
+                                 * (elevation_extract - flowline_position)) * 100
+        # Control for excessively high values
+        limit_raster = Con(hydrographic_position, Int(hydrographic_position + 0.5), 32000, 'VALUE < 32000')
     # End timing
     iteration_end = time.time()
     iteration_elapsed = int(iteration_end - iteration_start)
@@ -120,20 +153,18 @@ def generate_hydrographic_position(**kwargs):
     # Extract to flowline buffer
     print('\tRestricting results to search distance...')
     iteration_start = time.time()
+    # Convert hydrographic position to array
+    if mode != 'hand':
+        limit_array = arcpy.RasterToNumPyArray(limit_raster, lower_left, cols, rows, 32000)
     # Create flowline buffer
     print('\t\tCreating flowline buffer...')
-    arcpy.analysis.PairwiseBuffer(flowline_feature,
-                                  flowline_buffered,
-                                  distance,
-                                  'NONE',
-                                  '',
-                                  'PLANAR')
-    # Extract hydrographic position to buffer
-    print('\t\tExtracting hydrographic position to buffer...')
-    position_extract = ExtractByMask(limit_raster, flowline_buffered)
-    # Convert no data to 32000
-    print('\t\tConverting no data to maximum...')
-    corrected_raster = Con(IsNull(position_extract), 32000, position_extract)
+    buffer_array = calculate_buffer_mask(stream_mask, buffer_distance, float(cell_size))
+    # Convert values outside of buffer to 32000
+    print('\t\tConverting values outside of buffer to maximum...')
+    limit_array[~buffer_array] = 32000
+    corrected_raster = arcpy.NumPyArrayToRaster(limit_array.astype('int16'), lower_left,
+                                                elevation_extract.meanCellWidth,
+                                                elevation_extract.meanCellHeight)
     # Export final raster
     print('\t\tExporting preliminary raster...')
     arcpy.management.CopyRaster(corrected_raster,
@@ -174,8 +205,10 @@ def generate_hydrographic_position(**kwargs):
         arcpy.management.Delete(flowline_raster)
     if arcpy.Exists(preliminary_raster) == 1:
         arcpy.management.Delete(preliminary_raster)
-    if arcpy.Exists(flowline_buffered) == 1:
-        arcpy.management.Delete(flowline_buffered)
+    if arcpy.Exists(elevation_flowline) == 1:
+        arcpy.management.Delete(elevation_flowline)
+    if arcpy.Exists(position_flowline) == 1:
+        arcpy.management.Delete(position_flowline)
     # End timing
     iteration_end = time.time()
     iteration_elapsed = int(iteration_end - iteration_start)
@@ -2,9 +2,9 @@
 # ---------------------------------------------------------------------------
 # Merge source elevation tiles
 # Author: Timm Nawrocki
-# Last Updated: 2021-11-22
+# Last Updated: 2026-10-17
 # Usage: Must be executed in an ArcGIS Pro Python 3.6 installation.
-# Description: "Merge source elevation tiles" is a function that creates single merged DEM from input tiles of the same source with new projection, snap raster, and cell size.
+# Description: "Merge source elevation tiles" is a function that creates single merged DEM from input tiles of the same source with new projection, snap raster, and cell size. A manifest of the checksum and projected extent of each source tile is written next to the merged DEM so that changed tiles are reprojected and topographic properties can be updated incrementally.
 # ---------------------------------------------------------------------------
 
 # Define function to merge source elevation tiles
@@ -19,12 +19,17 @@ def merge_elevation_tiles(**kwargs):
             'geographic_transformation -- the string representation of the appropriate geographic transformation (blank if none required)
             'input_array' -- an array containing the area raster
             'output_array' -- an array containing the output raster
+    Returned Value: Returns a raster dataset on disk and a json manifest of source tiles with the same name as the raster and the suffix '_Manifest'
+    Preconditions: requires source DEM tiles
     """
 
     # Import packages
     import arcpy
     import datetime
     import os
+    from package_GeospatialProcessing.elevationManifest import calculate_checksum
+    from package_GeospatialProcessing.elevationManifest import read_manifest
+    from package_GeospatialProcessing.elevationManifest import write_manifest
     import time
 
     # Parse key word argument inputs
@@ -54,6 +59,11 @@ def merge_elevation_tiles(**kwargs):
 
     # Define intermediate datasets
     mosaic_location, mosaic_name = os.path.split(dem_composite)
+    manifest_file = os.path.splitext(dem_composite)[0] + '_Manifest.json'
+
+    # Read manifest of previously merged tiles
+    previous_manifest = read_manifest(manifest_file)
+    tile_manifest = {}
 
     # Create a list of DEM raster tiles
     print('Compiling list of raster tiles...')
@@ -83,9 +93,13 @@ def merge_elevation_tiles(**kwargs):
     # Iterate through rasters
     for raster in tile_rasters:
         # Define output raster
-        output_raster = os.path.join(projected_folder, os.path.splitext(os.path.split(raster)[1])[0] + '.tif')
-        # Reproject raster if it does not already exist
-        if os.path.exists(output_raster) == 0:
+        tile_name = os.path.split(raster)[1]
+        output_raster = os.path.join(projected_folder, os.path.splitext(tile_name)[0] + '.tif')
+        # Determine whether the source tile has changed since the previous merge
+        tile_checksum = calculate_checksum(raster)
+        tile_changed = tile_name in previous_manifest and previous_manifest[tile_name]['checksum'] != tile_checksum
+        # Reproject raster if it does not already exist or if the source tile has changed
+        if os.path.exists(output_raster) == 0 or tile_changed == 1:
             print(f'\tReprojecting tile {count} of {len(tile_list)}...')
             iteration_start = time.time()
             # Define initial projection
@@ -101,6 +115,8 @@ def merge_elevation_tiles(**kwargs):
                                            input_system)
             # Enforce new projection
             arcpy.management.DefineProjection(output_raster, output_system)
+            # Update checksum after the projection of the source tile is defined
+            tile_checksum = calculate_checksum(raster)
             # End timing
             iteration_end = time.time()
             iteration_elapsed = int(iteration_end - iteration_start)
@@ -111,6 +127,11 @@ def merge_elevation_tiles(**kwargs):
         # Return message if output raster already exists
         else:
             print(f'\tTile {count} of {len(tile_list)} already processed...')
+        # Add tile to manifest
+        tile_extent = arcpy.Describe(output_raster).extent
+        tile_manifest[tile_name] = {'checksum': tile_checksum,
+                                    'extent': [tile_extent.XMin, tile_extent.YMin,
+                                               tile_extent.XMax, tile_extent.YMax]}
         # Increase count
         count += 1
     # Report success for loop
@@ -152,6 +173,8 @@ def merge_elevation_tiles(**kwargs):
                                        'LAST')
     # Enforce correct projection
     arcpy.management.DefineProjection(dem_composite, output_system)
+    # Write manifest of merged tiles
+    write_manifest(manifest_file, tile_manifest)
     # End timing
     iteration_end = time.time()
     iteration_elapsed = int(iteration_end - iteration_start)
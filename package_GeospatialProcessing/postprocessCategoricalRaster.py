@@ -14,6 +14,7 @@ def postprocess_categorical_raster(**kwargs):
     Inputs: 'mmu' -- an integer in sq m representing the area of the smallest retained feature
             'attribute_dictionary' -- a dictionary of name and value pairs for the map schema
             'work_geodatabase' -- a geodatabase to store temporary results
+            'engine' -- an optional string of either 'arcpy' (default) or 'numpy' to nibble with the Nibble tool or with a Euclidean distance transform
             'input_array' -- an array containing the area raster (must be first) and the predicted raster
             'output_array' -- an array containing the output raster
     Returned Value: Returns a raster to disk
@@ -31,6 +32,7 @@ def postprocess_categorical_raster(**kwargs):
     from arcpy.sa import SetNull
     import datetime
     import os
+    from package_Geomorphometry.nibbleNearest import nibble_raster_object
     import time
 
     # Parse key word argument inputs
@@ -40,6 +42,7 @@ def postprocess_categorical_raster(**kwargs):
     area_raster = kwargs['input_array'][0]
     input_raster = kwargs['input_array'][1]
     output_raster = kwargs['output_array'][0]
+    engine = kwargs.get('engine', 'arcpy')
 
     # Define work folder
     work_folder = os.path.split(input_raster)[0]
@@ -78,7 +81,10 @@ def postprocess_categorical_raster(**kwargs):
     print('\t\tRemoving waterbodies...')
     null_raster = SetNull((Raster(input_raster) == value_pub3h) | (Raster(input_raster) == value_pab3h),
                           Raster(input_raster))
-    waterbody_nibble_raster = Nibble(null_raster, null_raster, 'DATA_ONLY', 'PROCESS_NODATA')
+    if engine == 'numpy':
+        waterbody_nibble_raster = nibble_raster_object(null_raster, null_raster, 'DATA_ONLY', 'PROCESS_NODATA')
+    else:
+        waterbody_nibble_raster = Nibble(null_raster, null_raster, 'DATA_ONLY', 'PROCESS_NODATA')
     # Copy raster to integer
     print('\t\tConverting input raster to integers...')
     arcpy.management.CopyRaster(waterbody_nibble_raster,
@@ -154,10 +160,16 @@ def postprocess_categorical_raster(**kwargs):
     print(f'\tReplacing removed data...')
     iteration_start = time.time()
     # Nibble raster
-    raster_nibble = Nibble(raster_majority,
-                           raster_mask,
-                           'ALL_VALUES',
-                           'PRESERVE_NODATA')
+    if engine == 'numpy':
+        raster_nibble = nibble_raster_object(raster_majority,
+                                             raster_mask,
+                                             'ALL_VALUES',
+                                             'PRESERVE_NODATA')
+    else:
+        raster_nibble = Nibble(raster_majority,
+                               raster_mask,
+                               'ALL_VALUES',
+                               'PRESERVE_NODATA')
     # End timing
     iteration_end = time.time()
     iteration_elapsed = int(iteration_end - iteration_start)
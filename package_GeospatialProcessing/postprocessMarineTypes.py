@@ -13,6 +13,7 @@ def postprocess_marine_types(**kwargs):
     Description: converts marine types to polygon with full coverage
     Inputs: 'attribute_dictionary' -- a dictionary of name and value pairs for the map schema
             'work_geodatabase' -- a geodatabase to store temporary results
+            'engine' -- an optional string of either 'arcpy' (default) or 'numpy' to nibble with the Nibble tool or with a Euclidean distance transform
             'input_array' -- an array containing the area raster (must be first) and the post-processed raster
             'output_array' -- an array containing the output feature class
     Returned Value: Returns a feature class to disk
@@ -27,6 +28,7 @@ def postprocess_marine_types(**kwargs):
     from arcpy.sa import SetNull
     import datetime
     import os
+    from package_Geomorphometry.nibbleNearest import nibble_raster_object
     import time
 
     # Parse key word argument inputs
@@ -36,6 +38,7 @@ def postprocess_marine_types(**kwargs):
     input_raster = kwargs['input_array'][1]
     study_feature = kwargs['input_array'][2]
     output_feature = kwargs['output_array'][0]
+    engine = kwargs.get('engine', 'arcpy')
 
     # Define work folder
     work_folder = os.path.split(input_raster)[0]
@@ -75,7 +78,10 @@ def postprocess_marine_types(**kwargs):
                             (Raster(input_raster) != 3), Raster(input_raster))
     # Extend marine raster to study area
     print(f'\t\tExtending coverage of marine types...')
-    extend_raster = Nibble(marine_raster, marine_raster, 'DATA_ONLY', 'PROCESS_NODATA')
+    if engine == 'numpy':
+        extend_raster = nibble_raster_object(marine_raster, marine_raster, 'DATA_ONLY', 'PROCESS_NODATA')
+    else:
+        extend_raster = Nibble(marine_raster, marine_raster, 'DATA_ONLY', 'PROCESS_NODATA')
     # Convert marine raster to polygon
     print(f'\t\tConverting to polygons...')
     arcpy.conversion.RasterToPolygon(extend_raster, processed_feature, 'SIMPLIFY',
@@ -13,6 +13,7 @@ def postprocess_terrestrial_types(**kwargs):
     Description: converts terrestrial types to polygon
     Inputs: 'attribute_dictionary' -- a dictionary of name and value pairs for the map schema
             'work_geodatabase' -- a geodatabase to store temporary results
+            'engine' -- an optional string of either 'arcpy' (default) or 'numpy' to nibble with the Nibble tool or with a Euclidean distance transform
             'input_array' -- an array containing the area raster (must be first) and the post-processed raster
             'output_array' -- an array containing the output feature class
     Returned Value: Returns a feature class to disk
@@ -28,6 +29,7 @@ def postprocess_terrestrial_types(**kwargs):
     from arcpy.sa import SetNull
     import datetime
     import os
+    from package_Geomorphometry.nibbleNearest import nibble_raster_object
     import time
 
     # Parse key word argument inputs
@@ -39,6 +41,7 @@ def postprocess_terrestrial_types(**kwargs):
     outer_feature = kwargs['input_array'][3]
     study_feature = kwargs['input_array'][4]
     output_feature = kwargs['output_array'][0]
+    engine = kwargs.get('engine', 'arcpy')
 
     # Define work folder
     work_folder = os.path.split(input_raster)[0]
@@ -84,7 +87,11 @@ def postprocess_terrestrial_types(**kwargs):
     terrestrial_raster = SetNull(extract_inner <= 6, extract_inner)
     # Extend terrestrial raster to study area
     print(f'\t\tExtend terrestrial types...')
-    extend_terrestrial = Nibble(terrestrial_raster, terrestrial_raster, 'DATA_ONLY', 'PROCESS_NODATA')
+    if engine == 'numpy':
+        extend_terrestrial = nibble_raster_object(terrestrial_raster, terrestrial_raster,
+                                                  'DATA_ONLY', 'PROCESS_NODATA')
+    else:
+        extend_terrestrial = Nibble(terrestrial_raster, terrestrial_raster, 'DATA_ONLY', 'PROCESS_NODATA')
     # Extract terrestrial raster to coastline
     print(f'\t\tExtracting terrestrial raster to coastline...')
     extract_terrestrial = ExtractByMask(extend_terrestrial, inner_feature)
@@ -113,7 +120,10 @@ def postprocess_terrestrial_types(**kwargs):
                              (extract_outer != 6) & (extract_outer != 17), extract_outer)
     # Extend coastal raster to study area
     print(f'\t\tExtend coastal types...')
-    extend_coastal = Nibble(coastal_raster, coastal_raster, 'DATA_ONLY', 'PROCESS_NODATA')
+    if engine == 'numpy':
+        extend_coastal = nibble_raster_object(coastal_raster, coastal_raster, 'DATA_ONLY', 'PROCESS_NODATA')
+    else:
+        extend_coastal = Nibble(coastal_raster, coastal_raster, 'DATA_ONLY', 'PROCESS_NODATA')
     # Set marine types to null
     print(f'\t\tSetting marine types to null...')
     null_marine = SetNull((Raster(input_raster) == 1) | (Raster(input_raster) == 2) |
@@ -2,9 +2,9 @@
 # ---------------------------------------------------------------------------
 # Convert predictions to raster
 # Author: Timm Nawrocki
-# Last Updated: 2022-06-07
+# Last Updated: 2026-10-17
 # Usage: Must be executed in an ArcGIS Pro Python 3.7 installation.
-# Description: "Convert predictions to raster" is a function that joins attributes from a csv file to a raster layer and exports as a new raster.
+# Description: "Convert predictions to raster" is a function that joins attributes from a csv file to a raster layer and exports as a new raster. The majority of the predicted points within each segment is calculated with the zone index stored next to each segment raster.
 # ---------------------------------------------------------------------------
 
 # Define a function to join attributes to a raster by value
@@ -27,12 +27,17 @@ def predictions_to_raster(**kwargs):
 
     # Import packages
     import arcpy
-    from arcpy.sa import Int
     from arcpy.sa import Raster
-    from arcpy.sa import ZonalStatistics
     import datetime
     import glob
+    import numpy as np
     import os
+    from package_Geomorphometry.bufferMask import rasterize_points
+    from package_GeospatialProcessing.zoneIndex import assign_zones
+    from package_GeospatialProcessing.zoneIndex import load_zone_index
+    from package_GeospatialProcessing.zoneIndex import majority_zones
+    import pandas as pd
+    import rasterio
     import time
 
     # Parse key word argument inputs
@@ -66,16 +71,13 @@ def predictions_to_raster(**kwargs):
     cell_size = arcpy.management.GetRasterProperties(area_raster, 'CELLSIZEX', '').getOutput(0)
     arcpy.env.cellSize = int(cell_size)
 
-    # Calculate buffer distance
-    buffer_distance = (int(cell_size) * 1.42) / 2
-
     # Assign bit depth and no data value
     if data_type == 'discrete':
         bit_depth = '8_BIT_SIGNED'
-        no_data_value = '-128'
+        no_data_value = -128
     else:
         bit_depth = '16_BIT_SIGNED'
-        no_data_value = '-32768'
+        no_data_value = -32768
 
     # Generate list of predictions
     os.chdir(prediction_folder)
@@ -97,79 +99,39 @@ def predictions_to_raster(**kwargs):
         # Define input datasets
         segment_raster = os.path.join(segment_folder, grid + '.tif')
 
-        # Define intermediate datasets
-        point_feature = os.path.join(work_geodatabase, 'Predictions_' + grid)
-        polygon_feature = os.path.join(work_geodatabase, 'Predictions_Buffer_' + grid)
-        point_raster = os.path.join(grid_folder, grid + '_Point.tif')
+        # Define output dataset
         output_grid = os.path.join(grid_folder, grid + '.tif')
 
         # Create output grid if it does not already exist
         if arcpy.Exists(output_grid) == 0:
             print(f'\tConverting raster {count} of {input_length}...')
             iteration_start = time.time()
-            # Convert table to points
-            arcpy.management.XYTableToPoint(input_file,
-                                            point_feature,
-                                            'POINT_X',
-                                            'POINT_Y',
-                                            '',
-                                            spatial_reference)
-            # Buffer points by buffer distance
-            arcpy.analysis.PairwiseBuffer(point_feature,
-                                          polygon_feature,
-                                          f'{buffer_distance} METERS',
-                                          'NONE',
-                                          '',
-                                          'PLANAR')
-            # Convert polygon to raster
-            arcpy.conversion.PolygonToRaster(polygon_feature,
-                                             target_field,
-                                             point_raster,
-                                             'CELL_CENTER',
-                                             '',
-                                             cell_size,
-                                             'BUILD')
-            # Calculate zonal majority from point raster
-            if data_type == 'discrete':
-                full_raster = ZonalStatistics(segment_raster,
-                                              'VALUE',
-                                              point_raster,
-                                              'MAJORITY',
-                                              'DATA',
-                                              'CURRENT_SLICE')
-            else:
-                conversion_factor = kwargs['conversion_factor']
-                adjust_raster = Int(Raster(point_raster) * conversion_factor)
-                full_raster = ZonalStatistics(segment_raster,
-                                              'VALUE',
-                                              adjust_raster,
-                                              'MAJORITY',
-                                              'DATA',
-                                              'CURRENT_SLICE')
-            # Enforce integers on output
-            integer_raster = Int(full_raster)
+            # Load zone index of segments
+            zone_index = load_zone_index(segment_raster)
+            with rasterio.open(segment_raster) as segment_dataset:
+                segment_profile = segment_dataset.profile
+            segment_transform = segment_profile['transform']
+            # Convert table to point values on the segment grid
+            prediction_data = pd.read_csv(input_file)
+            point_array = rasterize_points(prediction_data['POINT_X'],
+                                           prediction_data['POINT_Y'],
+                                           prediction_data[target_field],
+                                           segment_transform.c,
+                                           segment_transform.f,
+                                           abs(segment_transform.a),
+                                           segment_profile['height'],
+                                           segment_profile['width'])
+            if data_type != 'discrete':
+                point_array = np.trunc(point_array * kwargs['conversion_factor'])
+            point_array = np.where(np.isfinite(point_array), point_array, -2147483648).astype('int64')
+            # Calculate majority of point values in each segment
+            majority = majority_zones(zone_index, point_array, -2147483648)
             # Export output raster
-            arcpy.management.CopyRaster(integer_raster,
-                                        output_grid,
-                                        '',
-                                        '',
-                                        no_data_value,
-                                        'NONE',
-                                        'NONE',
-                                        bit_depth,
-                                        'NONE',
-                                        'NONE',
-                                        'TIFF',
-                                        'NONE',
-                                        'CURRENT_SLICE',
-                                        'NO_TRANSPOSE')
-            # Delete intermediate datasets
-            if arcpy.Exists(point_feature) == 1:
-                arcpy.management.Delete(point_feature)
-            if arcpy.Exists(polygon_feature) == 1:
-                arcpy.management.Delete(polygon_feature)
-            if arcpy.Exists(point_raster) == 1:
-                arcpy.management.Delete(point_raster)
+            output_type = 'int8' if data_type == 'discrete' else 'int16'
+            output_profile = dict(segment_profile, driver='GTiff', count=1, dtype=output_type, nodata=no_data_value,
+                                  compress='lzw', BIGTIFF='IF_SAFER')
+            with rasterio.open(output_grid, 'w', **output_profile) as output_dataset:
+                output_dataset.write(assign_zones(zone_index, majority, no_data_value, output_type), 1)
             # End timing
             iteration_end = time.time()
             iteration_elapsed = int(iteration_end - iteration_start)
@@ -0,0 +1,471 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------------------------
+# Zonal accumulators
+# Author: Timm Nawrocki
+# Last Updated: 2026-10-17
+# Usage: Must be executed in a Python 3.8+ distribution with numpy and rasterio.
+# Description: "Zonal accumulators" is a set of functions that accumulate the count, sum, sum of squared deviations, minimum, maximum, and optionally a histogram of values per zone from blocks of a zone raster and a value raster so that the mean, standard deviation, range, and other statistics of every zone can be calculated together from one read of each raster. Squared deviations are accumulated from the mean of each block and merged with the parallel variance formula so that the standard deviation remains precise for large values with small variation. Accumulators of different tiles hold only the zones present in each tile and merge associatively, so rasters that do not fit in memory can be accumulated tile by tile in parallel processes. The area, perimeter, and an interior cell of every zone can be accumulated from the same blocks of the zone raster.
+# ---------------------------------------------------------------------------
+
+# Define a function to split a band from a raster path
+def split_band(input_raster):
+    """
+    Description: splits a raster path that may end with an arcpy band name such as 'Band_1' into the file path and band number
+    Inputs: 'input_raster' -- a file path for a raster, optionally followed by '/Band_' and a band number
+    Returned Value: Returns the file path and the band number
+    Preconditions: None
+    """
+
+    # Import packages
+    import os
+
+    # Split band name from path
+    raster_folder, raster_name = os.path.split(input_raster)
+    if raster_name.startswith('Band_') and os.path.isfile(input_raster) == 0:
+        return raster_folder, int(raster_name.split('_')[1])
+
+    return input_raster, 1
+
+# Define a function to create empty accumulators
+def create_accumulators(zone_count, bin_edges=None):
+    """
+    Description: creates empty accumulators for a number of zones
+    Inputs: 'zone_count' -- the number of zones, which must be larger than the largest zone value
+            'bin_edges' -- an optional increasing array of histogram bin edges, in which the last bin includes its upper edge
+    Returned Value: Returns a dictionary of count, sum, sum of squared deviations from the mean, minimum, and maximum arrays indexed by zone value and, if bin edges are provided, the bin edges and a histogram array of zones by bins
+    Preconditions: None
+    """
+
+    # Import packages
+    import numpy as np
+
+    # Create accumulators
+    accumulators = {'count': np.zeros(zone_count, dtype='int64'),
+                    'sum': np.zeros(zone_count, dtype='float64'),
+                    'squared_deviations': np.zeros(zone_count, dtype='float64'),
+                    'minimum': np.full(zone_count, np.inf),
+                    'maximum': np.full(zone_count, -np.inf)}
+    if bin_edges is not None:
+        accumulators['bin_edges'] = np.asarray(bin_edges, dtype='float64')
+        accumulators['histogram'] = np.zeros((zone_count, len(bin_edges) - 1), dtype='int64')
+
+    return accumulators
+
+# Define a function to enlarge accumulators
+def resize_accumulators(accumulators, zone_count):
+    """
+    Description: enlarges accumulators so that they hold a number of zones, keeping accumulated values
+    Inputs: 'accumulators' -- a dictionary of accumulators from create_accumulators
+            'zone_count' -- the new number of zones
+    Returned Value: Returns a dictionary of accumulators
+    Preconditions: requires a zone count at least as large as the current number of zones
+    """
+
+    # Import packages
+    import numpy as np
+
+    # Copy accumulated values into empty accumulators
+    current_count = len(accumulators['count'])
+    if zone_count <= current_count:
+        return accumulators
+    resized_accumulators = create_accumulators(zone_count, accumulators.get('bin_edges'))
+    for key in resized_accumulators:
+        if key != 'bin_edges':
+            resized_accumulators[key][:current_count] = accumulators[key]
+
+    return resized_accumulators
+
+# Define a function to merge moments into accumulators
+def merge_moments(accumulators, count, total, squared_deviations, zones=None):
+    """
+    Description: merges the count, sum, and sum of squared deviations of a set of values into accumulators with the parallel variance formula
+    Inputs: 'accumulators' -- a dictionary of accumulators from create_accumulators
+            'count' -- an integer array of counts per zone
+            'total' -- a float array of sums per zone
+            'squared_deviations' -- a float array of sums of squared deviations from the mean per zone
+            'zones' -- an optional array of unique zone values to which the moments belong (None if the moments are indexed by zone value)
+    Returned Value: Updates the accumulators in place
+    Preconditions: requires arrays of the same length as the accumulators or as the zone values
+    """
+
+    # Import packages
+    import numpy as np
+
+    # Select the accumulated moments of the zones
+    if zones is None:
+        zones = slice(None)
+    accumulated_count = accumulators['count'][zones]
+    accumulated_sum = accumulators['sum'][zones]
+
+    # Calculate the difference between means
+    merged_count = accumulated_count + count
+    with np.errstate(invalid='ignore', divide='ignore'):
+        delta = np.where((accumulated_count > 0) & (count > 0),
+                         total / count - accumulated_sum / accumulated_count, 0)
+        correction = np.where(merged_count > 0, delta ** 2 * accumulated_count * count / merged_count, 0)
+
+    # Update accumulators
+    accumulators['squared_deviations'][zones] += squared_deviations + correction
+    accumulators['sum'][zones] = accumulated_sum + total
+    accumulators['count'][zones] = merged_count
+
+# Define a function to accumulate a block of values by zone
+def accumulate_zones(accumulators, zone_values, values):
+    """
+    Description: adds a block of values to the accumulators of their zones
+    Inputs: 'accumulators' -- a dictionary of accumulators from create_accumulators
+            'zone_values' -- an integer array of zone values with negative values as no data
+            'values' -- a float array of values with NaN as no data
+    Returned Value: Returns a dictionary of accumulators, which is enlarged if the block contains larger zone values
+    Preconditions: requires zone values and values of the same shape
+    """
+
+    # Import packages
+    import numpy as np
+
+    # Select cells with both a zone and a value
+    valid = (zone_values >= 0) & np.isfinite(values)
+    zones = zone_values[valid].astype('int64')
+    if zones.size == 0:
+        return accumulators
+    block_values = values[valid].astype('float64')
+
+    # Enlarge accumulators for new zones
+    accumulators = resize_accumulators(accumulators, int(zones.max()) + 1)
+    zone_count = len(accumulators['count'])
+
+    # Calculate block moments
+    block_count = np.bincount(zones, minlength=zone_count)
+    block_sum = np.bincount(zones, weights=block_values, minlength=zone_count)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        block_mean = np.where(block_count > 0, block_sum / block_count, 0)
+    block_deviations = np.bincount(zones, weights=(block_values - block_mean[zones]) ** 2, minlength=zone_count)
+
+    # Merge block moments with accumulated moments
+    merge_moments(accumulators, block_count, block_sum, block_deviations)
+
+    # Accumulate extremes
+    np.minimum.at(accumulators['minimum'], zones, block_values)
+    np.maximum.at(accumulators['maximum'], zones, block_values)
+
+    # Accumulate histogram
+    if 'histogram' in accumulators:
+        bin_edges = accumulators['bin_edges']
+        bin_count = len(bin_edges) - 1
+        bins = np.searchsorted(bin_edges, block_values, side='right') - 1
+        bins[block_values == bin_edges[-1]] = bin_count - 1
+        inside = (bins >= 0) & (bins < bin_count)
+        accumulators['histogram'] += np.bincount(zones[inside] * bin_count + bins[inside],
+                                                 minlength=zone_count * bin_count).reshape(zone_count, bin_count)
+
+    return accumulators
+
+# Define a function to merge two sets of accumulators
+def merge_accumulators(accumulators, other_accumulators):
+    """
+    Description: merges accumulators of two sets of values, such as two tiles of a raster, so that the result does not depend on the order or grouping of merges
+    Inputs: 'accumulators' -- a dictionary of accumulators from accumulate_zones, which is updated
+            'other_accumulators' -- a dictionary of accumulators from accumulate_zones or sparse accumulators from accumulate_tile with the same bin edges
+    Returned Value: Returns a dictionary of merged accumulators, which is enlarged if the other accumulators contain larger zone values
+    Preconditions: requires accumulators with the same bin edges or without histograms
+    """
+
+    # Import packages
+    import numpy as np
+
+    # Define the zones of the other accumulators and enlarge accumulators to hold them
+    if 'zones' in other_accumulators:
+        zones = other_accumulators['zones']
+        zone_count = int(zones.max()) + 1 if zones.size > 0 else 1
+    else:
+        zones = np.arange(len(other_accumulators['count']))
+        zone_count = len(zones)
+    accumulators = resize_accumulators(accumulators, zone_count)
+
+    # Scatter moments, extremes, and histograms into the accumulators of the zones
+    merge_moments(accumulators, other_accumulators['count'], other_accumulators['sum'],
+                  other_accumulators['squared_deviations'], zones)
+    accumulators['minimum'][zones] = np.minimum(accumulators['minimum'][zones], other_accumulators['minimum'])
+    accumulators['maximum'][zones] = np.maximum(accumulators['maximum'][zones], other_accumulators['maximum'])
+    if 'histogram' in accumulators:
+        accumulators['histogram'][zones] += other_accumulators['histogram']
+
+    return accumulators
+
+# Define a function to accumulate a tile of values by zone
+def accumulate_tile(tile_arguments):
+    """
+    Description: reads a tile of a zone raster and the matching tile of a value raster resampled to the zone grid and accumulates the values of the tile by zone into sparse accumulators that hold only the zones present in the tile
+    Inputs: 'tile_arguments' -- a tuple of the zone raster, the input raster, the bin edges or None, and the start row, end row, start column, and end column of the tile
+    Returned Value: Returns a dictionary of accumulators for the tile indexed by position in an array of the unique zone values of the tile, which is stored as 'zones'
+    Preconditions: requires an input raster that may be a band of a multiband raster such as 'raster.tif/Band_1'
+    """
+
+    # Import packages
+    import numpy as np
+    import rasterio
+    from rasterio.enums import Resampling
+    from rasterio.vrt import WarpedVRT
+    from rasterio.windows import Window
+
+    # Parse tile arguments
+    zone_raster, input_raster, bin_edges, row_start, row_end, col_start, col_end = tile_arguments
+    input_path, input_band = split_band(input_raster)
+    window = Window(col_start, row_start, col_end - col_start, row_end - row_start)
+
+    # Read zones and values of the tile
+    with rasterio.open(zone_raster) as zone_dataset, rasterio.open(input_path) as input_dataset:
+        zone_values = zone_dataset.read(1, window=window, masked=True).astype('int64').filled(-1)
+        # Resample input raster to the zone raster grid
+        with WarpedVRT(input_dataset,
+                       crs=zone_dataset.crs,
+                       transform=zone_dataset.transform,
+                       width=zone_dataset.width,
+                       height=zone_dataset.height,
+                       resampling=Resampling.nearest) as value_dataset:
+            values = value_dataset.read(input_band, window=window, masked=True).astype('float64').filled(np.nan)
+
+    # Number the unique zones of the tile
+    valid = (zone_values >= 0) & np.isfinite(values)
+    zones, zone_numbers = np.unique(zone_values[valid], return_inverse=True)
+
+    # Accumulate values of the tile by zone number
+    accumulators = accumulate_zones(create_accumulators(len(zones), bin_edges), zone_numbers, values[valid])
+    accumulators['zones'] = zones
+
+    return accumulators
+
+# Define a function to stream accumulators over the tiles of a raster
+def stream_accumulators(zone_raster, input_raster, tile_size=2048, workers=None, bin_edges=None):
+    """
+    Description: accumulates the values of an input raster by zone over tiles of the zone raster in parallel and merges the tile accumulators as they complete, keeping at most two tiles per process in flight so that memory is bounded by the tile size and the number of zones
+    Inputs: 'zone_raster' -- a file path for a zone raster
+            'input_raster' -- a file path for an input raster, optionally followed by '/Band_' and a band number
+            'tile_size' -- the number of rows and columns per tile
+            'workers' -- the number of processes to use (defaults to all cores; 1 to accumulate tiles in the current process)
+            'bin_edges' -- an optional increasing array of histogram bin edges
+    Returned Value: Returns a dictionary of accumulators for the whole zone raster
+    Preconditions: requires a zone raster from image segmentation that can be created through other scripts in this repository
+    """
+
+    # Import packages
+    from concurrent.futures import as_completed
+    from concurrent.futures import ProcessPoolExecutor
+    import os
+    from package_Geomorphometry.rasterBlocks import define_grid
+    from package_Geomorphometry.rasterBlocks import define_tiles
+
+    # Define tiles of the zone raster
+    grid = define_grid(zone_raster)
+    argument_list = [(zone_raster, input_raster, bin_edges) + tile for tile in define_tiles(grid, tile_size)]
+
+    # Accumulate tiles and merge results
+    accumulators = create_accumulators(1, bin_edges)
+    if workers == 1:
+        for tile_accumulators in map(accumulate_tile, argument_list):
+            accumulators = merge_accumulators(accumulators, tile_accumulators)
+    else:
+        window_size = 2 * (workers or os.cpu_count())
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # Submit the first window of tiles
+            running_tiles = set([executor.submit(accumulate_tile, arguments)
+                                 for arguments in argument_list[:window_size]])
+            next_tile = window_size
+            # Merge each tile as it completes and submit the next tile in its place
+            while len(running_tiles) > 0:
+                finished_tile = next(as_completed(running_tiles))
+                running_tiles.remove(finished_tile)
+                accumulators = merge_accumulators(accumulators, finished_tile.result())
+                if next_tile < len(argument_list):
+                    running_tiles.add(executor.submit(accumulate_tile, argument_list[next_tile]))
+                    next_tile += 1
+
+    return accumulators
+
+# Define a function to calculate zonal statistics from accumulators
+def summarize_zones(accumulators, statistic):
+    """
+    Description: calculates a statistic for every zone from accumulators in the same way as ZonalStatistics
+    Inputs: 'accumulators' -- a dictionary of accumulators from accumulate_zones
+            'statistic' -- a string value of either 'MEAN', 'STD', 'RANGE', 'MINIMUM', 'MAXIMUM', 'SUM', 'COUNT', 'MEDIAN', or 'MAJORITY'
+    Returned Value: Returns a 64-bit float array of the statistic indexed by zone value with NaN for zones without values
+    Preconditions: requires accumulators from accumulate_zones, which must include a histogram for the median and majority; the median and majority are the lower edges of the bin containing the lower middle value and of the lowest most frequent bin, which are exact for bins of one integer value
+    """
+
+    # Import packages
+    import numpy as np
+
+    # Calculate statistic for zones with values
+    count = accumulators['count']
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = accumulators['sum'] / count
+        if statistic == 'MEAN':
+            summary = mean
+        elif statistic == 'STD':
+            summary = np.sqrt(accumulators['squared_deviations'] / count)
+        elif statistic == 'RANGE':
+            summary = accumulators['maximum'] - accumulators['minimum']
+        elif statistic == 'MINIMUM':
+            summary = accumulators['minimum'].copy()
+        elif statistic == 'MAXIMUM':
+            summary = accumulators['maximum'].copy()
+        elif statistic == 'SUM':
+            summary = accumulators['sum'].copy()
+        elif statistic == 'COUNT':
+            summary = count.astype('float64')
+        elif statistic in ['MEDIAN', 'MAJORITY'] and 'histogram' in accumulators:
+            histogram = accumulators['histogram']
+            if statistic == 'MEDIAN':
+                cumulative = np.cumsum(histogram, axis=1)
+                middle = (histogram.sum(axis=1) + 1) // 2
+                bins = np.minimum((cumulative < middle[:, None]).sum(axis=1), histogram.shape[1] - 1)
+            else:
+                bins = np.argmax(histogram, axis=1)
+            summary = accumulators['bin_edges'][bins].astype('float64')
+            summary[histogram.sum(axis=1) == 0] = np.nan
+        elif statistic in ['MEDIAN', 'MAJORITY']:
+            print(f'\t\tERROR: Statistic {statistic} requires histogram bin edges.')
+            quit()
+        else:
+            print(f'\t\tERROR: Statistic {statistic} is not supported.')
+            quit()
+    summary[count == 0] = np.nan
+
+    return summary
+
+# Define a function to read a block of zones
+def read_zones(zone_dataset, row_start, row_end, halo=0):
+    """
+    Description: reads a block of rows of a zone raster as integer zone values padded by a halo of rows and columns
+    Inputs: 'zone_dataset' -- an open rasterio dataset of the zone raster
+            'row_start' -- the first row of the block
+            'row_end' -- the row after the last row of the block
+            'halo' -- the number of rows and columns to pad each side of the block
+    Returned Value: Returns a 64-bit integer array of zone values with -1 for no data and for padding beyond the raster
+    Preconditions: requires an open zone raster
+    """
+
+    # Import packages
+    import numpy as np
+    from rasterio.windows import Window
+
+    # Read rows of the block and halo that lie within the raster
+    read_start = max(row_start - halo, 0)
+    read_end = min(row_end + halo, zone_dataset.height)
+    window = Window(0, read_start, zone_dataset.width, read_end - read_start)
+    zone_values = zone_dataset.read(1, window=window, masked=True).astype('int64').filled(-1)
+
+    # Pad block with no data
+    zone_block = np.full((row_end - row_start + 2 * halo, zone_dataset.width + 2 * halo), -1, dtype='int64')
+    zone_block[read_start - row_start + halo:read_end - row_start + halo, halo:halo + zone_dataset.width] = zone_values
+
+    return zone_block
+
+# Define a function to create empty geometry accumulators
+def create_geometry(zone_count):
+    """
+    Description: creates empty geometry accumulators for a number of zones
+    Inputs: 'zone_count' -- the number of zones, which must be larger than the largest zone value
+    Returned Value: Returns a dictionary of cell count, perimeter, sums of row and column indices, and the distance, row, and column of the interior cell nearest to the centroid indexed by zone value
+    Preconditions: None
+    """
+
+    # Import packages
+    import numpy as np
+
+    # Create geometry accumulators
+    geometry = {'count': np.zeros(zone_count, dtype='int64'),
+                'perimeter': np.zeros(zone_count, dtype='float64'),
+                'row_sum': np.zeros(zone_count, dtype='float64'),
+                'column_sum': np.zeros(zone_count, dtype='float64'),
+                'distance': np.full(zone_count, np.inf),
+                'row': np.full(zone_count, -1, dtype='int64'),
+                'column': np.full(zone_count, -1, dtype='int64')}
+
+    return geometry
+
+# Define a function to accumulate the geometry of a block of zones
+def accumulate_geometry(geometry, zone_block, row_start, cell_width, cell_height):
+    """
+    Description: adds the cell count, perimeter, and cell positions of a block of zones to the geometry accumulators
+    Inputs: 'geometry' -- a dictionary of geometry accumulators from create_geometry
+            'zone_block' -- an integer array of zone values padded by one row and column on each side from read_zones
+            'row_start' -- the first row of the block without padding
+            'cell_width' -- the width of a cell in map units
+            'cell_height' -- the height of a cell in map units
+    Returned Value: Returns a dictionary of geometry accumulators, which is enlarged if the block contains larger zone values
+    Preconditions: requires a zone block padded by a halo of one
+    """
+
+    # Import packages
+    import numpy as np
+
+    # Select cells with a zone
+    zone_values = zone_block[1:-1, 1:-1]
+    valid = zone_values >= 0
+    zones = zone_values[valid]
+    if zones.size == 0:
+        return geometry
+
+    # Enlarge accumulators for new zones
+    zone_count = int(zones.max()) + 1
+    current_count = len(geometry['count'])
+    if zone_count > current_count:
+        resized_geometry = create_geometry(zone_count)
+        for key in resized_geometry:
+            resized_geometry[key][:current_count] = geometry[key]
+        geometry = resized_geometry
+    zone_count = len(geometry['count'])
+
+    # Calculate the length of cell edges that border other zones or no data
+    edge_length = (cell_height * ((zone_values != zone_block[1:-1, :-2]).astype('int64')
+                                  + (zone_values != zone_block[1:-1, 2:]))
+                   + cell_width * ((zone_values != zone_block[:-2, 1:-1]).astype('int64')
+                                   + (zone_values != zone_block[2:, 1:-1])))
+
+    # Accumulate cell counts, perimeters, and cell positions
+    rows, columns = np.nonzero(valid)
+    geometry['count'] += np.bincount(zones, minlength=zone_count)
+    geometry['perimeter'] += np.bincount(zones, weights=edge_length[valid], minlength=zone_count)
+    geometry['row_sum'] += np.bincount(zones, weights=rows + row_start, minlength=zone_count)
+    geometry['column_sum'] += np.bincount(zones, weights=columns, minlength=zone_count)
+
+    return geometry
+
+# Define a function to locate interior cells of zones
+def locate_interior(geometry, zone_values, row_start):
+    """
+    Description: updates the interior cell of each zone in a block with the cell of the zone nearest to the centroid of the zone, which lies inside the zone even if the zone is not convex
+    Inputs: 'geometry' -- a dictionary of geometry accumulators that contains the cell counts and positions of all blocks from accumulate_geometry
+            'zone_values' -- an integer array of zone values with negative values as no data
+            'row_start' -- the first row of the block
+    Returned Value: Updates the geometry accumulators in place
+    Preconditions: requires geometry accumulated from every block of the zone raster
+    """
+
+    # Import packages
+    import numpy as np
+
+    # Select cells with a zone
+    rows, columns = np.nonzero(zone_values >= 0)
+    zones = zone_values[rows, columns]
+    if zones.size == 0:
+        return
+    rows = rows + row_start
+
+    # Calculate squared distance of each cell to the centroid of its zone
+    count = np.maximum(geometry['count'][zones], 1)
+    distance = ((rows - geometry['row_sum'][zones] / count) ** 2
+                + (columns - geometry['column_sum'][zones] / count) ** 2)
+
+    # Find the nearest cell of each zone in the block
+    order = np.lexsort((columns, rows, distance, zones))
+    first = np.ones(order.size, dtype='bool')
+    first[1:] = zones[order][1:] != zones[order][:-1]
+    nearest = order[first]
+
+    # Keep cells nearer than the interior cells of previous blocks
+    nearest = nearest[distance[nearest] < geometry['distance'][zones[nearest]]]
+    geometry['distance'][zones[nearest]] = distance[nearest]
+    geometry['row'][zones[nearest]] = rows[nearest]
+    geometry['column'][zones[nearest]] = columns[nearest]
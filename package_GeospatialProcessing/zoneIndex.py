@@ -0,0 +1,455 @@
+# -*- coding: utf-8 -*-
+# ---------------------------------------------------------------------------
+# Zone index
+# Author: Timm Nawrocki
+# Last Updated: 2026-10-17
+# Usage: Must be executed in a Python 3.8+ distribution with numpy and rasterio.
+# Description: "Zone index" is a set of functions that build a compressed sparse row index of the cells of each zone in a zone raster, store the index as numpy files next to the zone raster, and use the index to summarize values by zone, find the majority value of each zone, and assign values to the cells of each zone. Once the index exists, each statistic of an input on the zone grid is a single gather of cell values followed by reductions over the contiguous cells of each zone, so the zone raster is not read again; without an index, or for histograms and inputs on other grids, tiles of the zone raster are streamed through mergeable zonal accumulators instead. For input rasters coarser than the zone raster, such as 10 m Sentinel-1 and Sentinel-2 composites summarized to 1 m segments, the index is converted once per coarse grid into sparse weights of each coarse cell in each zone so that weighted statistics are calculated at the native resolution of the input without resampling it to the zone grid.
+# ---------------------------------------------------------------------------
+
+# Define a function to define the files of a zone index
+def define_index_files(zone_raster):
+    """
+    Description: defines the numpy files that store the zone index of a zone raster
+    Inputs: 'zone_raster' -- a file path for a zone raster
+    Returned Value: Returns a dictionary of file paths for the zone ids, offsets, cells, and bounds
+    Preconditions: None
+    """
+
+    # Import packages
+    import os
+
+    # Define index files next to the zone raster
+    raster_base = os.path.splitext(zone_raster)[0]
+    index_files = {'zone_ids': raster_base + '_ZoneIds.npy',
+                   'offsets': raster_base + '_ZoneOffsets.npy',
+                   'cells': raster_base + '_ZoneCells.npy',
+                   'bounds': raster_base + '_ZoneBounds.npy'}
+
+    return index_files
+
+# Define a function to build a zone index
+def build_zone_index(zone_raster, block_rows=1024):
+    """
+    Description: builds a compressed sparse row index of the cells of each zone from two block reads of a zone raster
+    Inputs: 'zone_raster' -- a file path for a zone raster with non-negative integer zone values
+            'block_rows' -- the number of rows of the zone raster to read at a time
+    Returned Value: Returns a dictionary of the zone ids present in the raster, the offsets of the cells of each zone, the flat cell positions sorted by zone and position, the row minimum, row maximum, column minimum, and column maximum of each zone, and the shape of the raster
+    Preconditions: requires a zone raster from image segmentation that can be created through other scripts in this repository
+    """
+
+    # Import packages
+    import numpy as np
+    from package_GeospatialProcessing.zonalAccumulators import read_zones
+    import rasterio
+
+    # Count cells per zone
+    zone_counts = np.zeros(1, dtype='int64')
+    with rasterio.open(zone_raster) as zone_dataset:
+        raster_shape = (zone_dataset.height, zone_dataset.width)
+        for row_start in range(0, zone_dataset.height, block_rows):
+            row_end = min(row_start + block_rows, zone_dataset.height)
+            zones = read_zones(zone_dataset, row_start, row_end)
+            zones = zones[zones >= 0]
+            if zones.size > 0:
+                block_counts = np.bincount(zones)
+                if len(block_counts) > len(zone_counts):
+                    zone_counts = np.pad(zone_counts, (0, len(block_counts) - len(zone_counts)))
+                zone_counts[:len(block_counts)] += block_counts
+
+    # Define offsets of the cells of each zone
+    starts = np.concatenate([[0], np.cumsum(zone_counts)[:-1]])
+    cells = np.zeros(int(zone_counts.sum()), dtype='int64')
+    row_bounds = np.stack([np.full(len(zone_counts), raster_shape[0]), np.full(len(zone_counts), -1)], axis=1)
+    column_bounds = np.stack([np.full(len(zone_counts), raster_shape[1]), np.full(len(zone_counts), -1)], axis=1)
+
+    # Place the cells of each block after the cells of previous blocks so that cells remain sorted within zones
+    cursor = starts.copy()
+    with rasterio.open(zone_raster) as zone_dataset:
+        for row_start in range(0, zone_dataset.height, block_rows):
+            row_end = min(row_start + block_rows, zone_dataset.height)
+            zone_block = read_zones(zone_dataset, row_start, row_end)
+            block_cells = np.flatnonzero(zone_block >= 0)
+            if block_cells.size == 0:
+                continue
+            zones = zone_block.ravel()[block_cells]
+            order = np.argsort(zones, kind='stable')
+            zones = zones[order]
+            block_cells = block_cells[order]
+            group_starts = np.flatnonzero(np.concatenate([[True], zones[1:] != zones[:-1]]))
+            ranks = np.arange(zones.size) - np.repeat(group_starts, np.diff(np.append(group_starts, zones.size)))
+            cells[cursor[zones] + ranks] = block_cells + row_start * raster_shape[1]
+            cursor += np.bincount(zones, minlength=len(zone_counts))
+            # Update the bounds of each zone
+            rows = block_cells // raster_shape[1] + row_start
+            columns = block_cells % raster_shape[1]
+            np.minimum.at(row_bounds[:, 0], zones, rows)
+            np.maximum.at(row_bounds[:, 1], zones, rows)
+            np.minimum.at(column_bounds[:, 0], zones, columns)
+            np.maximum.at(column_bounds[:, 1], zones, columns)
+
+    # Compress the index to zones that contain cells
+    zone_ids = np.flatnonzero(zone_counts > 0)
+    zone_index = {'zone_ids': zone_ids,
+                  'offsets': np.append(starts[zone_ids], cells.size),
+                  'cells': cells,
+                  'bounds': np.concatenate([row_bounds[zone_ids], column_bounds[zone_ids]], axis=1),
+                  'shape': raster_shape}
+
+    return zone_index
+
+# Define a function to load a zone index
+def load_zone_index(zone_raster, block_rows=1024):
+    """
+    Description: loads the zone index stored next to a zone raster, building and storing the index if it does not exist or is older than the zone raster
+    Inputs: 'zone_raster' -- a file path for a zone raster with non-negative integer zone values
+            'block_rows' -- the number of rows of the zone raster to read at a time if the index must be built
+    Returned Value: Returns a zone index dictionary from build_zone_index with the cells memory mapped from disk
+    Preconditions: requires a zone raster from image segmentation that can be created through other scripts in this repository
+    """
+
+    # Import packages
+    import numpy as np
+    import os
+    import rasterio
+
+    # Build and store index if it does not exist or is out of date
+    index_files = define_index_files(zone_raster)
+    if any([os.path.exists(index_file) == 0
+            or os.path.getmtime(index_file) < os.path.getmtime(zone_raster)
+            for index_file in index_files.values()]):
+        print(f'\t\tBuilding zone index for {os.path.split(zone_raster)[1]}...')
+        zone_index = build_zone_index(zone_raster, block_rows)
+        for key, index_file in index_files.items():
+            np.save(index_file, zone_index[key])
+        return zone_index
+
+    # Load stored index
+    zone_index = {key: np.load(index_file, mmap_mode='r' if key == 'cells' else None)
+                  for key, index_file in index_files.items()}
+    with rasterio.open(zone_raster) as zone_dataset:
+        zone_index['shape'] = (zone_dataset.height, zone_dataset.width)
+
+    return zone_index
+
+# Define a function to summarize values by zone with a zone index
+def reduce_zones(zone_index, value_array):
+    """
+    Description: gathers the cell values of every zone and reduces them to accumulators of count, sum, sum of squared deviations, minimum, and maximum per zone
+    Inputs: 'zone_index' -- a zone index dictionary from load_zone_index
+            'value_array' -- a two dimensional masked array of values on the grid of the zone raster
+    Returned Value: Returns a dictionary of accumulators indexed by zone value that can be summarized with summarize_zones
+    Preconditions: requires values on the grid of the zone raster
+    """
+
+    # Import packages
+    import numpy as np
+    from package_GeospatialProcessing.zonalAccumulators import create_accumulators
+
+    # Gather the values of each zone
+    offsets = zone_index['offsets']
+    zone_ids = zone_index['zone_ids']
+    values = np.ma.asarray(value_array).ravel()[zone_index['cells']].astype('float64').filled(np.nan)
+    valid = np.isfinite(values)
+    starts = offsets[:-1]
+
+    # Reduce the contiguous values of each zone
+    accumulators = create_accumulators(int(zone_ids.max()) + 1 if zone_ids.size > 0 else 1)
+    if values.size == 0:
+        return accumulators
+    count = np.add.reduceat(valid.astype('int64'), starts)
+    total = np.add.reduceat(np.where(valid, values, 0), starts)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.where(count > 0, total / count, 0)
+    deviations = np.where(valid, values - np.repeat(mean, np.diff(offsets)), 0)
+    accumulators['count'][zone_ids] = count
+    accumulators['sum'][zone_ids] = total
+    accumulators['squared_deviations'][zone_ids] = np.add.reduceat(deviations ** 2, starts)
+    accumulators['minimum'][zone_ids] = np.minimum.reduceat(np.where(valid, values, np.inf), starts)
+    accumulators['maximum'][zone_ids] = np.maximum.reduceat(np.where(valid, values, -np.inf), starts)
+
+    return accumulators
+
+# Define a function to find the majority value of each zone with a zone index
+def majority_zones(zone_index, value_array, no_data_value):
+    """
+    Description: finds the most frequent value of the cells of every zone, choosing the lowest value if several values are equally frequent as in ZonalStatistics
+    Inputs: 'zone_index' -- a zone index dictionary from load_zone_index
+            'value_array' -- a two dimensional integer array of values on the grid of the zone raster
+            'no_data_value' -- the value of cells without data, which is ignored
+    Returned Value: Returns a 64-bit float array of the majority value indexed by zone value with NaN for zones without values
+    Preconditions: requires values on the grid of the zone raster
+    """
+
+    # Import packages
+    import numpy as np
+
+    # Gather the values of each zone
+    zone_ids = zone_index['zone_ids']
+    values = np.asarray(value_array).ravel()[zone_index['cells']]
+    zone_rows = np.repeat(np.arange(zone_ids.size), np.diff(zone_index['offsets']))
+    valid = values != no_data_value
+    values = values[valid].astype('int64')
+    zone_rows = zone_rows[valid]
+
+    # Count runs of equal values within each zone
+    majority = np.full(int(zone_ids.max()) + 1 if zone_ids.size > 0 else 1, np.nan)
+    if values.size == 0:
+        return majority
+    order = np.lexsort((values, zone_rows))
+    values = values[order]
+    zone_rows = zone_rows[order]
+    run_starts = np.flatnonzero(np.concatenate([[True], (zone_rows[1:] != zone_rows[:-1]) | (values[1:] != values[:-1])]))
+    run_counts = np.diff(np.append(run_starts, values.size))
+    run_zones = zone_rows[run_starts]
+
+    # Select the longest run of each zone, which is the first longest run for the lowest value
+    run_order = np.lexsort((np.arange(run_counts.size), -run_counts, run_zones))
+    first = np.concatenate([[True], run_zones[run_order][1:] != run_zones[run_order][:-1]])
+    selected = run_order[first]
+    majority[zone_ids[run_zones[selected]]] = values[run_starts[selected]]
+
+    return majority
+
+# Define a function to assign zone values to cells with a zone index
+def assign_zones(zone_index, zone_values, no_data_value, data_type):
+    """
+    Description: creates an array on the grid of the zone raster in which every cell of a zone has the value of the zone
+    Inputs: 'zone_index' -- a zone index dictionary from load_zone_index
+            'zone_values' -- a float array of values indexed by zone value with NaN for zones without values, which is padded with NaN if it is shorter than the largest zone value
+            'no_data_value' -- the value of cells outside zones or in zones without values
+            'data_type' -- the numpy data type of the output array
+    Returned Value: Returns a two dimensional array on the grid of the zone raster
+    Preconditions: requires a zone index
+    """
+
+    # Import packages
+    import numpy as np
+
+    # Assign the value of each zone to its cells
+    zone_ids = zone_index['zone_ids']
+    zone_values = np.asarray(zone_values, dtype='float64')
+    if zone_ids.size > 0 and len(zone_values) <= zone_ids.max():
+        zone_values = np.pad(zone_values, (0, int(zone_ids.max()) + 1 - len(zone_values)), constant_values=np.nan)
+    values = zone_values[zone_ids]
+    values = np.where(np.isfinite(values), values, no_data_value).astype(data_type)
+    output_array = np.full(zone_index['shape'], no_data_value, dtype=data_type)
+    output_array.ravel()[zone_index['cells']] = np.repeat(values, np.diff(zone_index['offsets']))
+
+    return output_array
+
+# Define a function to define the files of zone overlaps with a coarse grid
+def define_overlap_files(zone_raster, coarse_key):
+    """
+    Description: defines the numpy files that store the overlap weights of the zones of a zone raster with the cells of a coarse grid
+    Inputs: 'zone_raster' -- a file path for a zone raster
+            'coarse_key' -- a string that identifies the coarse grid
+    Returned Value: Returns a dictionary of file paths for the overlap offsets, cells, weights, and window
+    Preconditions: None
+    """
+
+    # Import packages
+    import os
+
+    # Define overlap files next to the zone raster
+    raster_base = os.path.splitext(zone_raster)[0] + '_Overlap_' + coarse_key
+    overlap_files = {'offsets': raster_base + '_Offsets.npy',
+                     'cells': raster_base + '_Cells.npy',
+                     'weights': raster_base + '_Weights.npy',
+                     'window': raster_base + '_Window.npy'}
+
+    return overlap_files
+
+# Define a function to build zone overlaps with a coarse grid
+def build_zone_overlaps(zone_index, zone_transform, coarse_transform, coarse_shape):
+    """
+    Description: builds sparse weights of the coverage of each coarse cell by each zone as the number of zone cells whose centers fall in the coarse cell, which is the coverage that nearest neighbor resampling to the zone grid assigns
+    Inputs: 'zone_index' -- a zone index dictionary from load_zone_index
+            'zone_transform' -- the affine transform of the zone raster
+            'coarse_transform' -- the affine transform of the coarse raster in the coordinate system of the zone raster
+            'coarse_shape' -- a tuple of the rows and columns of the coarse raster
+    Returned Value: Returns a dictionary of the offsets of the coarse cells of each zone in the order of the zone ids, the flat coarse cell positions within the window, the weights, and the row offset, column offset, height, and width of the window of the coarse raster that contains the zones
+    Preconditions: requires a coarse grid without rotation
+    """
+
+    # Import packages
+    import numpy as np
+
+    # Locate the coarse cell that contains the center of each zone cell
+    cells = np.asarray(zone_index['cells'])
+    rows, columns = np.divmod(cells, zone_index['shape'][1])
+    x_values = zone_transform.c + (columns + 0.5) * zone_transform.a
+    y_values = zone_transform.f + (rows + 0.5) * zone_transform.e
+    coarse_rows = np.floor((y_values - coarse_transform.f) / coarse_transform.e).astype('int64')
+    coarse_columns = np.floor((x_values - coarse_transform.c) / coarse_transform.a).astype('int64')
+    inside = ((coarse_rows >= 0) & (coarse_rows < coarse_shape[0])
+              & (coarse_columns >= 0) & (coarse_columns < coarse_shape[1]))
+
+    # Define the window of the coarse raster that contains the zones
+    if np.any(inside):
+        window = np.array([coarse_rows[inside].min(), coarse_columns[inside].min(),
+                           coarse_rows[inside].max() - coarse_rows[inside].min() + 1,
+                           coarse_columns[inside].max() - coarse_columns[inside].min() + 1], dtype='int64')
+    else:
+        window = np.array([0, 0, 0, 0], dtype='int64')
+    coarse_cells = (coarse_rows - window[0]) * window[3] + coarse_columns - window[1]
+
+    # Count zone cells per zone and coarse cell
+    zone_rows = np.repeat(np.arange(zone_index['zone_ids'].size), np.diff(zone_index['offsets']))
+    keys, weights = np.unique(zone_rows[inside] * max(int(window[2] * window[3]), 1) + coarse_cells[inside],
+                              return_counts=True)
+    overlap_rows, overlap_cells = np.divmod(keys, max(int(window[2] * window[3]), 1))
+    overlaps = {'offsets': np.searchsorted(overlap_rows, np.arange(zone_index['zone_ids'].size + 1)),
+                'cells': overlap_cells,
+                'weights': weights.astype('int64'),
+                'window': window}
+
+    return overlaps
+
+# Define a function to load zone overlaps with a coarse raster
+def load_zone_overlaps(zone_raster, zone_index, coarse_dataset):
+    """
+    Description: loads the overlap weights of zones with the grid of a coarse raster stored next to a zone raster, building and storing the weights if they do not exist or are older than the zone raster
+    Inputs: 'zone_raster' -- a file path for a zone raster
+            'zone_index' -- a zone index dictionary from load_zone_index
+            'coarse_dataset' -- an open rasterio dataset of the coarse raster in the coordinate system of the zone raster
+    Returned Value: Returns a zone overlap dictionary from build_zone_overlaps
+    Preconditions: requires a coarse raster without rotation
+    """
+
+    # Import packages
+    import hashlib
+    import numpy as np
+    import os
+    import rasterio
+
+    # Identify the coarse grid by its transform and shape
+    coarse_shape = (coarse_dataset.height, coarse_dataset.width)
+    grid_description = str(tuple(coarse_dataset.transform)[:6]) + str(coarse_shape)
+    coarse_key = hashlib.sha1(grid_description.encode('utf-8')).hexdigest()[:12]
+
+    # Build and store overlaps if they do not exist or are out of date
+    overlap_files = define_overlap_files(zone_raster, coarse_key)
+    if any([os.path.exists(overlap_file) == 0
+            or os.path.getmtime(overlap_file) < os.path.getmtime(zone_raster)
+            for overlap_file in overlap_files.values()]):
+        with rasterio.open(zone_raster) as zone_dataset:
+            zone_transform = zone_dataset.transform
+        overlaps = build_zone_overlaps(zone_index, zone_transform, coarse_dataset.transform, coarse_shape)
+        for key, overlap_file in overlap_files.items():
+            np.save(overlap_file, overlaps[key])
+        return overlaps
+
+    # Load stored overlaps
+    overlaps = {key: np.load(overlap_file) for key, overlap_file in overlap_files.items()}
+
+    return overlaps
+
+# Define a function to summarize coarse values by zone with overlap weights
+def reduce_overlaps(zone_index, overlaps, value_array):
+    """
+    Description: reduces the values of coarse cells to weighted accumulators of count, sum, sum of squared deviations, minimum, and maximum per zone, which equal the accumulators of the coarse values resampled to the zone grid
+    Inputs: 'zone_index' -- a zone index dictionary from load_zone_index
+            'overlaps' -- a zone overlap dictionary from load_zone_overlaps
+            'value_array' -- a two dimensional masked array of the window of the coarse raster from the overlaps
+    Returned Value: Returns a dictionary of accumulators indexed by zone value that can be summarized with summarize_zones
+    Preconditions: requires values read from the window of the overlaps
+    """
+
+    # Import packages
+    import numpy as np
+    from package_GeospatialProcessing.zonalAccumulators import create_accumulators
+
+    # Gather the coarse values of each zone and weight valid values
+    zone_ids = zone_index['zone_ids']
+    accumulators = create_accumulators(int(zone_ids.max()) + 1 if zone_ids.size > 0 else 1)
+    offsets = overlaps['offsets']
+    present = np.diff(offsets) > 0
+    if not np.any(present):
+        return accumulators
+    values = np.ma.asarray(value_array).ravel()[overlaps['cells']].astype('float64').filled(np.nan)
+    valid = np.isfinite(values)
+    weights = np.where(valid, overlaps['weights'], 0)
+    values = np.where(valid, values, 0)
+    starts = offsets[:-1][present]
+    zone_ids = zone_ids[present]
+
+    # Calculate the weighted products of the sparse weights and the coarse values
+    count = np.add.reduceat(weights, starts)
+    total = np.add.reduceat(weights * values, starts)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.where(count > 0, total / count, 0)
+    deviations = values - np.repeat(mean, np.diff(offsets)[present])
+    accumulators['count'][zone_ids] = count
+    accumulators['sum'][zone_ids] = total
+    accumulators['squared_deviations'][zone_ids] = np.add.reduceat(weights * deviations ** 2, starts)
+    accumulators['minimum'][zone_ids] = np.minimum.reduceat(np.where(weights > 0, values, np.inf), starts)
+    accumulators['maximum'][zone_ids] = np.maximum.reduceat(np.where(weights > 0, values, -np.inf), starts)
+
+    return accumulators
+
+# Define a function to summarize a raster by zone
+def reduce_raster(zone_raster, zone_index, input_raster, coarse_ratio=2, tile_size=2048, workers=None,
+                  bin_edges=None):
+    """
+    Description: reduces a band of an input raster by zone, using overlap weights at the native resolution of input rasters that are coarser than the zone raster, a single gather with the zone index for input rasters aligned with the zone grid, and otherwise streaming tiles of the zone raster with the input resampled to the zone grid by nearest neighbor as in ZonalStatistics
+    Inputs: 'zone_raster' -- a file path for a zone raster
+            'zone_index' -- a zone index dictionary from load_zone_index, or None to load it only if overlap weights are used and to stream tiles for inputs on the zone grid
+            'input_raster' -- a file path for an input raster, optionally followed by '/Band_' and a band number
+            'coarse_ratio' -- the minimum ratio of the input cell size to the zone cell size for which overlap weights are used
+            'tile_size' -- the number of rows and columns of the zone raster per tile when streaming tiles
+            'workers' -- the number of processes to use when streaming tiles (defaults to all cores)
+            'bin_edges' -- an optional increasing array of histogram bin edges, which requires streaming tiles
+    Returned Value: Returns a dictionary of accumulators indexed by zone value and the data type of the input band
+    Preconditions: requires a zone raster with non-negative integer zone values
+    """
+
+    # Import packages
+    import numpy as np
+    from package_GeospatialProcessing.zonalAccumulators import split_band
+    from package_GeospatialProcessing.zonalAccumulators import stream_accumulators
+    import rasterio
+    from rasterio.windows import Window
+
+    # Reduce input at native resolution if it is coarser than the zone raster
+    input_path, input_band = split_band(input_raster)
+    with rasterio.open(zone_raster) as zone_dataset, rasterio.open(input_path) as input_dataset:
+        value_type = input_dataset.dtypes[input_band - 1]
+        coarse_grid = (bin_edges is None and input_dataset.crs == zone_dataset.crs
+                       and input_dataset.transform.b == 0 and input_dataset.transform.d == 0
+                       and abs(input_dataset.transform.a) >= coarse_ratio * abs(zone_dataset.transform.a)
+                       and abs(input_dataset.transform.e) >= coarse_ratio * abs(zone_dataset.transform.e))
+        if coarse_grid:
+            if zone_index is None:
+                zone_index = load_zone_index(zone_raster)
+            overlaps = load_zone_overlaps(zone_raster, zone_index, input_dataset)
+            row_offset, column_offset, height, width = [int(value) for value in overlaps['window']]
+            if height * width > 0:
+                value_array = input_dataset.read(input_band, window=Window(column_offset, row_offset, width, height),
+                                                 masked=True)
+            else:
+                value_array = np.ma.zeros((0, 0))
+            return reduce_overlaps(zone_index, overlaps, value_array), value_type
+
+        # Gather input with the zone index if it is aligned with the zone grid
+        zone_transform = zone_dataset.transform
+        input_transform = input_dataset.transform
+        column_offset = (zone_transform.c - input_transform.c) / zone_transform.a
+        row_offset = (zone_transform.f - input_transform.f) / zone_transform.e
+        aligned_grid = (zone_index is not None and bin_edges is None and input_dataset.crs == zone_dataset.crs
+                        and input_transform.b == 0 and input_transform.d == 0
+                        and np.isclose(input_transform.a, zone_transform.a)
+                        and np.isclose(input_transform.e, zone_transform.e)
+                        and np.isclose(column_offset, np.rint(column_offset))
+                        and np.isclose(row_offset, np.rint(row_offset)))
+        if aligned_grid:
+            value_array = input_dataset.read(input_band,
+                                             window=Window(int(np.rint(column_offset)), int(np.rint(row_offset)),
+                                                           zone_dataset.width, zone_dataset.height),
+                                             masked=True, boundless=True)
+            return reduce_zones(zone_index, value_array), value_type
+
+    # Otherwise stream tiles of the zone raster with the input resampled to the zone grid
+    accumulators = stream_accumulators(zone_raster, input_raster, tile_size, workers, bin_edges)
+
+    return accumulators, value_type